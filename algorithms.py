@@ -6,9 +6,18 @@ Team members will add their algorithms here
 """
 
 import heapq
+import inspect
+import threading
 import time
+from array import array
+from collections import OrderedDict, deque
 
-from heuristics import manhattan
+from grid.grid import DIAGONALS, SQRT2
+from heuristics import manhattan, octile
+
+
+INF = float("inf")
+CANCEL_INTERVAL = 1024  # expansions between checks of a CancelToken
 
 
 def manhattan_distance(pos1, pos2):
@@ -16,281 +25,1857 @@ def manhattan_distance(pos1, pos2):
     return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
 
 
-def run_astar(grid, start=None, goal=None, trace=False):
+def _reconstruct(parent, start_id, goal_id, cols):
+    """Walk parent pointers back from the goal and return the (row, col) path"""
+    ids = [goal_id]
+    node = goal_id
+    while node != start_id:
+        node = parent[node]
+        ids.append(node)
+    ids.reverse()
+    return [divmod(i, cols) for i in ids]
+
+
+def _default_heuristic(adj):
+    """Manhattan on 4-connected maps, octile once diagonal moves are allowed"""
+    return octile if adj.diagonal else manhattan
+
+
+def _path_cost(adj, path):
+    """Cost of a (row, col) path: its step count, or summed terrain costs"""
+    if adj.weights is None:
+        return len(path) - 1
+    cols = adj.cols
+    return adj.path_cost([r * cols + c for r, c in path])
+
+
+def _no_path(grid, start, goal):
+    """True when start or goal is off the map, or the component index
+    proves the goal unreachable (O(1)).
+
+    Engines turn endpoints into flat cell indices; the bounds check keeps
+    an off-map cell from indexing past the end or wrapping around to a
+    real cell (a negative row or column).
     """
-    A* pathfinding algorithm
-    
-    Returns: (path, cost, expanded_nodes, time_taken)
+    if not (grid.in_bounds(*start) and grid.in_bounds(*goal)):
+        return True
+    cols = grid.cols
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+    return start_id != goal_id and not grid.components().connected(start_id, goal_id)
+
+
+def _no_path_result(start_time, trace):
+    time_taken = time.time() - start_time
+    if trace:
+        return None, 0, 0, time_taken, []
+    return None, 0, 0, time_taken
+
+
+# =========================
+# SEARCH STREAMS
+# =========================
+
+class SearchResult:
+    """Last item of a search stream: the usual result fields.
+
+    Unpacks like the classic tuple:
+    ``path, cost, expanded_nodes, time_taken = result``.
+    """
+
+    __slots__ = ("path", "cost", "expanded_nodes", "time_taken")
+
+    def __init__(self, path, cost, expanded_nodes, time_taken):
+        self.path = path
+        self.cost = cost
+        self.expanded_nodes = expanded_nodes
+        self.time_taken = time_taken
+
+    def __iter__(self):
+        return iter((self.path, self.cost, self.expanded_nodes, self.time_taken))
+
+    def __repr__(self):
+        return (
+            f"SearchResult(found={self.path is not None}, cost={self.cost}, "
+            f"expanded_nodes={self.expanded_nodes}, time_taken={self.time_taken:.6f})"
+        )
+
+
+def _no_path_event(start_time, stats):
+    if stats is not None:
+        stats.finish(0, 0, "setup")
+    return SearchResult(None, 0, 0, time.time() - start_time)
+
+
+def _run_stream(stream, trace):
+    """Drain a search stream into the classic (path, cost, expanded, time[, order]) tuple"""
+    expanded_order = []
+    for event in stream:
+        if type(event) is SearchResult:
+            result = event
+        else:
+            expanded_order.append(event[0])
+    if trace:
+        return result.path, result.cost, result.expanded_nodes, result.time_taken, expanded_order
+    return result.path, result.cost, result.expanded_nodes, result.time_taken
+
+
+# =========================
+# INSTRUMENTATION
+# =========================
+
+class SearchStats:
+    """Opt-in counters and phase timers for searches.
+
+    Pass ``stats=SearchStats()`` to any run_* function. Engines only touch
+    it behind ``if stats is not None`` checks, once per expansion and never
+    per edge, so an uninstrumented search pays almost nothing for it.
+
+    - pushes / pops: frontier insertions and removals
+    - stale_pops: removals of entries that were already expanded or
+      superseded by a cheaper one
+    - peak_frontier: largest open list, queue or stack seen
+    - neighbor_calls: neighbor lists read, one per expansion
+    - edges_scanned: neighbor entries looked at (jump scans for JPS)
+    - phases: nanoseconds spent in "setup", "search" and "reconstruct",
+      measured with time.perf_counter_ns
+
+    Pushes and pops are derived when a search finishes, from the number of
+    expansions, stale pops and entries still in the frontier, so the hot
+    loop never counts them. Counters add up over several searches until
+    reset().
+    """
+
+    __slots__ = (
+        "searches", "expanded", "pushes", "pops", "stale_pops", "peak_frontier",
+        "neighbor_calls", "edges_scanned", "phases", "_mark", "_stale_mark", "_paused",
+    )
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.searches = 0
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_frontier = 0
+        self.neighbor_calls = 0
+        self.edges_scanned = 0
+        self.phases = {}
+        self._mark = time.perf_counter_ns()
+        self._stale_mark = 0
+        self._paused = 0
+
+    def start(self):
+        """Begin a search; the first phase starts now"""
+        self.searches += 1
+        self._stale_mark = self.stale_pops
+        self._mark = time.perf_counter_ns()
+
+    def lap(self, phase):
+        """Charge the time since the previous mark to phase"""
+        now = time.perf_counter_ns()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self._mark
+        self._mark = now
+
+    def pause(self):
+        """Stop the clock while a search stream waits for its consumer"""
+        self._paused = time.perf_counter_ns()
+
+    def resume(self):
+        self._mark += time.perf_counter_ns() - self._paused
+
+    def expand(self, frontier, degree):
+        """Record one expansion; frontier is its size just before the pop"""
+        self.neighbor_calls += 1
+        self.edges_scanned += degree
+        if frontier > self.peak_frontier:
+            self.peak_frontier = frontier
+
+    def finish(self, expanded, remaining, phase="search"):
+        """End a search: close phase and derive pushes and pops"""
+        self.lap(phase)
+        pops = expanded + self.stale_pops - self._stale_mark
+        self.expanded += expanded
+        self.pops += pops
+        self.pushes += pops + remaining
+        if remaining > self.peak_frontier:
+            self.peak_frontier = remaining
+
+    @property
+    def total_ns(self):
+        return sum(self.phases.values())
+
+    def as_dict(self):
+        """Counters plus phase times in milliseconds, e.g. for report tables"""
+        data = {
+            "searches": self.searches,
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "peak_frontier": self.peak_frontier,
+            "neighbor_calls": self.neighbor_calls,
+            "edges_scanned": self.edges_scanned,
+        }
+        for phase in ("setup", "search", "reconstruct"):
+            data[f"{phase}_ms"] = self.phases.get(phase, 0) / 1e6
+        data["total_ms"] = self.total_ns / 1e6
+        return data
+
+    def summary(self):
+        """Multi-line text for a metrics panel"""
+        return "\n".join(
+            [
+                f"  Heap pushes / pops: {self.pushes} / {self.pops}",
+                f"  Stale pops: {self.stale_pops}",
+                f"  Peak frontier: {self.peak_frontier}",
+                f"  Neighbor calls: {self.neighbor_calls} ({self.edges_scanned} edges)",
+            ]
+            + [f"  {phase.capitalize()}: {ns / 1e6:.3f} ms" for phase, ns in self.phases.items()]
+        )
+
+
+# =========================
+# CANCELLATION
+# =========================
+
+class SearchCancelled(Exception):
+    """Raised from a search whose CancelToken was cancelled"""
+
+
+class CancelToken:
+    """Cooperative cancellation for searches running on another thread.
+
+    Pass ``cancel=token`` to any run_* function. The engine calls check()
+    every CANCEL_INTERVAL expansions and stops with SearchCancelled once
+    cancel() has been called, from any thread. A token stays cancelled.
+
+    event may be a multiprocessing.Event shared with another process, so
+    that a search in a worker process can be cancelled as well.
+    """
+
+    __slots__ = ("_event",)
+
+    def __init__(self, event=None):
+        self._event = threading.Event() if event is None else event
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise SearchCancelled if cancel() was called"""
+        if self._event.is_set():
+            raise SearchCancelled("search cancelled")
+
+
+# =========================
+# ALGORITHMS
+# =========================
+
+def iter_astar(grid, start=None, goal=None, heuristic=None, stats=None, events=True, cancel=None):
+    """
+    A* pathfinding algorithm, as a search stream
+
+    Yields one event per expanded node, ``(node, g, f, frontier_size)``
+    with node as (row, col), and finally a SearchResult:
     - path: list of (row, col) tuples from start to goal, or None
-    - cost: total path length (number of steps)
+    - cost: total path length (number of steps, or summed terrain cost)
     - expanded_nodes: number of nodes explored
     - time_taken: execution time in seconds
+
+    Every iter_* engine streams like this; engines that do not track g or
+    f yield None for them. With events=False only the result is yielded.
+    time_taken and the SearchStats timers leave out the time the consumer
+    spends between events.
+
+    heuristic defaults to Manhattan (octile on 8-connected maps). On weighted
+    maps it is scaled by the cheapest terrain cost so it never overestimates.
+
+    stats: optional SearchStats to fill in (every engine takes it)
+    cancel: optional CancelToken, checked every CANCEL_INTERVAL expansions
+    (every engine takes it too)
     """
     start_time = time.time()
+    if stats is not None:
+        stats.start()
     
     if start is None:
         start = grid.start
     if goal is None:
         goal = grid.goal
+
+    adj = grid.freeze()
+    offsets, neighbors, weights, cols = adj.offsets, adj.neighbors, adj.weights, adj.cols
+    if heuristic is None:
+        heuristic = _default_heuristic(adj)
+    h_scale = adj.min_cost
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+    if _no_path(grid, start, goal):
+        yield _no_path_event(start_time, stats)
+        return
     
-    # Priority queue: (f_score, counter, current_pos, path, g_score)
+    # Priority queue: (f_score, counter, current_id, g_score)
     counter = 0
-    open_set = [(0, counter, start, [start], 0)]
-    closed_set = set()
+    open_set = [(0, counter, start_id, 0)]
+    best_g = [INF] * adj.size
+    best_g[start_id] = 0
+    parent = array("i", [-1]) * adj.size
+    closed = bytearray(adj.size)
     expanded_nodes = 0
-    expanded_order = []
+    if stats is not None:
+        stats.lap("setup")
     
     while open_set:
-        f_score, _, current, path, g_score = heapq.heappop(open_set)
+        f_score, _, current, g_score = heapq.heappop(open_set)
         
-        if current in closed_set:
+        if closed[current]:
+            if stats is not None:
+                stats.stale_pops += 1
             continue
         
-        closed_set.add(current)
+        closed[current] = 1
         expanded_nodes += 1
-        if trace:
-            expanded_order.append(current)
+        if cancel is not None and expanded_nodes % CANCEL_INTERVAL == 0:
+            cancel.check()
+        if events:
+            paused = time.time()
+            if stats is not None:
+                stats.pause()
+            yield (divmod(current, cols), g_score, f_score, len(open_set))
+            if stats is not None:
+                stats.resume()
+            start_time += time.time() - paused
+        if stats is not None:
+            stats.expand(len(open_set) + 1, offsets[current + 1] - offsets[current])
         
         # Check if goal reached
-        if current == goal:
-            time_taken = time.time() - start_time
-            if trace:
-                return path, len(path) - 1, expanded_nodes, time_taken, expanded_order
-            return path, len(path) - 1, expanded_nodes, time_taken
+        if current == goal_id:
+            if stats is not None:
+                stats.lap("search")
+            path = _reconstruct(parent, start_id, goal_id, cols)
+            if stats is not None:
+                stats.finish(expanded_nodes, len(open_set), "reconstruct")
+            yield SearchResult(path, g_score, expanded_nodes, time.time() - start_time)
+            return
         
         # Explore neighbors
-        for neighbor in grid.get_neighbors(current[0], current[1]):
-            if neighbor in closed_set:
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = neighbors[k]
+            new_g = g_score + (1 if weights is None else weights[k])
+            # An entry that does not improve g would only be popped as stale
+            if closed[neighbor] or new_g >= best_g[neighbor]:
                 continue
+            best_g[neighbor] = new_g
+            parent[neighbor] = current
             
-            new_g = g_score + 1
-            h = manhattan_distance(neighbor, goal)
+            h = heuristic(divmod(neighbor, cols), goal) * h_scale
             f = new_g + h
             
             counter += 1
-            heapq.heappush(open_set, (f, counter, neighbor, path + [neighbor], new_g))
+            heapq.heappush(open_set, (f, counter, neighbor, new_g))
     
     # No path found
-    time_taken = time.time() - start_time
-    if trace:
-        return None, 0, expanded_nodes, time_taken, expanded_order
-    return None, 0, expanded_nodes, time_taken
+    if stats is not None:
+        stats.finish(expanded_nodes, 0)
+    yield SearchResult(None, 0, expanded_nodes, time.time() - start_time)
+
+
+def run_astar(grid, start=None, goal=None, trace=False, heuristic=None, stats=None, cancel=None):
+    """A* with the standard result tuple (see iter_astar)
+
+    Returns (path, cost, expanded_nodes, time_taken), plus the expanded
+    order as a list of (row, col) when trace=True.
+    """
+    return _run_stream(iter_astar(grid, start, goal, heuristic, stats, events=trace, cancel=cancel), trace)
 
 
 # =========================
 # TEAM ALGORITHMS (to be added by team members)
 # =========================
 
-def run_dijkstra(grid, start=None, goal=None, trace=False):
+def iter_dijkstra(grid, start=None, goal=None, stats=None, events=True, cancel=None):
     """Yassin Farrag - Dijkstra implementation"""
     start_time = time.time()
+    if stats is not None:
+        stats.start()
 
     if start is None:
         start = grid.start
     if goal is None:
         goal = grid.goal
 
-    pq = [(0, start)]  # (distance, node)
-    dist = {start: 0}
-    parent = {start: None}
-    visited = set()
+    adj = grid.freeze()
+    offsets, neighbors, weights, cols = adj.offsets, adj.neighbors, adj.weights, adj.cols
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+    if _no_path(grid, start, goal):
+        yield _no_path_event(start_time, stats)
+        return
+
+    pq = [(0, start_id)]  # (distance, node)
+    dist = [INF] * adj.size
+    dist[start_id] = 0
+    parent = array("i", [-1]) * adj.size
+    visited = bytearray(adj.size)
     expanded_nodes = 0
-    expanded_order = []
+    if stats is not None:
+        stats.lap("setup")
 
     while pq:
         current_dist, current = heapq.heappop(pq)
 
-        if current in visited:
+        if visited[current]:
+            if stats is not None:
+                stats.stale_pops += 1
             continue
 
-        visited.add(current)
+        visited[current] = 1
         expanded_nodes += 1
-        if trace:
-            expanded_order.append(current)
-
-        if current == goal:
-            path = []
-            node = goal
-            while node is not None:
-                path.append(node)
-                node = parent.get(node)
-            path.reverse()
-            time_taken = time.time() - start_time
-            if trace:
-                return path, len(path) - 1, expanded_nodes, time_taken, expanded_order
-            return path, len(path) - 1, expanded_nodes, time_taken
+        if cancel is not None and expanded_nodes % CANCEL_INTERVAL == 0:
+            cancel.check()
+        if events:
+            paused = time.time()
+            if stats is not None:
+                stats.pause()
+            yield (divmod(current, cols), current_dist, current_dist, len(pq))
+            if stats is not None:
+                stats.resume()
+            start_time += time.time() - paused
+        if stats is not None:
+            stats.expand(len(pq) + 1, offsets[current + 1] - offsets[current])
 
-        for neighbor in grid.get_neighbors(current[0], current[1]):
-            if neighbor in visited:
+        if current == goal_id:
+            if stats is not None:
+                stats.lap("search")
+            path = _reconstruct(parent, start_id, goal_id, cols)
+            if stats is not None:
+                stats.finish(expanded_nodes, len(pq), "reconstruct")
+            yield SearchResult(path, current_dist, expanded_nodes, time.time() - start_time)
+            return
+
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = neighbors[k]
+            if visited[neighbor]:
                 continue
 
-            new_dist = current_dist + 1
-            if new_dist < dist.get(neighbor, float("inf")):
+            new_dist = current_dist + (1 if weights is None else weights[k])
+            if new_dist < dist[neighbor]:
                 dist[neighbor] = new_dist
                 parent[neighbor] = current
                 heapq.heappush(pq, (new_dist, neighbor))
 
-    time_taken = time.time() - start_time
-    if trace:
-        return None, 0, expanded_nodes, time_taken, expanded_order
-    return None, 0, expanded_nodes, time_taken
+    if stats is not None:
+        stats.finish(expanded_nodes, 0)
+    yield SearchResult(None, 0, expanded_nodes, time.time() - start_time)
+
+
+def run_dijkstra(grid, start=None, goal=None, trace=False, stats=None, cancel=None):
+    """Dijkstra with the standard result tuple (see iter_dijkstra)"""
+    return _run_stream(iter_dijkstra(grid, start, goal, stats, events=trace, cancel=cancel), trace)
 
 
-def run_greedy(grid, start=None, goal=None, heuristic=None, trace=False):
+def iter_greedy(grid, start=None, goal=None, heuristic=None, stats=None, events=True, cancel=None):
     """Andrew Emad - Greedy Best-First implementation
 
     Uses only h(n) to choose which node to expand (no g(n)).
-    The heuristic parameter allows selecting Manhattan (default) or Euclidean.
+    The heuristic parameter allows selecting Manhattan (default), Euclidean,
+    Octile or Chebyshev. On 8-connected maps the default is Octile.
     """
     start_time = time.time()
+    if stats is not None:
+        stats.start()
 
     if start is None:
         start = grid.start
     if goal is None:
         goal = grid.goal
 
-    # Default heuristic is Manhattan
-    if heuristic is None:
-        heuristic = manhattan
-
+    if _no_path(grid, start, goal):
+        yield _no_path_event(start_time, stats)
+        return
     if start == goal:
-        time_taken = time.time() - start_time
-        if trace:
-            return [start], 0, 0, time_taken, []
-        return [start], 0, 0, time_taken
+        if stats is not None:
+            stats.finish(0, 0, "setup")
+        yield SearchResult([start], 0, 0, time.time() - start_time)
+        return
+
+    adj = grid.freeze()
+    offsets, neighbors, cols = adj.offsets, adj.neighbors, adj.cols
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+
+    # Default heuristic is Manhattan (Octile with diagonal moves)
+    if heuristic is None:
+        heuristic = _default_heuristic(adj)
 
     # Greedy Best-First Search: choose next node using h(n) only
     frontier = []  # (h, tie, node)
     tie = 0
-    heapq.heappush(frontier, (heuristic(start, goal), tie, start))
+    heapq.heappush(frontier, (heuristic(start, goal), tie, start_id))
 
-    came_from = {start: None}
-    visited = set()
+    came_from = array("i", [-1]) * adj.size
+    came_from[start_id] = start_id
+    visited = bytearray(adj.size)
     expanded_nodes = 0
-    expanded_order = []
+    if stats is not None:
+        stats.lap("setup")
 
     while frontier:
-        _, _, current = heapq.heappop(frontier)
+        h_score, _, current = heapq.heappop(frontier)
 
-        if current in visited:
+        if visited[current]:
+            if stats is not None:
+                stats.stale_pops += 1
             continue
-        visited.add(current)
+        visited[current] = 1
         expanded_nodes += 1
-        if trace:
-            expanded_order.append(current)
-
-        if current == goal:
-            path = []
-            node = goal
-            while node is not None:
-                path.append(node)
-                node = came_from.get(node)
-            path.reverse()
-            time_taken = time.time() - start_time
-            if trace:
-                return path, len(path) - 1, expanded_nodes, time_taken, expanded_order
-            return path, len(path) - 1, expanded_nodes, time_taken
+        if cancel is not None and expanded_nodes % CANCEL_INTERVAL == 0:
+            cancel.check()
+        if events:
+            paused = time.time()
+            if stats is not None:
+                stats.pause()
+            yield (divmod(current, cols), None, h_score, len(frontier))
+            if stats is not None:
+                stats.resume()
+            start_time += time.time() - paused
+        if stats is not None:
+            stats.expand(len(frontier) + 1, offsets[current + 1] - offsets[current])
+
+        if current == goal_id:
+            if stats is not None:
+                stats.lap("search")
+            path = _reconstruct(came_from, start_id, goal_id, cols)
+            cost = _path_cost(adj, path)
+            if stats is not None:
+                stats.finish(expanded_nodes, len(frontier), "reconstruct")
+            yield SearchResult(path, cost, expanded_nodes, time.time() - start_time)
+            return
 
-        for nxt in grid.get_neighbors(current[0], current[1]):
-            if nxt in visited:
+        for k in range(offsets[current], offsets[current + 1]):
+            nxt = neighbors[k]
+            if visited[nxt]:
                 continue
-            if nxt not in came_from:
+            if came_from[nxt] == -1:
                 came_from[nxt] = current
             tie += 1
-            heapq.heappush(frontier, (heuristic(nxt, goal), tie, nxt))
+            heapq.heappush(frontier, (heuristic(divmod(nxt, cols), goal), tie, nxt))
+
+    if stats is not None:
+        stats.finish(expanded_nodes, 0)
+    yield SearchResult(None, 0, expanded_nodes, time.time() - start_time)
 
-    time_taken = time.time() - start_time
-    if trace:
-        return None, 0, expanded_nodes, time_taken, expanded_order
-    return None, 0, expanded_nodes, time_taken
 
+def run_greedy(grid, start=None, goal=None, heuristic=None, trace=False, stats=None, cancel=None):
+    """Greedy Best-First with the standard result tuple (see iter_greedy)"""
+    return _run_stream(iter_greedy(grid, start, goal, heuristic, stats, events=trace, cancel=cancel), trace)
 
-def run_bfs(grid, start=None, goal=None, trace=False):
+
+def iter_bfs(grid, start=None, goal=None, stats=None, events=True, cancel=None):
     """Belal Mohamed - BFS implementation"""
-    from collections import deque
-    
     start_time = time.time()
+    if stats is not None:
+        stats.start()
     if start is None:
         start = grid.start
     if goal is None:
         goal = grid.goal
+
+    adj = grid.freeze()
+    offsets, neighbors, cols = adj.offsets, adj.neighbors, adj.cols
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+    if _no_path(grid, start, goal):
+        yield _no_path_event(start_time, stats)
+        return
     
-    visited = set()
-    queue = deque([[start]])
+    # Nodes are marked when first queued; FIFO order means the first
+    # discovery is also the one that gets expanded, so its parent is final.
+    visited = bytearray(adj.size)
+    visited[start_id] = 1
+    parent = array("i", [-1]) * adj.size
+    queue = deque([start_id])
     expanded_nodes = 0
-    expanded_order = []
+    if stats is not None:
+        stats.lap("setup")
 
     while queue:
-        path = queue.popleft()
-        node = path[-1]
-        
-        if node in visited:
-            continue
+        node = queue.popleft()
         
-        visited.add(node)
         expanded_nodes += 1
-        if trace:
-            expanded_order.append(node)
+        if cancel is not None and expanded_nodes % CANCEL_INTERVAL == 0:
+            cancel.check()
+        if events:
+            paused = time.time()
+            if stats is not None:
+                stats.pause()
+            yield (divmod(node, cols), None, None, len(queue))
+            if stats is not None:
+                stats.resume()
+            start_time += time.time() - paused
+        if stats is not None:
+            stats.expand(len(queue) + 1, offsets[node + 1] - offsets[node])
         
-        if node == goal:
-            time_taken = time.time() - start_time
-            if trace:
-                return path, len(path) - 1, expanded_nodes, time_taken, expanded_order
-            return path, len(path) - 1, expanded_nodes, time_taken
+        if node == goal_id:
+            if stats is not None:
+                stats.lap("search")
+            path = _reconstruct(parent, start_id, goal_id, cols)
+            cost = _path_cost(adj, path)
+            if stats is not None:
+                stats.finish(expanded_nodes, len(queue), "reconstruct")
+            yield SearchResult(path, cost, expanded_nodes, time.time() - start_time)
+            return
         
-        for neighbor in grid.get_neighbors(node[0], node[1]):
-            if neighbor not in visited:
-                queue.append(path + [neighbor])
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[k]
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                parent[neighbor] = node
+                queue.append(neighbor)
     
-    time_taken = time.time() - start_time
-    if trace:
-        return None, 0, expanded_nodes, time_taken, expanded_order
-    return None, 0, expanded_nodes, time_taken
+    if stats is not None:
+        stats.finish(expanded_nodes, 0)
+    yield SearchResult(None, 0, expanded_nodes, time.time() - start_time)
+
 
+def run_bfs(grid, start=None, goal=None, trace=False, stats=None, cancel=None):
+    """BFS with the standard result tuple (see iter_bfs)"""
+    return _run_stream(iter_bfs(grid, start, goal, stats, events=trace, cancel=cancel), trace)
 
-def run_dfs(grid, start=None, goal=None, trace=False):
+
+def iter_dfs(grid, start=None, goal=None, stats=None, events=True, cancel=None):
     """Belal Mohamed - DFS implementation"""
     start_time = time.time()
+    if stats is not None:
+        stats.start()
     if start is None:
         start = grid.start
     if goal is None:
         goal = grid.goal
+
+    adj = grid.freeze()
+    offsets, neighbors, cols = adj.offsets, adj.neighbors, adj.cols
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+    if _no_path(grid, start, goal):
+        yield _no_path_event(start_time, stats)
+        return
     
-    visited = set()
-    stack = [[start]]
+    # The first time a node is popped it comes from its most recent push,
+    # so overwriting parent on every push yields the expanded path.
+    visited = bytearray(adj.size)
+    parent = array("i", [-1]) * adj.size
+    stack = [start_id]
     expanded_nodes = 0
-    expanded_order = []
+    if stats is not None:
+        stats.lap("setup")
     
     while stack:
-        path = stack.pop()
-        node = path[-1]
+        node = stack.pop()
         
-        if node in visited:
+        if visited[node]:
+            if stats is not None:
+                stats.stale_pops += 1
             continue
         
-        visited.add(node)
+        visited[node] = 1
         expanded_nodes += 1
-        if trace:
-            expanded_order.append(node)
+        if cancel is not None and expanded_nodes % CANCEL_INTERVAL == 0:
+            cancel.check()
+        if events:
+            paused = time.time()
+            if stats is not None:
+                stats.pause()
+            yield (divmod(node, cols), None, None, len(stack))
+            if stats is not None:
+                stats.resume()
+            start_time += time.time() - paused
+        if stats is not None:
+            stats.expand(len(stack) + 1, offsets[node + 1] - offsets[node])
         
-        if node == goal:
-            time_taken = time.time() - start_time
-            if trace:
-                return path, len(path) - 1, expanded_nodes, time_taken, expanded_order
-            return path, len(path) - 1, expanded_nodes, time_taken
+        if node == goal_id:
+            if stats is not None:
+                stats.lap("search")
+            path = _reconstruct(parent, start_id, goal_id, cols)
+            cost = _path_cost(adj, path)
+            if stats is not None:
+                stats.finish(expanded_nodes, len(stack), "reconstruct")
+            yield SearchResult(path, cost, expanded_nodes, time.time() - start_time)
+            return
         
-        neighbors = grid.get_neighbors(node[0], node[1])
-        for neighbor in reversed(neighbors):
-            if neighbor not in visited:
-                stack.append(path + [neighbor])
+        # Push in reverse so the first neighbor is explored first
+        for k in range(offsets[node + 1] - 1, offsets[node] - 1, -1):
+            neighbor = neighbors[k]
+            if not visited[neighbor]:
+                parent[neighbor] = node
+                stack.append(neighbor)
     
-    time_taken = time.time() - start_time
-    if trace:
-        return None, 0, expanded_nodes, time_taken, expanded_order
-    return None, 0, expanded_nodes, time_taken
+    if stats is not None:
+        stats.finish(expanded_nodes, 0)
+    yield SearchResult(None, 0, expanded_nodes, time.time() - start_time)
+
+
+def run_dfs(grid, start=None, goal=None, trace=False, stats=None, cancel=None):
+    """DFS with the standard result tuple (see iter_dfs)"""
+    return _run_stream(iter_dfs(grid, start, goal, stats, events=trace, cancel=cancel), trace)
+
+
+def _join_paths(parent_f, parent_b, start_id, goal_id, a, b, cols):
+    """Join a forward tree path start..a with a backward tree path b..goal.
+
+    ``a`` is reached by the forward search and ``b`` by the backward one;
+    they are either the same cell or neighbors. start_id and goal_id must
+    be cells of the map (callers check with _no_path first), or the walks
+    never reach them.
+    """
+    ids = [a]
+    node = a
+    while node != start_id:
+        node = parent_f[node]
+        ids.append(node)
+    ids.reverse()
+    node = b
+    if b != a:
+        ids.append(b)
+    while node != goal_id:
+        node = parent_b[node]
+        ids.append(node)
+    return [divmod(i, cols) for i in ids]
+
+
+def iter_bidirectional(grid, start=None, goal=None, heuristic=None, stats=None, events=True, cancel=None):
+    """Yassin Farrag - Bidirectional Search implementation
+
+    Bidirectional BFS: both sides grow one full layer at a time (smaller
+    frontier first). The search stops at the end of the first layer in
+    which the frontiers touch, keeping the shortest meeting edge found in
+    that layer. Passing a heuristic, or running on a map with terrain
+    costs (where layers no longer match distances), runs bidirectional A*
+    instead.
+    """
+    if heuristic is not None or grid.freeze().weights is not None:
+        yield from iter_bidirectional_astar(grid, start, goal, heuristic, stats, events, cancel)
+        return
+
+    start_time = time.time()
+    if stats is not None:
+        stats.start()
+    if start is None:
+        start = grid.start
+    if goal is None:
+        goal = grid.goal
+    # Before any index arithmetic: _join_paths walks the parent trees
+    # until it reaches start_id and goal_id, so both must be real cells
+    if _no_path(grid, start, goal):
+        yield _no_path_event(start_time, stats)
+        return
+
+    adj = grid.freeze()
+    offsets, neighbors, cols = adj.offsets, adj.neighbors, adj.cols
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+    expanded_nodes = 0
+
+    if start_id == goal_id:
+        if stats is not None:
+            stats.finish(1, 0, "setup")
+        if events:
+            yield (tuple(start), 0, None, 0)
+        yield SearchResult([start], 0, 1, time.time() - start_time)
+        return
+
+    dist_f = array("i", [-1]) * adj.size
+    dist_b = array("i", [-1]) * adj.size
+    parent_f = array("i", [-1]) * adj.size
+    parent_b = array("i", [-1]) * adj.size
+    dist_f[start_id] = 0
+    dist_b[goal_id] = 0
+    frontier_f = [start_id]
+    frontier_b = [goal_id]
+
+    best = -1
+    meet = None  # (forward-side cell, backward-side cell)
+    if stats is not None:
+        stats.lap("setup")
+
+    while frontier_f and frontier_b:
+        forward = len(frontier_f) <= len(frontier_b)
+        if forward:
+            frontier, dist, other, parent = frontier_f, dist_f, dist_b, parent_f
+        else:
+            frontier, dist, other, parent = frontier_b, dist_b, dist_f, parent_b
+
+        next_frontier = []
+        for node in frontier:
+            expanded_nodes += 1
+            if cancel is not None and expanded_nodes % CANCEL_INTERVAL == 0:
+                cancel.check()
+            if events:
+                paused = time.time()
+                if stats is not None:
+                    stats.pause()
+                frontier_size = len(frontier_f) + len(frontier_b) + len(next_frontier)
+                yield (divmod(node, cols), dist[node], None, frontier_size)
+                if stats is not None:
+                    stats.resume()
+                start_time += time.time() - paused
+            if stats is not None:
+                stats.expand(
+                    len(frontier_f) + len(frontier_b) + len(next_frontier),
+                    offsets[node + 1] - offsets[node],
+                )
+            depth = dist[node] + 1
+            for k in range(offsets[node], offsets[node + 1]):
+                neighbor = neighbors[k]
+                if other[neighbor] != -1:
+                    total = depth + other[neighbor]
+                    if best == -1 or total < best:
+                        best = total
+                        meet = (node, neighbor) if forward else (neighbor, node)
+                if dist[neighbor] == -1:
+                    dist[neighbor] = depth
+                    parent[neighbor] = node
+                    next_frontier.append(neighbor)
+
+        if best != -1:
+            if stats is not None:
+                stats.lap("search")
+            path = _join_paths(parent_f, parent_b, start_id, goal_id, meet[0], meet[1], cols)
+            if stats is not None:
+                remaining = len(next_frontier) + len(frontier_b if forward else frontier_f)
+                stats.finish(expanded_nodes, remaining, "reconstruct")
+            yield SearchResult(path, len(path) - 1, expanded_nodes, time.time() - start_time)
+            return
+
+        if forward:
+            frontier_f = next_frontier
+        else:
+            frontier_b = next_frontier
+
+    if stats is not None:
+        stats.finish(expanded_nodes, 0)
+    yield SearchResult(None, 0, expanded_nodes, time.time() - start_time)
+
+
+def run_bidirectional(grid, start=None, goal=None, trace=False, heuristic=None, stats=None, cancel=None):
+    """Bidirectional search with the standard result tuple (see iter_bidirectional)"""
+    return _run_stream(iter_bidirectional(grid, start, goal, heuristic, stats, events=trace, cancel=cancel), trace)
+
+
+def iter_bidirectional_astar(grid, start=None, goal=None, heuristic=None, stats=None, events=True, cancel=None):
+    """Yassin Farrag - Bidirectional A* (front-to-end) implementation
+
+    The forward search aims at the goal with h(n, goal), the backward search
+    aims at the start with h(n, start), and the side with the smaller open
+    list is expanded next. mu is the cheapest start-goal connection seen so
+    far. The search stops as soon as either open list's smallest f reaches
+    mu, because no unexpanded path can then beat it. The heuristic must be
+    consistent. Manhattan and Euclidean are on 4-connected maps; Octile,
+    Chebyshev and Euclidean are on 8-connected maps. Octile is the default
+    there. On weighted maps the heuristic is scaled by the cheapest terrain
+    cost.
+    """
+    start_time = time.time()
+    if stats is not None:
+        stats.start()
+    if start is None:
+        start = grid.start
+    if goal is None:
+        goal = grid.goal
+    # Checked first, as in iter_bidirectional: the join needs real cells
+    if _no_path(grid, start, goal):
+        yield _no_path_event(start_time, stats)
+        return
+
+    adj = grid.freeze()
+    offsets, neighbors, weights, cols = adj.offsets, adj.neighbors, adj.weights, adj.cols
+    if heuristic is None:
+        heuristic = _default_heuristic(adj)
+    h_scale = adj.min_cost
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+
+    g_f = [INF] * adj.size
+    g_b = [INF] * adj.size
+    parent_f = array("i", [-1]) * adj.size
+    parent_b = array("i", [-1]) * adj.size
+    closed_f = bytearray(adj.size)
+    closed_b = bytearray(adj.size)
+    g_f[start_id] = 0
+    g_b[goal_id] = 0
+
+    # Heap entries: (f_score, counter, node, g_score)
+    counter = 0
+    open_f = [(heuristic(start, goal) * h_scale, counter, start_id, 0)]
+    open_b = [(heuristic(goal, start) * h_scale, counter, goal_id, 0)]
+
+    mu = 0 if start_id == goal_id else INF
+    meet = start_id if start_id == goal_id else -1
+    expanded_nodes = 0
+    if stats is not None:
+        stats.lap("setup")
+
+    while open_f and open_b:
+        # Drop stale tops so the stopping test sees real keys
+        while open_f and (closed_f[open_f[0][2]] or open_f[0][3] > g_f[open_f[0][2]]):
+            heapq.heappop(open_f)
+            if stats is not None:
+                stats.stale_pops += 1
+        while open_b and (closed_b[open_b[0][2]] or open_b[0][3] > g_b[open_b[0][2]]):
+            heapq.heappop(open_b)
+            if stats is not None:
+                stats.stale_pops += 1
+        if not open_f or not open_b:
+            break
+        if open_f[0][0] >= mu or open_b[0][0] >= mu:
+            break
+
+        if len(open_f) <= len(open_b):
+            heap, g_this, g_other, parent, closed, target = open_f, g_f, g_b, parent_f, closed_f, goal
+        else:
+            heap, g_this, g_other, parent, closed, target = open_b, g_b, g_f, parent_b, closed_b, start
+
+        f_score, _, current, g_score = heapq.heappop(heap)
+        closed[current] = 1
+        expanded_nodes += 1
+        if cancel is not None and expanded_nodes % CANCEL_INTERVAL == 0:
+            cancel.check()
+        if events:
+            paused = time.time()
+            if stats is not None:
+                stats.pause()
+            yield (divmod(current, cols), g_score, f_score, len(open_f) + len(open_b))
+            if stats is not None:
+                stats.resume()
+            start_time += time.time() - paused
+        if stats is not None:
+            stats.expand(len(open_f) + len(open_b) + 1, offsets[current + 1] - offsets[current])
+
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = neighbors[k]
+            new_g = g_score + (1 if weights is None else weights[k])
+            if closed[neighbor] or new_g >= g_this[neighbor]:
+                continue
+            g_this[neighbor] = new_g
+            parent[neighbor] = current
+            counter += 1
+            h = heuristic(divmod(neighbor, cols), target) * h_scale
+            heapq.heappush(heap, (new_g + h, counter, neighbor, new_g))
+            total = new_g + g_other[neighbor]
+            if total < mu:
+                mu = total
+                meet = neighbor
+
+    if meet == -1:
+        if stats is not None:
+            stats.finish(expanded_nodes, len(open_f) + len(open_b))
+        yield SearchResult(None, 0, expanded_nodes, time.time() - start_time)
+        return
+
+    if stats is not None:
+        stats.lap("search")
+    path = _join_paths(parent_f, parent_b, start_id, goal_id, meet, meet, cols)
+    cost = _path_cost(adj, path)
+    if stats is not None:
+        stats.finish(expanded_nodes, len(open_f) + len(open_b), "reconstruct")
+    yield SearchResult(path, cost, expanded_nodes, time.time() - start_time)
+
+
+def run_bidirectional_astar(grid, start=None, goal=None, heuristic=None, trace=False, stats=None, cancel=None):
+    """Bidirectional A* with the standard result tuple (see iter_bidirectional_astar)"""
+    return _run_stream(iter_bidirectional_astar(grid, start, goal, heuristic, stats, events=trace, cancel=cancel), trace)
+
+
+# =========================
+# JUMP POINT SEARCH
+# =========================
+
+def _jps_plus_table(adj):
+    """Precompute JPS+ jump distances for every cell of a frozen map.
+
+    Returns four int arrays (east, west, south, north). A positive entry k
+    means the next jump point in that direction is k cells away. An entry
+    of -k (k >= 0) means there is no jump point and k walkable cells lie
+    before the next wall or edge. The goal is not encoded; run_jps checks
+    for it at query time. The table is cached in ``adj.derived``.
+    """
+    table = adj.derived.get("jps_plus")
+    if table is not None:
+        return table
+
+    rows, cols, blocked = adj.rows, adj.cols, adj.blocked
+    n = rows * cols
+    east = array("i", bytes(4 * n))
+    west = array("i", bytes(4 * n))
+    south = array("i", bytes(4 * n))
+    north = array("i", bytes(4 * n))
+
+    # Horizontal: cell j is a jump point when moving by dc if a vertical
+    # neighbor opens up right after being blocked.
+    for r in range(rows):
+        base = r * cols
+        has_up = r > 0
+        has_down = r < rows - 1
+        for dc, dist, cells in ((1, east, range(cols - 2, -1, -1)), (-1, west, range(1, cols))):
+            for c in cells:
+                j = base + c + dc
+                if blocked[j]:
+                    dist[j - dc] = 0
+                elif (has_up and not blocked[j - cols] and blocked[j - cols - dc]) or (
+                    has_down and not blocked[j + cols] and blocked[j + cols - dc]
+                ):
+                    dist[j - dc] = 1
+                else:
+                    d = dist[j]
+                    dist[j - dc] = d + 1 if d > 0 else d - 1
+
+    # Vertical: additionally stop wherever a horizontal jump would succeed.
+    for dr, dist, rows_order in ((1, south, range(rows - 2, -1, -1)), (-1, north, range(1, rows))):
+        step = dr * cols
+        for r in rows_order:
+            base = r * cols
+            for c in range(cols):
+                j = base + c + step
+                if blocked[j]:
+                    dist[j - step] = 0
+                elif (
+                    (c > 0 and not blocked[j - 1] and blocked[j - 1 - step])
+                    or (c < cols - 1 and not blocked[j + 1] and blocked[j + 1 - step])
+                    or east[j] > 0
+                    or west[j] > 0
+                ):
+                    dist[j - step] = 1
+                else:
+                    d = dist[j]
+                    dist[j - step] = d + 1 if d > 0 else d - 1
+
+    table = (east, west, south, north)
+    adj.derived["jps_plus"] = table
+    return table
+
+
+def iter_jps(grid, start=None, goal=None, plus=False, stats=None, events=True, cancel=None):
+    """Jump Point Search for uniform-cost 4-connected grids
+
+    A* over jump points only: straight runs with no forced neighbors are
+    skipped in one step instead of being pushed cell by cell. Successors
+    are pruned by the direction of travel:
+    - moving horizontally, turn only at cells where a blocked vertical
+      neighbor opens up, and
+    - moving vertically, stop wherever a horizontal scan would find a jump
+      point.
+
+    With plus=True (JPS+) the scans are replaced by jump distances
+    precomputed once per frozen map (see _jps_plus_table).
+
+    The returned path is the full cell path, so cost matches run_astar.
+    expanded_nodes counts expanded jump points. Jumping as done here is only
+    valid on uniform 4-connected maps, so maps with terrain costs or
+    diagonal moves fall back to run_astar.
+    """
+    start_time = time.time()
+    if stats is not None:
+        stats.start()
+    if start is None:
+        start = grid.start
+    if goal is None:
+        goal = grid.goal
+
+    adj = grid.freeze()
+    if adj.weights is not None:
+        yield from iter_astar(grid, start, goal, stats=stats, events=events, cancel=cancel)
+        return
+    rows, cols, blocked = adj.rows, adj.cols, adj.blocked
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+    if _no_path(grid, start, goal):
+        yield _no_path_event(start_time, stats)
+        return
+    goal_r, goal_c = goal
+
+    if plus:
+        east, west, south, north = _jps_plus_table(adj)
+
+        def jump_h(r, c, dc):
+            d = (east if dc > 0 else west)[r * cols + c]
+            reach = d if d > 0 else -d
+            if r == goal_r and 0 < (goal_c - c) * dc <= reach:
+                return goal_id
+            return r * cols + c + d * dc if d > 0 else -1
+
+        def jump_v(r, c, dr):
+            d = (south if dr > 0 else north)[r * cols + c]
+            reach = d if d > 0 else -d
+            # Stop on the goal's row; the horizontal scan from there decides
+            if 0 < (goal_r - r) * dr <= reach:
+                return goal_r * cols + c
+            return (r + d * dr) * cols + c if d > 0 else -1
+    else:
+        def jump_h(r, c, dc):
+            base = r * cols
+            has_up = r > 0
+            has_down = r < rows - 1
+            while True:
+                c += dc
+                if c < 0 or c >= cols:
+                    return -1
+                i = base + c
+                if blocked[i]:
+                    return -1
+                if i == goal_id:
+                    return i
+                if has_up and not blocked[i - cols] and blocked[i - cols - dc]:
+                    return i
+                if has_down and not blocked[i + cols] and blocked[i + cols - dc]:
+                    return i
+
+        def jump_v(r, c, dr):
+            step = dr * cols
+            while True:
+                r += dr
+                if r < 0 or r >= rows:
+                    return -1
+                i = r * cols + c
+                if blocked[i]:
+                    return -1
+                if i == goal_id:
+                    return i
+                if c > 0 and not blocked[i - 1] and blocked[i - 1 - step]:
+                    return i
+                if c < cols - 1 and not blocked[i + 1] and blocked[i + 1 - step]:
+                    return i
+                if jump_h(r, c, 1) != -1 or jump_h(r, c, -1) != -1:
+                    return i
+
+    # Priority queue: (f_score, counter, node, g_score)
+    counter = 0
+    open_set = [(abs(start[0] - goal_r) + abs(start[1] - goal_c), counter, start_id, 0)]
+    best_g = {start_id: 0}
+    parent = {start_id: -1}
+    closed = set()
+    expanded_nodes = 0
+    if stats is not None:
+        stats.lap("setup")
+
+    while open_set:
+        f_score, _, current, g_score = heapq.heappop(open_set)
+        if current in closed:
+            if stats is not None:
+                stats.stale_pops += 1
+            continue
+        closed.add(current)
+        expanded_nodes += 1
+        if cancel is not None and expanded_nodes % CANCEL_INTERVAL == 0:
+            cancel.check()
+        if events:
+            paused = time.time()
+            if stats is not None:
+                stats.pause()
+            yield (divmod(current, cols), g_score, f_score, len(open_set))
+            if stats is not None:
+                stats.resume()
+            start_time += time.time() - paused
+
+        if current == goal_id:
+            if stats is not None:
+                stats.lap("search")
+            path = _expand_jumps(parent, goal_id, cols)
+            if stats is not None:
+                stats.finish(expanded_nodes, len(open_set), "reconstruct")
+            yield SearchResult(path, len(path) - 1, expanded_nodes, time.time() - start_time)
+            return
+
+        r, c = divmod(current, cols)
+        p = parent[current]
+        if p == -1:
+            successors = (jump_v(r, c, -1), jump_v(r, c, 1), jump_h(r, c, -1), jump_h(r, c, 1))
+        else:
+            pr, pc = divmod(p, cols)
+            if pr == r:
+                dc = 1 if c > pc else -1
+                successors = (jump_v(r, c, -1), jump_v(r, c, 1), jump_h(r, c, dc))
+            else:
+                dr = 1 if r > pr else -1
+                successors = (jump_v(r, c, dr), jump_h(r, c, -1), jump_h(r, c, 1))
+        if stats is not None:
+            stats.expand(len(open_set) + 1, len(successors))
+
+        for nxt in successors:
+            if nxt == -1 or nxt in closed:
+                continue
+            nr, nc = divmod(nxt, cols)
+            new_g = g_score + abs(nr - r) + abs(nc - c)
+            if new_g >= best_g.get(nxt, INF):
+                continue
+            best_g[nxt] = new_g
+            parent[nxt] = current
+            counter += 1
+            heapq.heappush(open_set, (new_g + abs(nr - goal_r) + abs(nc - goal_c), counter, nxt, new_g))
+
+    if stats is not None:
+        stats.finish(expanded_nodes, 0)
+    yield SearchResult(None, 0, expanded_nodes, time.time() - start_time)
+
+
+def run_jps(grid, start=None, goal=None, trace=False, plus=False, stats=None, cancel=None):
+    """Jump Point Search with the standard result tuple (see iter_jps)"""
+    return _run_stream(iter_jps(grid, start, goal, plus, stats, events=trace, cancel=cancel), trace)
+
+
+def _expand_jumps(parent, goal_id, cols):
+    """Turn a chain of jump points into the full (row, col) path"""
+    points = []
+    node = goal_id
+    while node != -1:
+        points.append(divmod(node, cols))
+        node = parent[node]
+    points.reverse()
+
+    path = [points[0]]
+    for r2, c2 in points[1:]:
+        r, c = path[-1]
+        dr = (r2 > r) - (r2 < r)
+        dc = (c2 > c) - (c2 < c)
+        while (r, c) != (r2, c2):
+            r += dr
+            c += dc
+            path.append((r, c))
+    return path
+
+
+# =========================
+# STREAMING ANY ALGORITHM
+# =========================
+
+# run_* function -> its search stream (see iter_astar). Other modules
+# register theirs here too (e.g. landmarks.py).
+STREAMS = {
+    run_astar: iter_astar,
+    run_dijkstra: iter_dijkstra,
+    run_greedy: iter_greedy,
+    run_bfs: iter_bfs,
+    run_dfs: iter_dfs,
+    run_bidirectional: iter_bidirectional,
+    run_bidirectional_astar: iter_bidirectional_astar,
+    run_jps: iter_jps,
+}
+
+
+def _replay(func, grid, start, goal, **kwargs):
+    """Stream a function that has no generator: run it traced, then replay"""
+    path, cost, expanded_nodes, time_taken, expanded_order = func(grid, start, goal, trace=True, **kwargs)
+    for node in expanded_order:
+        yield (node, None, None, None)
+    yield SearchResult(path, cost, expanded_nodes, time_taken)
+
+
+def search_events(func, grid, start=None, goal=None, **kwargs):
+    """Search stream for any run_* function, lazy wherever it has a generator.
+
+    Functions without one (flow fields, HPA*) run to completion on the
+    first next() and their expanded order is replayed as events.
+    """
+    stream = STREAMS.get(func)
+    if stream is None:
+        return _replay(func, grid, start, goal, **kwargs)
+    return stream(grid, start, goal, **kwargs)
+
+
+# =========================
+# BATCH QUERIES
+# =========================
+
+class SearchBuffers:
+    """Per-map search state that can be reused across many queries.
+
+    Instead of clearing g/parent/closed arrays before every query, each
+    query gets a new generation number. A cell's g and parent only count if
+    ``seen[cell] == generation``, and it is closed if
+    ``closed[cell] == generation``. Starting a query is therefore O(1)
+    whatever the map size.
+    """
+
+    __slots__ = ("size", "g", "parent", "seen", "closed", "queue", "heap", "generation")
+
+    def __init__(self, size):
+        self.size = size
+        self.g = array("d", bytes(8 * size))
+        self.parent = array("i", bytes(4 * size))
+        self.seen = array("I", bytes(4 * size))
+        self.closed = array("I", bytes(4 * size))
+        self.queue = array("i", bytes(4 * size))  # BFS queue; each cell enters once
+        self.heap = []
+        self.generation = 0
+
+    def next_generation(self):
+        """Start a new query and return its generation number"""
+        self.generation += 1
+        if self.generation > 0xFFFFFFFF:
+            # Stamps would wrap around; clear them once and start over
+            self.seen = array("I", bytes(4 * self.size))
+            self.closed = array("I", bytes(4 * self.size))
+            self.generation = 1
+        self.heap.clear()
+        return self.generation
+
+
+class BatchResult:
+    """Columnar results of run_batch, one row per (start, goal) pair.
+
+    ``found`` is a bytearray and ``cost``, ``expanded`` and ``time`` are
+    typed arrays. Paths are kept CSR-style: the cells of path ``i`` are
+    ``path_cells[path_offsets[i]:path_offsets[i + 1]]`` as flat indices.
+    Indexing a BatchResult returns the usual
+    (path, cost, expanded_nodes, time_taken) tuple for that row. The cost
+    column is always float64; with integer_costs (uniform 4-connected
+    maps) indexing turns the cost back into an int, as run_* return it.
+    """
+
+    __slots__ = ("cols", "integer_costs", "found", "cost", "expanded", "time", "path_offsets", "path_cells")
+
+    def __init__(self, cols, integer_costs=False):
+        self.cols = cols
+        self.integer_costs = integer_costs
+        self.found = bytearray()
+        self.cost = array("d")
+        self.expanded = array("q")
+        self.time = array("d")
+        self.path_offsets = array("q", [0])
+        self.path_cells = array("i")
+
+    def __len__(self):
+        return len(self.found)
+
+    def __getitem__(self, i):
+        cost = int(self.cost[i]) if self.integer_costs else self.cost[i]
+        return self.path(i), cost, self.expanded[i], self.time[i]
+
+    def path(self, i):
+        """Path of row i as (row, col) tuples, or None if no path was found"""
+        if not self.found[i]:
+            return None
+        cols = self.cols
+        cells = self.path_cells[self.path_offsets[i]:self.path_offsets[i + 1]]
+        return [divmod(c, cols) for c in cells]
+
+    def _append(self, found, cost, expanded, time_taken, cells=None):
+        self.found.append(1 if found else 0)
+        self.cost.append(cost)
+        self.expanded.append(expanded)
+        self.time.append(time_taken)
+        if cells:
+            self.path_cells.extend(cells)
+        self.path_offsets.append(len(self.path_cells))
+
+
+def _batch_best_first(adj, buf, start_id, goal_id, goal, heuristic, h_scale):
+    """A* (or Dijkstra when heuristic is None) on generation-stamped buffers.
+
+    Ties are broken like the engines it stands in for: by insertion order
+    for A* (iter_astar's counter), by cell index for Dijkstra
+    (iter_dijkstra's (distance, node) entries), so expansion counts match.
+    """
+    offsets, neighbors, weights, cols = adj.offsets, adj.neighbors, adj.weights, adj.cols
+    gen = buf.next_generation()
+    g, parent, seen, closed, heap = buf.g, buf.parent, buf.seen, buf.closed, buf.heap
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    g[start_id] = 0
+    parent[start_id] = -1
+    seen[start_id] = gen
+    counter = 0
+    heap.append((0, counter, start_id, 0))
+    expanded_nodes = 0
+
+    # Closed cells are not checked while relaxing: with a consistent
+    # heuristic their g is already optimal, so the g test rejects them.
+    while heap:
+        _, _, current, g_score = heappop(heap)
+        if closed[current] == gen:
+            continue
+        closed[current] = gen
+        expanded_nodes += 1
+        if current == goal_id:
+            return g_score, expanded_nodes
+
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = neighbors[k]
+            new_g = g_score + (1 if weights is None else weights[k])
+            if seen[neighbor] == gen and new_g >= g[neighbor]:
+                continue
+            seen[neighbor] = gen
+            g[neighbor] = new_g
+            parent[neighbor] = current
+            counter += 1
+            if heuristic is None:
+                heappush(heap, (new_g, neighbor, neighbor, new_g))
+            else:
+                h = heuristic(divmod(neighbor, cols), goal) * h_scale
+                heappush(heap, (new_g + h, counter, neighbor, new_g))
+
+    return None, expanded_nodes
+
+
+def _batch_bfs(adj, buf, start_id, goal_id):
+    """BFS on generation-stamped buffers with a flat preallocated queue"""
+    offsets, neighbors = adj.offsets, adj.neighbors
+    gen = buf.next_generation()
+    parent, seen, queue = buf.parent, buf.seen, buf.queue
+
+    parent[start_id] = -1
+    seen[start_id] = gen
+    queue[0] = start_id
+    head, tail = 0, 1
+    expanded_nodes = 0
+
+    while head < tail:
+        node = queue[head]
+        head += 1
+        expanded_nodes += 1
+        if node == goal_id:
+            return True, expanded_nodes
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[k]
+            if seen[neighbor] != gen:
+                seen[neighbor] = gen
+                parent[neighbor] = node
+                queue[tail] = neighbor
+                tail += 1
+
+    return False, expanded_nodes
+
+
+def run_batch(grid, pairs, algorithm=None, heuristic=None, buffers=None, keep_paths=True):
+    """Answer many (start, goal) queries against one grid.
+
+    algorithm is one of the run_* functions (default run_astar).
+    run_astar, run_dijkstra and run_bfs use dedicated kernels that share
+    one SearchBuffers across all queries: no per-query allocation of
+    g/parent/closed state, and one reused heap or queue. Pass a
+    SearchBuffers as ``buffers`` to keep reusing it across batches. Any
+    other run_* function is called once per pair, with ``heuristic=`` if
+    it takes one (so run_bidirectional runs bidirectional A*, as it does
+    when called directly with a heuristic).
+
+    Returns a BatchResult (columnar). Set keep_paths=False to skip path
+    reconstruction when only costs and counts are needed.
+    """
+    if algorithm is None:
+        algorithm = run_astar
+
+    adj = grid.freeze()
+    cols = adj.cols
+    result = BatchResult(cols, integer_costs=adj.weights is None)
+
+    kernel = {run_astar: "astar", run_dijkstra: "dijkstra", run_bfs: "bfs"}.get(algorithm)
+    if kernel is None:
+        kwargs = {}
+        if heuristic is not None and "heuristic" in inspect.signature(algorithm).parameters:
+            kwargs["heuristic"] = heuristic
+        for start, goal in pairs:
+            path, cost, expanded, time_taken = algorithm(grid, start, goal, **kwargs)
+            cells = [r * cols + c for r, c in path] if (path and keep_paths) else None
+            result._append(path is not None, cost, expanded, time_taken, cells)
+        return result
+
+    if buffers is None or buffers.size != adj.size:
+        buffers = SearchBuffers(adj.size)
+    if kernel == "astar" and heuristic is None:
+        heuristic = _default_heuristic(adj)
+    h_scale = adj.min_cost
+    parent = buffers.parent
+
+    for start, goal in pairs:
+        start_time = time.perf_counter()
+        start_id = start[0] * cols + start[1]
+        goal_id = goal[0] * cols + goal[1]
+        if _no_path(grid, start, goal):
+            result._append(False, 0, 0, time.perf_counter() - start_time)
+            continue
+
+        if kernel == "bfs":
+            found, expanded = _batch_bfs(adj, buffers, start_id, goal_id)
+            cost = None
+        else:
+            cost, expanded = _batch_best_first(
+                adj, buffers, start_id, goal_id, goal,
+                heuristic if kernel == "astar" else None, h_scale,
+            )
+            found = cost is not None
+
+        cells = None
+        if found and (keep_paths or cost is None):
+            cells = [goal_id]
+            node = goal_id
+            while node != start_id:
+                node = parent[node]
+                cells.append(node)
+            cells.reverse()
+            if cost is None:
+                cost = adj.path_cost(cells)
+        result._append(
+            found, cost if found else 0, expanded, time.perf_counter() - start_time,
+            cells if keep_paths else None,
+        )
+
+    return result
+
+
+# =========================
+# INCREMENTAL REPLANNING
+# =========================
+
+class IncrementalPlanner:
+    """D* Lite planner that keeps its search tree between map edits.
+
+    The search runs backwards from the goal, so edits near the walker and
+    moves of the start only repair the part of the tree they invalidate
+    instead of searching again from scratch. Edit the grid as usual
+    (set_wall, clear_wall, set_cost); the next plan() finds the changed
+    cells by diffing against a snapshot of the occupancy and cost buffers,
+    which is cheap when the grid version has not moved at all.
+
+    plan() returns the usual (path, cost, expanded_nodes, time_taken) tuple,
+    where expanded_nodes counts only the work done by that call. Changing
+    the goal, the grid size or the movement rules starts a fresh search.
+    """
+
+    def __init__(self, grid, start=None, goal=None, heuristic=None):
+        self.grid = grid
+        self.start = tuple(grid.start if start is None else start)
+        self.goal = tuple(grid.goal if goal is None else goal)
+        self.heuristic = heuristic
+        self.total_expanded = 0
+        self.resets = 0
+        self._reset()
+
+    def _reset(self):
+        grid = self.grid
+        self._rows, self._cols = grid.rows, grid.cols
+        self._movement = (grid.diagonal, grid.corner_cutting)
+        self._version = grid.version
+        self._snapshot = grid.snapshot()
+        self._h_scale = 1 if grid.costs is None else max(1, min(grid.costs))
+        if self.heuristic is not None:
+            self._h = self.heuristic
+        else:
+            self._h = octile if grid.diagonal else manhattan
+
+        size = grid.rows * grid.cols
+        self._g = array("d", [INF]) * size
+        self._rhs = array("d", [INF]) * size
+        self._queue = []
+        self._queued = {}  # cell -> key of its live queue entry
+        self._km = 0.0
+        self._start_id = self.start[0] * grid.cols + self.start[1]
+        self._goal_id = self.goal[0] * grid.cols + self.goal[1]
+        self._last_id = self._start_id
+        if grid.in_bounds(*self.goal):  # plan() reports no path otherwise
+            self._rhs[self._goal_id] = 0.0
+            self._update(self._goal_id)
+        self.resets += 1
+
+    def move_start(self, start):
+        """Move the start (e.g. the walker advanced) without losing the search"""
+        start = tuple(start)
+        if start == self.start:
+            return
+        new_id = start[0] * self._cols + start[1]
+        self._km += self._heuristic(self._last_id, new_id)
+        self._last_id = new_id
+        self._start_id = new_id
+        self.start = start
+
+    def set_goal(self, goal):
+        """Switch to a new goal; the backward search has to start over"""
+        goal = tuple(goal)
+        if goal != self.goal:
+            self.goal = goal
+            self._reset()
+
+    def _heuristic(self, a, b):
+        cols = self._cols
+        return self._h(divmod(a, cols), divmod(b, cols)) * self._h_scale
+
+    def _key(self, u):
+        m = min(self._g[u], self._rhs[u])
+        return (m + self._heuristic(self._start_id, u) + self._km, m)
+
+    def _update(self, u):
+        if self._g[u] != self._rhs[u]:
+            key = self._key(u)
+            if self._queued.get(u) != key:
+                self._queued[u] = key
+                heapq.heappush(self._queue, (key[0], key[1], u))
+        else:
+            self._queued.pop(u, None)
+
+    def _successors(self, u):
+        """(neighbor, edge cost) pairs of u on the grid as it is now"""
+        grid = self.grid
+        cells, cols, rows = grid._cells, self._cols, self._rows
+        if cells[u]:
+            return []
+        row, col = divmod(u, cols)
+        out = []
+        if row > 0 and not cells[u - cols]:
+            out.append(u - cols)
+        if row < rows - 1 and not cells[u + cols]:
+            out.append(u + cols)
+        if col > 0 and not cells[u - 1]:
+            out.append(u - 1)
+        if col < cols - 1 and not cells[u + 1]:
+            out.append(u + 1)
+        straight = len(out)
+        if grid.diagonal:
+            for dr, dc in DIAGONALS:
+                if grid._diagonal_ok(row, col, dr, dc):
+                    out.append(u + dr * cols + dc)
+
+        costs = grid.costs
+        if costs is None:
+            return [(v, 1 if k < straight else SQRT2) for k, v in enumerate(out)]
+        cu = costs[u]
+        return [
+            (v, (cu + costs[v]) / 2 * (1 if k < straight else SQRT2))
+            for k, v in enumerate(out)
+        ]
+
+    def _recompute_rhs(self, u):
+        if u == self._goal_id:
+            return
+        g = self._g
+        best = INF
+        for v, w in self._successors(u):
+            if w + g[v] < best:
+                best = w + g[v]
+        self._rhs[u] = best
+
+    def _sync(self):
+        """Pick up edits made to the grid since the last plan()"""
+        grid = self.grid
+        if grid.version == self._version:
+            return
+        if (
+            (grid.rows, grid.cols) != (self._rows, self._cols)
+            or (grid.diagonal, grid.corner_cutting) != self._movement
+            or (grid.costs is not None and min(grid.costs) < self._h_scale)
+        ):
+            self._reset()
+            return
+
+        changed = grid.changed_cells(self._snapshot)
+        self._snapshot = grid.snapshot()
+        self._version = grid.version
+
+        # A changed cell alters its own edges and, on 8-connected maps, the
+        # diagonal moves squeezing past it, all of which start next to it
+        rows, cols = self._rows, self._cols
+        steps = ((-1, 0), (1, 0), (0, -1), (0, 1)) + (DIAGONALS if grid.diagonal else ())
+        affected = set()
+        for x in changed:
+            affected.add(x)
+            row, col = divmod(x, cols)
+            for dr, dc in steps:
+                nr, nc = row + dr, col + dc
+                if 0 <= nr < rows and 0 <= nc < cols:
+                    affected.add(nr * cols + nc)
+        for u in affected:
+            self._recompute_rhs(u)
+            self._update(u)
+
+    def _compute(self, expanded_order):
+        g, rhs = self._g, self._rhs
+        queue, queued = self._queue, self._queued
+        start_id, goal_id, cols = self._start_id, self._goal_id, self._cols
+        expanded = 0
+        while queue:
+            k1, k2, u = queue[0]
+            if queued.get(u) != (k1, k2):
+                heapq.heappop(queue)  # stale entry
+                continue
+            # Keys along an optimal path tie with the start's key in exact
+            # arithmetic; treat float near-ties as "not yet past the start"
+            s1, s2 = self._key(start_id)
+            tol = 1e-9 * max(1.0, s1) if s1 < INF else 0.0
+            before_start = k1 < s1 - tol or (abs(k1 - s1) <= tol and k2 <= s2 + tol)
+            if not (before_start or rhs[start_id] != g[start_id]):
+                break
+            heapq.heappop(queue)
+            del queued[u]
+            new_key = self._key(u)
+            if (k1, k2) < new_key:
+                queued[u] = new_key
+                heapq.heappush(queue, (new_key[0], new_key[1], u))
+                continue
+
+            expanded += 1
+            if expanded_order is not None:
+                expanded_order.append(divmod(u, cols))
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                gu = g[u]
+                for v, w in self._successors(u):
+                    if v != goal_id and w + gu < rhs[v]:
+                        rhs[v] = w + gu
+                        self._update(v)
+            else:
+                g[u] = INF
+                self._recompute_rhs(u)
+                self._update(u)
+                for v, _ in self._successors(u):
+                    self._recompute_rhs(v)
+                    self._update(v)
+        return expanded
+
+    def plan(self, trace=False):
+        """Repair the search after any edits and return the current path"""
+        start_time = time.time()
+        if _no_path(self.grid, self.start, self.goal):
+            return _no_path_result(start_time, trace)
+        self._sync()
+        expanded_order = [] if trace else None
+        expanded_nodes = self._compute(expanded_order)
+        self.total_expanded += expanded_nodes
+
+        g, cols = self._g, self._cols
+        node, goal_id = self._start_id, self._goal_id
+        path = None
+        cost = 0
+        if g[node] < INF:
+            ids = [node]
+            while node != goal_id and len(ids) <= len(g):
+                best, nxt = INF, -1
+                for v, w in self._successors(node):
+                    if w + g[v] < best:
+                        best, nxt = w + g[v], v
+                if nxt < 0:
+                    break
+                node = nxt
+                ids.append(node)
+            if node == goal_id:
+                path = [divmod(i, cols) for i in ids]
+                cost = g[self._start_id]
+                if self.grid.costs is None and not self.grid.diagonal:
+                    cost = int(cost)
+
+        time_taken = time.time() - start_time
+        if trace:
+            return path, cost, expanded_nodes, time_taken, expanded_order
+        return path, cost, expanded_nodes, time_taken
+
+
+# =========================
+# RESULT CACHE
+# =========================
+
+class ResultCache:
+    """Bounded LRU memo of search results.
+
+    Entries are keyed on the grid's version stamp, the search function,
+    its keyword arguments (e.g. the heuristic) and the endpoints. Every
+    grid edit (walls, costs, movement, start, goal) gives the grid a new
+    version, so entries for an old layout are never hit again and age out.
+    Paths and traces are stored as flat cell indices in typed arrays.
+    ``nbytes`` tracks their approximate size. Least-recently-used entries
+    are evicted once either ``max_entries`` or ``max_bytes`` is exceeded.
+
+    A hit returns the stored result, including the time_taken measured
+    when the search actually ran.
+
+    Only the GUI uses one: there the same search on the same map repeats
+    (Run again, Run All). Batch runners (report mode,
+    benchmark.py, movingai.py) build each map fresh and run each search
+    once, so a cache could never hit; they time every run cold.
+    """
+
+    ENTRY_OVERHEAD = 256  # rough bytes per entry for the key, tuple and dict slot
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.last_hit = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Drop every entry (the counters are kept)"""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """Counters as a dict, e.g. for a metrics panel"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def run(self, func, grid, start=None, goal=None, trace=False, **kwargs):
+        """Return func(grid, start, goal, trace=trace, **kwargs), from the cache if possible"""
+        stats = kwargs.pop("stats", None)
+        cancel = kwargs.pop("cancel", None)
+        if stats is not None:
+            # Instrumented runs must really search: never answered or stored here
+            return func(grid, start, goal, trace=trace, stats=stats, cancel=cancel, **kwargs)
+        if start is None:
+            start = grid.start
+        if goal is None:
+            goal = grid.goal
+        key = (grid.version, func, tuple(start), tuple(goal), tuple(sorted(kwargs.items())))
+        cols = grid.cols
+
+        entry = self._entries.get(key)
+        # A traced entry can answer both kinds of call; an untraced one cannot
+        if entry is not None and (not trace or entry[4] is not None):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.last_hit = True
+            path_ids, cost, expanded, time_taken, order_ids, _ = entry
+            path = None if path_ids is None else [divmod(i, cols) for i in path_ids]
+            if trace:
+                return path, cost, expanded, time_taken, [divmod(i, cols) for i in order_ids]
+            return path, cost, expanded, time_taken
 
+        self.misses += 1
+        self.last_hit = False
+        if cancel is not None:
+            kwargs["cancel"] = cancel  # not part of the key: it never changes the result
+        result = func(grid, start, goal, trace=trace, **kwargs)
+        path, cost, expanded, time_taken = result[:4]
+        path_ids = None if path is None else array("i", [r * cols + c for r, c in path])
+        order_ids = array("i", [r * cols + c for r, c in result[4]]) if trace else None
+        size = self.ENTRY_OVERHEAD
+        if path_ids is not None:
+            size += path_ids.itemsize * len(path_ids)
+        if order_ids is not None:
+            size += order_ids.itemsize * len(order_ids)
 
-def run_bidirectional(grid, start=None, goal=None):
-    """Yassin Farrag - Bidirectional Search implementation"""
-    # TODO: Yassin will implement this
-    return None, 0, 0, 0.0
\ No newline at end of file
+        if entry is not None:
+            self.nbytes -= entry[5]
+        self._entries[key] = (path_ids, cost, expanded, time_taken, order_ids, size)
+        self._entries.move_to_end(key)
+        self.nbytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, old = self._entries.popitem(last=False)
+            self.nbytes -= old[5]
+            self.evictions += 1
+        return result
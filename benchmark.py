@@ -0,0 +1,340 @@
+"""
+benchmark.py - Headless benchmark suite on large generated maps
+
+    python benchmark.py --sizes 64,256,1024 --output bench.json
+    python benchmark.py --sizes 64,256,1024 --baseline bench.json
+
+Maps are generated from a seed (open floor, random obstacles, a maze, and
+rooms joined by doors), so the same arguments give the same maps on every
+machine. Every algorithm registered in main.py runs on every map. Time,
+expanded nodes and peak traced memory go to a JSON file. With
+--baseline, times are compared against an earlier run: any algorithm that
+became slower by more than --threshold makes the run exit with status 1.
+Baselines are only meaningful on the same machine.
+
+Timings exclude map generation, Grid.freeze() and the component index,
+which every algorithm shares. Per-algorithm tables (JPS+, HPA*, landmarks,
+flow fields) are dropped before each run, so they are timed too.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from fields import np
+from grid.grid import Grid
+from main import ALGORITHMS
+
+
+FORMAT_VERSION = 1
+DEFAULT_SIZES = (64, 256, 1024)
+ALL_SIZES = (64, 128, 256, 512, 1024, 2048, 4096)
+ROOM_SIZE = 16  # rooms-and-doors: room pitch, including one wall line
+EXTRA_DOOR_PROB = 0.25  # doors beyond the spanning tree, so there are loops
+DEFAULT_THRESHOLD = 0.25  # fail when more than 25% slower than the baseline
+MIN_DELTA = 0.002  # seconds; smaller slowdowns are treated as noise
+
+
+# =========================
+# MAP GENERATORS
+# =========================
+
+def _carve_staircase(cells, size, rng):
+    """Clear a random monotone path from the top-left to the bottom-right corner"""
+    r = c = 0
+    cells[0] = 0
+    while r < size - 1 or c < size - 1:
+        if c == size - 1 or (r < size - 1 and rng.random() < 0.5):
+            r += 1
+        else:
+            c += 1
+        cells[r * size + c] = 0
+
+
+def open_map(size, seed=0):
+    """No obstacles at all"""
+    grid = Grid(size, size)
+    grid.set_start(0, 0)
+    grid.set_goal(size - 1, size - 1)
+    return grid
+
+
+def random_map(size, seed=0, wall_prob=0.3):
+    """Scattered single-cell obstacles plus one guaranteed corner-to-corner path"""
+    rng = random.Random(seed)
+    cells = bytearray(rng.random() < wall_prob for _ in range(size * size))
+    _carve_staircase(cells, size, rng)
+    grid = Grid.from_cells(size, size, cells)
+    grid.set_start(0, 0)
+    grid.set_goal(size - 1, size - 1)
+    return grid
+
+
+def maze_map(size, seed=0):
+    """Perfect maze (recursive backtracker) with one-cell corridors.
+
+    Maze cells sit on even coordinates and the cells between two of them
+    are opened when the backtracker moves across. There is exactly one
+    path between any two cells, so searches explore long dead ends.
+    """
+    rng = random.Random(seed)
+    m = (size + 1) // 2
+    cells = bytearray(b"\x01") * (size * size)
+    visited = bytearray(m * m)
+    visited[0] = 1
+    cells[0] = 0
+    stack = [0]
+    while stack:
+        current = stack[-1]
+        i, j = divmod(current, m)
+        options = []
+        if i > 0 and not visited[current - m]:
+            options.append((-1, 0))
+        if i < m - 1 and not visited[current + m]:
+            options.append((1, 0))
+        if j > 0 and not visited[current - 1]:
+            options.append((0, -1))
+        if j < m - 1 and not visited[current + 1]:
+            options.append((0, 1))
+        if not options:
+            stack.pop()
+            continue
+        di, dj = rng.choice(options)
+        nxt = current + di * m + dj
+        visited[nxt] = 1
+        r, c = 2 * i, 2 * j
+        cells[(r + di) * size + c + dj] = 0
+        cells[(r + 2 * di) * size + c + 2 * dj] = 0
+        stack.append(nxt)
+    grid = Grid.from_cells(size, size, cells)
+    grid.set_start(0, 0)
+    grid.set_goal(2 * (m - 1), 2 * (m - 1))
+    return grid
+
+
+def rooms_map(size, seed=0):
+    """Square rooms separated by one-cell walls and joined by doors.
+
+    A random spanning tree over the rooms keeps everything connected, and
+    a share of the remaining walls get a door as well, which gives loops
+    like the corridors of a real building.
+    """
+    rng = random.Random(seed)
+    room = ROOM_SIZE
+    cells = bytearray(size * size)
+    for r in range(room - 1, size, room):
+        cells[r * size:(r + 1) * size] = b"\x01" * size
+    for c in range(room - 1, size, room):
+        cells[c::size] = b"\x01" * size
+
+    k = (size - 1) // room + 1  # rooms per side (the last one may be cut off)
+
+    def door(i, j, di, dj):
+        # A random cell on the wall between room (i, j) and room (i + di, j + dj)
+        if di:
+            r = i * room + room - 1
+            c = rng.randrange(j * room, min(j * room + room - 1, size))
+        else:
+            c = j * room + room - 1
+            r = rng.randrange(i * room, min(i * room + room - 1, size))
+        cells[r * size + c] = 0
+
+    visited = bytearray(k * k)
+    visited[0] = 1
+    stack = [0]
+    while stack:
+        i, j = divmod(stack[-1], k)
+        options = [
+            (di, dj) for di, dj in ((1, 0), (-1, 0), (0, 1), (0, -1))
+            if 0 <= i + di < k and 0 <= j + dj < k and not visited[(i + di) * k + j + dj]
+        ]
+        if not options:
+            stack.pop()
+            continue
+        di, dj = rng.choice(options)
+        door(min(i, i + di), min(j, j + dj), abs(di), abs(dj))
+        visited[(i + di) * k + j + dj] = 1
+        stack.append((i + di) * k + j + dj)
+    for i in range(k):
+        for j in range(k):
+            if i + 1 < k and rng.random() < EXTRA_DOOR_PROB:
+                door(i, j, 1, 0)
+            if j + 1 < k and rng.random() < EXTRA_DOOR_PROB:
+                door(i, j, 0, 1)
+
+    grid = Grid.from_cells(size, size, cells)
+    last = size - 1 if (size - 1) % room != room - 1 else size - 2
+    grid.set_start(0, 0)
+    grid.set_goal(last, last)
+    return grid
+
+
+GENERATORS = {
+    "open": open_map,
+    "random": random_map,
+    "maze": maze_map,
+    "rooms": rooms_map,
+}
+
+
+# =========================
+# RUNNING AND COMPARING
+# =========================
+
+def run_suite(kinds, sizes, algorithms, seed=0, repeat=1, memory=True, log=print):
+    """Run algorithms on every (kind, size) map; returns a list of result dicts.
+
+    algorithms is a list of (name, function) pairs. time_s is the best of
+    ``repeat`` runs. peak_kib is the tracemalloc peak of one extra run
+    (tracing slows code down, so it is never the timed run), or None with
+    memory=False.
+    """
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            map_name = f"{kind}-{size}-s{seed}"
+            begin = time.perf_counter()
+            grid = GENERATORS[kind](size, seed)
+            grid.freeze()
+            grid.components()
+            log(f"{map_name}: built in {time.perf_counter() - begin:.2f}s")
+
+            for algo_name, algo_func in algorithms:
+                best = None
+                for _ in range(repeat):
+                    grid.freeze().derived.clear()
+                    begin = time.perf_counter()
+                    path, cost, expanded, _ = algo_func(grid)
+                    elapsed = time.perf_counter() - begin
+                    if best is None or elapsed < best:
+                        best = elapsed
+
+                peak_kib = None
+                if memory:
+                    grid.freeze().derived.clear()
+                    tracemalloc.start()
+                    try:
+                        algo_func(grid)
+                        peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+                    finally:
+                        tracemalloc.stop()
+
+                results.append({
+                    "map": map_name,
+                    "kind": kind,
+                    "size": size,
+                    "algorithm": algo_name,
+                    "found": path is not None,
+                    "cost": cost,
+                    "expanded": expanded,
+                    "time_s": best,
+                    "peak_kib": peak_kib,
+                })
+                memory_text = "" if peak_kib is None else f", {peak_kib:,.0f} KiB"
+                log(f"  {algo_name}: {best:.4f}s, {expanded} expanded{memory_text}")
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_delta=MIN_DELTA):
+    """Match results against a baseline run.
+
+    Returns (regressions, changes). A regression is a result more than
+    threshold (as a fraction) and more than min_delta seconds slower than
+    its baseline entry. A change is a result whose cost or expanded count
+    differs, i.e. the algorithm now behaves differently. Both are lists of
+    (result, baseline_result) pairs. Results missing from the baseline
+    are skipped.
+    """
+    previous = {(r["map"], r["algorithm"]): r for r in baseline.get("results", [])}
+    regressions, changes = [], []
+    for result in results:
+        old = previous.get((result["map"], result["algorithm"]))
+        if old is None:
+            continue
+        slower = result["time_s"] - old["time_s"]
+        if result["time_s"] > old["time_s"] * (1 + threshold) and slower > min_delta:
+            regressions.append((result, old))
+        if result["expanded"] != old["expanded"] or result["cost"] != old["cost"]:
+            changes.append((result, old))
+    return regressions, changes
+
+
+def _parse_list(text, convert=str):
+    return [convert(part.strip()) for part in text.split(",") if part.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every algorithm on large generated maps.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated map sizes, or 'all' for 64..4096")
+    parser.add_argument("--kinds", default=",".join(GENERATORS),
+                        help=f"comma-separated map kinds ({', '.join(GENERATORS)})")
+    parser.add_argument("--algorithms", default="all",
+                        help="comma-separated algorithm numbers from main.py, or 'all'")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per algorithm (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against an earlier --output file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (default 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = list(ALL_SIZES) if args.sizes == "all" else _parse_list(args.sizes, int)
+    kinds = _parse_list(args.kinds)
+    for kind in kinds:
+        if kind not in GENERATORS:
+            parser.error(f"unknown map kind {kind!r}")
+    if args.algorithms == "all":
+        keys = list(ALGORITHMS)
+    else:
+        keys = _parse_list(args.algorithms)
+        for key in keys:
+            if key not in ALGORITHMS:
+                parser.error(f"unknown algorithm number {key!r}")
+    algorithms = [ALGORITHMS[key] for key in keys]
+
+    results = run_suite(kinds, sizes, algorithms, args.seed, args.repeat, not args.no_memory)
+    report = {
+        "format": "pathfinding-benchmark",
+        "version": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np is not None,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions, changes = compare(results, baseline, args.threshold)
+    for result, old in changes:
+        print(
+            f"CHANGED  {result['map']} / {result['algorithm']}: cost {old['cost']} -> {result['cost']}, "
+            f"expanded {old['expanded']} -> {result['expanded']}"
+        )
+    for result, old in regressions:
+        print(
+            f"SLOWER   {result['map']} / {result['algorithm']}: "
+            f"{old['time_s']:.4f}s -> {result['time_s']:.4f}s ({result['time_s'] / old['time_s']:.2f}x)"
+        )
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
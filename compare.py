@@ -0,0 +1,195 @@
+"""
+compare.py - Run several searches on one map at once, in worker processes
+
+The GUI's compare window starts one task per algorithm in a process pool.
+Every worker receives the map once, through the pool initializer, and
+only ever reads it. So the searches really run side by side and the
+whole comparison takes about as long as the slowest algorithm.
+
+While a search runs, its worker streams the expanded cells back in
+batches through a multiprocessing queue. The Tk thread drains it with
+poll() and can draw the panes as they fill in. Algorithms without a
+generator (flow fields, HPA*) send their expanded order in one go when
+they finish.
+
+    job = ParallelCompare(grid, [("A*", run_astar, {}), ("BFS", run_bfs, {})])
+    job.start()
+    for message in job.poll():
+        ...
+
+Functions and keyword arguments go to other processes, so they must be
+picklable (module-level functions). landmark_heuristic may be passed as
+the heuristic; each worker builds the ALT tables itself.
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from algorithms.algorithms import CancelToken, SearchCancelled, SearchResult, search_events
+from grid.grid import Grid
+from landmarks import resolve_kwargs
+
+
+PROGRESS_INTERVAL = 0.05  # seconds between progress batches from one search
+PROGRESS_CHECK = 256  # expansions between looks at the clock
+
+# Set in every worker process by _init_worker
+_worker = {}
+
+
+def _init_worker(rows, cols, snapshot, movement, start, goal, messages, cancel_event):
+    """Rebuild the shared map once per worker process"""
+    cells, costs = snapshot
+    grid = Grid.from_cells(rows, cols, cells, *movement, costs=costs)
+    if start is not None:
+        grid.set_start(*start)
+    if goal is not None:
+        grid.set_goal(*goal)
+    grid.freeze()
+    grid.components()
+    _worker.update(grid=grid, messages=messages, cancel=CancelToken(cancel_event))
+
+
+def _run_search(index, func, kwargs):
+    """Run one search in a worker, streaming its expansions to the parent"""
+    grid, messages, cancel = _worker["grid"], _worker["messages"], _worker["cancel"]
+    # Per-algorithm tables (JPS+, HPA*, flow fields, ALT) are dropped, so
+    # every search starts cold, whichever searches this worker ran before
+    grid.freeze().derived.clear()
+    try:
+        kwargs = resolve_kwargs(kwargs, grid)
+        batch = []
+        frontier = None
+        sent = time.perf_counter()
+        for event in search_events(func, grid, cancel=cancel, **kwargs):
+            if isinstance(event, SearchResult):
+                if batch:
+                    messages.put(("progress", index, batch, frontier))
+                messages.put(("done", index, tuple(event)))
+                return
+            batch.append(event[0])
+            frontier = event[3]
+            if len(batch) % PROGRESS_CHECK == 0 and time.perf_counter() - sent >= PROGRESS_INTERVAL:
+                messages.put(("progress", index, batch, frontier))
+                batch = []
+                sent = time.perf_counter()
+    except SearchCancelled:
+        messages.put(("cancelled", index, None))
+    except Exception as e:
+        messages.put(("error", index, f"{type(e).__name__}: {e}"))
+
+
+class ParallelCompare:
+    """One comparison run: every entry searched in its own worker process.
+
+    entries is a list of (label, function, kwargs). poll() returns the
+    messages that arrived since the last call, each (kind, index, payload)
+    where index points into entries:
+
+    * ("progress", index, [cell, ...], frontier_size): newly expanded cells
+      in expansion order (frontier_size is None when unknown)
+    * ("done", index, SearchResult)
+    * ("error", index, message) or ("cancelled", index, None)
+
+    Every entry ends with exactly one done, error or cancelled message,
+    after all of its progress. workers=None uses one process per entry,
+    up to the number of cores.
+    """
+
+    def __init__(self, grid, entries, workers=None):
+        self.grid = grid
+        self.entries = list(entries)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = max(1, min(workers, len(self.entries)))
+        self.started = None
+        self.elapsed = None  # wall-clock seconds from start() to the last result
+        self._pool = None
+        self._messages = None
+        self._cancel = None
+        self._futures = []
+        self._pending = set()
+
+    @property
+    def finished(self):
+        return self.started is not None and not self._pending
+
+    def start(self):
+        grid = self.grid
+        self._messages = multiprocessing.Queue()
+        self._cancel = multiprocessing.Event()
+        self.started = time.perf_counter()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(
+                grid.rows, grid.cols, grid.snapshot(), (grid.diagonal, grid.corner_cutting),
+                grid.start, grid.goal, self._messages, self._cancel,
+            ),
+        )
+        self._pending = set(range(len(self.entries)))
+        self._futures = [
+            self._pool.submit(_run_search, index, func, kwargs)
+            for index, (_, func, kwargs) in enumerate(self.entries)
+        ]
+
+    def poll(self, timeout=None):
+        """Messages received so far; with a timeout, wait that long for the first one"""
+        out = []
+        if not self._pending:
+            return out
+        try:
+            if timeout is not None:
+                out.append(self._messages.get(timeout=timeout))
+            while True:
+                out.append(self._messages.get_nowait())
+        except queue.Empty:
+            pass
+
+        for index, message in enumerate(out):
+            kind, entry = message[:2]
+            if kind == "done":
+                out[index] = (kind, entry, SearchResult(*message[2]))
+            if kind != "progress":
+                self._pending.discard(entry)
+        # A worker that died (e.g. out of memory) never sends its result
+        for entry in list(self._pending):
+            future = self._futures[entry]
+            if future.done() and future.exception() is not None:
+                self._pending.discard(entry)
+                out.append(("error", entry, f"worker failed: {future.exception()}"))
+        if not self._pending:
+            self.elapsed = time.perf_counter() - self.started
+            self.close()
+        return out
+
+    def cancel(self):
+        """Stop every search; their cancelled messages are not waited for"""
+        if self._cancel is not None:
+            self._cancel.set()
+        self._pending = set()
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def run_parallel(grid, entries, workers=None):
+    """Run a comparison to the end without a GUI.
+
+    Returns (results, elapsed): one SearchResult (or an error message) per
+    entry, and the wall-clock seconds for all of them together.
+    """
+    job = ParallelCompare(grid, entries, workers)
+    job.start()
+    results = [None] * len(job.entries)
+    while not job.finished:
+        for message in job.poll(timeout=1.0):
+            if message[0] != "progress":
+                results[message[1]] = message[2]
+    return results, job.elapsed
@@ -0,0 +1,345 @@
+"""
+fields.py - Distance fields and flow fields toward a single goal
+
+One search from the goal gives the distance from every cell to it. A flow
+field then stores, for every cell, the next step along a shortest path.
+Any number of starts (e.g. everyone heading to the same exit) can follow
+it in O(path length) with no further search.
+
+NumPy is optional: with it the wavefront is expanded one whole frontier at
+a time as array operations over the CSR adjacency; without it a plain
+Dijkstra/BFS over the same arrays is used. Maps with terrain costs always
+use the plain Dijkstra: there the wavefront keeps re-relaxing cells whose
+distance drops again later, and ends up slower than the heap.
+"""
+
+import heapq
+import time
+from array import array
+from collections import OrderedDict, deque
+
+from algorithms.algorithms import CANCEL_INTERVAL, _no_path, _no_path_result
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+INF = float("inf")
+FIELD_CACHE_SIZE = 8  # fields kept per frozen map (each is one float per cell)
+
+
+class DistanceField:
+    """Distance from every cell to ``goal`` (inf where unreachable)"""
+
+    def __init__(self, rows, cols, goal, dist, settled):
+        self.rows = rows
+        self.cols = cols
+        self.goal = goal
+        self.dist = dist  # numpy float64 array or array('d'), indexed row * cols + col
+        self.settled = settled  # number of reachable cells
+
+    def distance(self, cell):
+        """Distance from cell to the goal, or None if it cannot reach it"""
+        if not (0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols):
+            return None
+        d = float(self.dist[cell[0] * self.cols + cell[1]])
+        return None if d == INF else d
+
+    def order(self):
+        """Reachable cells sorted by distance (the wavefront, goal first)"""
+        cols = self.cols
+        if np is not None and isinstance(self.dist, np.ndarray):
+            reachable = np.flatnonzero(np.isfinite(self.dist))
+            ids = reachable[np.argsort(self.dist[reachable], kind="stable")].tolist()
+        else:
+            ids = sorted((i for i, d in enumerate(self.dist) if d != INF), key=self.dist.__getitem__)
+        return [divmod(i, cols) for i in ids]
+
+
+class FlowField:
+    """Next step toward the goal for every cell (-1 at the goal and where unreachable)"""
+
+    def __init__(self, field, next_cell):
+        self.field = field
+        self.rows = field.rows
+        self.cols = field.cols
+        self.goal = field.goal
+        self.next_cell = next_cell  # flat index of the next cell, numpy int32 or array('i')
+
+    def next_step(self, cell):
+        """The neighbor to move to from cell, or None"""
+        nxt = int(self.next_cell[cell[0] * self.cols + cell[1]])
+        return None if nxt < 0 else divmod(nxt, self.cols)
+
+    def direction(self, cell):
+        """(dr, dc) of the next step from cell, or None"""
+        nxt = self.next_step(cell)
+        if nxt is None:
+            return None
+        return nxt[0] - cell[0], nxt[1] - cell[1]
+
+    def path_from(self, start):
+        """Follow the field from start to the goal; None if unreachable"""
+        if self.field.distance(start) is None:
+            return None
+        cols = self.cols
+        node = start[0] * cols + start[1]
+        goal_id = self.goal[0] * cols + self.goal[1]
+        ids = [node]
+        # A path visits every cell at most once; the cap and the -1 test
+        # stop a walk that could never reach goal_id instead of looping
+        for _ in range(len(self.next_cell)):
+            if node == goal_id:
+                return [divmod(i, cols) for i in ids]
+            node = int(self.next_cell[node])
+            if node < 0:
+                return None
+            ids.append(node)
+        return None
+
+
+def _cache(adj):
+    cache = adj.derived.get("fields")
+    if cache is None:
+        cache = adj.derived["fields"] = OrderedDict()
+    return cache
+
+
+def _cached(adj, key, build):
+    """Small per-map LRU; the adjacency (and this cache) is dropped on edits"""
+    cache = _cache(adj)
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+        return value, True
+    value = build()
+    cache[key] = value
+    while len(cache) > FIELD_CACHE_SIZE:
+        cache.popitem(last=False)
+    return value, False
+
+
+def _ragged_edges(offsets, frontier):
+    """Edge indices of all CSR slices for the cells in frontier (NumPy)"""
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), counts
+    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return np.arange(total, dtype=np.int64) + shift, counts
+
+
+def _distances_numpy(adj, goal_id, cancel=None):
+    offsets = np.frombuffer(adj.offsets, dtype=np.int32).astype(np.int64)
+    neighbors = np.frombuffer(adj.neighbors, dtype=np.int32)
+    weights = None if adj.weights is None else np.frombuffer(adj.weights, dtype=np.float64)
+
+    dist = np.full(adj.size, INF)
+    dist[goal_id] = 0.0
+    frontier = np.array([goal_id], dtype=np.int64)
+
+    # Relax every edge leaving the frontier at once. The cells whose
+    # distance dropped form the next frontier. On unit-cost maps this is
+    # exactly BFS layer by layer; with weights it is label-correcting and
+    # still converges to exact distances.
+    while frontier.size:
+        if cancel is not None:
+            cancel.check()
+        edges, counts = _ragged_edges(offsets, frontier)
+        if edges.size == 0:
+            break
+        src = np.repeat(frontier, counts)
+        nbr = neighbors[edges]
+        cand = dist[src] + (1.0 if weights is None else weights[edges])
+        better = cand < dist[nbr]
+        nbr, cand = nbr[better], cand[better]
+        if nbr.size == 0:
+            break
+        np.minimum.at(dist, nbr, cand)
+        frontier = np.unique(nbr).astype(np.int64)
+    return dist
+
+
+def _distances_python(adj, goal_id, cancel=None):
+    offsets, neighbors, weights = adj.offsets, adj.neighbors, adj.weights
+    dist = array("d", [INF]) * adj.size
+    dist[goal_id] = 0.0
+    popped = 0
+
+    if weights is None:
+        queue = deque([goal_id])
+        while queue:
+            node = queue.popleft()
+            popped += 1
+            if cancel is not None and popped % CANCEL_INTERVAL == 0:
+                cancel.check()
+            d = dist[node] + 1
+            for k in range(offsets[node], offsets[node + 1]):
+                nbr = neighbors[k]
+                if dist[nbr] == INF:
+                    dist[nbr] = d
+                    queue.append(nbr)
+        return dist
+
+    heap = [(0.0, goal_id)]
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        popped += 1
+        if cancel is not None and popped % CANCEL_INTERVAL == 0:
+            cancel.check()
+        for k in range(offsets[node], offsets[node + 1]):
+            nbr = neighbors[k]
+            nd = d + weights[k]
+            if nd < dist[nbr]:
+                dist[nbr] = nd
+                heapq.heappush(heap, (nd, nbr))
+    return dist
+
+
+def distance_field(grid, goal=None, cache=True, cancel=None):
+    """Distances from every cell to goal (default: grid.goal).
+
+    Edges are symmetric, so one search from the goal gives every cell's
+    distance to it. Results are cached per frozen map version and goal
+    unless cache=False (e.g. for one-off fields such as landmark tables).
+    A CancelToken passed as cancel stops the build with SearchCancelled;
+    nothing is cached then.
+    """
+    if goal is None:
+        goal = grid.goal
+    goal = tuple(goal)
+    if not grid.in_bounds(*goal):
+        raise ValueError(f"goal {goal} is outside the {grid.rows}x{grid.cols} map")
+    adj = grid.freeze()
+
+    def build():
+        goal_id = goal[0] * adj.cols + goal[1]
+        if adj.blocked[goal_id]:
+            dist = np.full(adj.size, INF) if np is not None else array("d", [INF]) * adj.size
+            return DistanceField(adj.rows, adj.cols, goal, dist, 0)
+        if np is not None and grid.costs is None:
+            dist = _distances_numpy(adj, goal_id, cancel)
+            settled = int(np.isfinite(dist).sum())
+        elif np is not None:
+            # Same buffer as a NumPy array, for the vectorized flow field
+            dist = np.frombuffer(_distances_python(adj, goal_id, cancel), dtype=np.float64)
+            settled = int(np.isfinite(dist).sum())
+        else:
+            dist = _distances_python(adj, goal_id, cancel)
+            settled = sum(1 for d in dist if d != INF)
+        return DistanceField(adj.rows, adj.cols, goal, dist, settled)
+
+    if not cache:
+        return build()
+    field, _ = _cached(adj, ("distance", goal), build)
+    return field
+
+
+def _flow_numpy(adj, dist, goal_id):
+    offsets = np.frombuffer(adj.offsets, dtype=np.int32).astype(np.int64)
+    neighbors = np.frombuffer(adj.neighbors, dtype=np.int32)
+    weights = None if adj.weights is None else np.frombuffer(adj.weights, dtype=np.float64)
+
+    next_cell = np.full(adj.size, -1, dtype=np.int32)
+    cells = np.flatnonzero(np.isfinite(dist))
+    cells = cells[cells != goal_id].astype(np.int64)
+    edges, counts = _ragged_edges(offsets, cells)
+    if edges.size == 0:
+        return next_cell
+    src = np.repeat(cells, counts)
+    nbr = neighbors[edges]
+    via = dist[nbr] + (1.0 if weights is None else weights[edges])
+    # An edge is on a shortest path if it accounts for the whole distance.
+    # Keep the first such edge per cell, i.e. the usual neighbor order.
+    tight = np.flatnonzero(np.abs(via - dist[src]) <= 1e-9 * np.maximum(1.0, dist[src]))
+    first_src, first = np.unique(src[tight], return_index=True)
+    next_cell[first_src] = nbr[tight[first]]
+    return next_cell
+
+
+def _flow_python(adj, dist, goal_id):
+    offsets, neighbors, weights = adj.offsets, adj.neighbors, adj.weights
+    next_cell = array("i", [-1]) * adj.size
+    for u in range(adj.size):
+        du = dist[u]
+        if du == INF or u == goal_id:
+            continue
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            via = dist[v] + (1 if weights is None else weights[k])
+            if abs(via - du) <= 1e-9 * max(1.0, du):
+                next_cell[u] = v
+                break
+    return next_cell
+
+
+def flow_field(grid, goal=None, cancel=None):
+    """Next-step field toward goal, built from (and cached with) its distance field"""
+    if goal is None:
+        goal = grid.goal
+    goal = tuple(goal)
+    adj = grid.freeze()
+    field = distance_field(grid, goal, cancel=cancel)
+
+    def build():
+        goal_id = goal[0] * adj.cols + goal[1]
+        if np is not None and isinstance(field.dist, np.ndarray):
+            next_cell = _flow_numpy(adj, field.dist, goal_id)
+        else:
+            next_cell = _flow_python(adj, field.dist, goal_id)
+        return FlowField(field, next_cell)
+
+    flow, _ = _cached(adj, ("flow", goal), build)
+    return flow
+
+
+def run_flow_field(grid, start=None, goal=None, trace=False, stats=None, cancel=None):
+    """Follow the goal's cached flow field from start (standard contract)
+
+    expanded_nodes is the number of cells the field had to settle on a
+    fresh build, and 0 when the field came from the cache. With trace=True
+    the expanded order is the wavefront around the goal, nearest first.
+    A SearchStats passed as stats times the field build as "search" and
+    following it as "reconstruct". A CancelToken passed as cancel is
+    checked while the field is built.
+    """
+    start_time = time.time()
+    if stats is not None:
+        stats.start()
+    if start is None:
+        start = grid.start
+    if goal is None:
+        goal = grid.goal
+    goal = tuple(goal)
+
+    adj = grid.freeze()
+    if _no_path(grid, start, goal):
+        # Off the map or in different components: no field needed
+        if stats is not None:
+            stats.finish(0, 0, "setup")
+        return _no_path_result(start_time, trace)
+    if stats is not None:
+        stats.lap("setup")
+    cached = ("flow", goal) in _cache(adj)
+    flow = flow_field(grid, goal, cancel)
+    expanded_nodes = 0 if cached else flow.field.settled
+    expanded_order = flow.field.order() if trace else []
+    if stats is not None:
+        stats.lap("search")
+
+    path = flow.path_from(start)
+    cost = 0
+    if path is not None:
+        d = flow.field.distance(start)
+        cost = int(d) if adj.weights is None else d
+    if stats is not None:
+        stats.finish(expanded_nodes, 0, "reconstruct")
+    time_taken = time.time() - start_time
+    if trace:
+        return path, cost, expanded_nodes, time_taken, expanded_order
+    return path, cost, expanded_nodes, time_taken
@@ -3,65 +3,661 @@ grid.py - Grid representation for pathfinding algorithms
 Adham Sobhy (23-101003) - Team Leader
 """
 
+import itertools
+import json
+import math
+import random
+from array import array
+from collections import deque
+from collections.abc import MutableSet
+
+
+MAX_CELL_COST = 65535  # costs are stored as unsigned 16-bit values
+SQRT2 = math.sqrt(2)
+
+# Grid versions come from one process-wide counter, so a version stamp
+# identifies a grid's contents across every Grid object (copies share it)
+_versions = itertools.count(1)
+
+# Diagonal moves, in neighbor order: up-left, up-right, down-left, down-right
+DIAGONALS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+SPLIT_CHECK_BUDGET = 512  # cells a local search may visit to rule out a split
+
+# bytes.translate table: any nonzero occupancy byte becomes a wall (1)
+_OCCUPANCY = bytes([0] + [1] * 255)
+
+
+class WallSet(MutableSet):
+    """Set-like view of a Grid's walls, backed by the grid's occupancy buffer.
+
+    Kept for compatibility with code that treats ``grid.walls`` as a set of
+    (row, col) tuples: membership, iteration, add and discard all go straight
+    to the buffer, so no tuples are stored.
+    """
+
+    def __init__(self, grid):
+        self._grid = grid
+
+    def __contains__(self, cell):
+        try:
+            row, col = cell
+        except (TypeError, ValueError):
+            return False
+        grid = self._grid
+        if row < 0 or row >= grid.rows or col < 0 or col >= grid.cols:
+            return False
+        return grid._cells[row * grid.cols + col] != 0
+
+    def __iter__(self):
+        cells = self._grid._cells
+        cols = self._grid.cols
+        idx = cells.find(1)
+        while idx != -1:
+            yield divmod(idx, cols)
+            idx = cells.find(1, idx + 1)
+
+    def __len__(self):
+        return self._grid._wall_count
+
+    def __repr__(self):
+        return f"WallSet({set(self)!r})"
+
+    def add(self, cell):
+        self._grid.set_wall(cell[0], cell[1])
+
+    def discard(self, cell):
+        try:
+            row, col = cell
+        except (TypeError, ValueError):
+            return
+        self._grid.clear_wall(row, col)
+
+
+class Adjacency:
+    """Compressed-sparse-row (CSR) neighbor lists for a frozen Grid.
+
+    Cell ``i`` (= row * cols + col) has neighbors
+    ``neighbors[offsets[i]:offsets[i + 1]]``, in the same order as
+    ``Grid.get_neighbors``. Walls have no neighbors.
+
+    ``weights`` is None on uniform 4-connected maps, where every move costs
+    1. Otherwise it holds the cost of each edge, parallel to ``neighbors``.
+    A move costs the average of the two cells' terrain costs, times sqrt(2)
+    for a diagonal move, so edges are symmetric. ``min_cost`` is the
+    cheapest terrain cost of any walkable cell. Heuristics are scaled by it
+    so they stay admissible.
+
+    ``blocked`` is a snapshot of the occupancy buffer, and ``derived`` holds
+    other per-map tables (e.g. JPS+ jump distances). All of these are thrown
+    away with the adjacency on the next edit.
+    """
+
+    __slots__ = (
+        "rows", "cols", "offsets", "neighbors", "weights", "min_cost",
+        "diagonal", "corner_cutting", "blocked", "derived",
+    )
+
+    def __init__(self, rows, cols, offsets, neighbors, blocked, weights=None,
+                 min_cost=1, diagonal=False, corner_cutting=False):
+        self.rows = rows
+        self.cols = cols
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.blocked = blocked
+        self.weights = weights
+        self.min_cost = min_cost
+        self.diagonal = diagonal
+        self.corner_cutting = corner_cutting
+        self.derived = {}
+
+    @property
+    def size(self):
+        return self.rows * self.cols
+
+    def step_cost(self, u, v):
+        """Cost of the move from cell index u to neighboring cell index v"""
+        if self.weights is None:
+            return 1
+        for k in range(self.offsets[u], self.offsets[u + 1]):
+            if self.neighbors[k] == v:
+                return self.weights[k]
+        raise ValueError(f"cells {u} and {v} are not neighbors")
+
+    def path_cost(self, ids):
+        """Total cost of a path given as a list of cell indices"""
+        if self.weights is None:
+            return len(ids) - 1
+        return sum(self.step_cost(u, v) for u, v in zip(ids, ids[1:]))
+
+    @classmethod
+    def build(cls, grid):
+        rows, cols, cells = grid.rows, grid.cols, grid._cells
+        diagonal = grid.diagonal
+        offsets = array("i", bytes(4 * (rows * cols + 1)))
+        neighbors = array("i")
+        is_diag = bytearray() if diagonal else None  # parallel to neighbors
+        push = neighbors.append
+        idx = 0
+        for r in range(rows):
+            top = r > 0
+            bottom = r < rows - 1
+            for c in range(cols):
+                if not cells[idx]:
+                    if top and not cells[idx - cols]:
+                        push(idx - cols)
+                    if bottom and not cells[idx + cols]:
+                        push(idx + cols)
+                    if c > 0 and not cells[idx - 1]:
+                        push(idx - 1)
+                    if c < cols - 1 and not cells[idx + 1]:
+                        push(idx + 1)
+                    if diagonal:
+                        is_diag.extend(bytes(len(neighbors) - len(is_diag)))
+                        for dr, dc in DIAGONALS:
+                            if grid._diagonal_ok(r, c, dr, dc):
+                                push(idx + dr * cols + dc)
+                                is_diag.append(1)
+                idx += 1
+                offsets[idx] = len(neighbors)
+        if diagonal:
+            is_diag.extend(bytes(len(neighbors) - len(is_diag)))
+
+        weights = None
+        min_cost = 1
+        costs = grid.costs
+        if costs is not None or diagonal:
+            weights = array("d", bytes(8 * len(neighbors)))
+            for u in range(rows * cols):
+                cu = costs[u] if costs is not None else 1
+                for k in range(offsets[u], offsets[u + 1]):
+                    w = (cu + costs[neighbors[k]]) / 2 if costs is not None else 1
+                    weights[k] = w * SQRT2 if diagonal and is_diag[k] else w
+        if costs is not None:
+            free = [cost for cost, wall in zip(costs, cells) if not wall]
+            min_cost = min(free) if free else 1
+        return cls(rows, cols, offsets, neighbors, bytes(cells), weights,
+                   min_cost, diagonal, grid.corner_cutting)
+
+
+def _diff_buffer(old, new, itemsize=1, chunk=4096):
+    """Element indices where two equal-length byte buffers differ"""
+    changed = []
+    n = len(old)
+    for lo in range(0, n, chunk):
+        hi = min(lo + chunk, n)
+        if old[lo:hi] != new[lo:hi]:
+            for i in range(lo, hi):
+                if old[i] != new[i]:
+                    changed.append(i // itemsize)
+    return changed
+
+
+class Components:
+    """Connected-component labels of a grid's walkable cells.
+
+    Every free cell carries a label, and labels are merged with union-find,
+    so opening a wall only joins the components around it. Closing a wall
+    may split a component. A small local search first checks whether the
+    cells around the new wall still reach each other. If that is
+    inconclusive the component is only marked as suspect. Its merged
+    labels can make connected() say "maybe", never a wrong "no". The first
+    query that needs it re-floods the component from the query's start.
+
+    connected() is exact, and O(1) whenever no suspect component is
+    involved.
+    """
+
+    def __init__(self, grid, label=None, parent=None, suspect=None):
+        self.grid = grid
+        if label is not None:
+            self.label, self._parent, self._suspect = label, parent, suspect
+            return
+
+        adj = grid.freeze()
+        offsets, neighbors, cells = adj.offsets, adj.neighbors, grid._cells
+        self.label = label = array("i", [-1]) * (grid.rows * grid.cols)
+        self._parent = []
+        self._suspect = set()
+        for seed in range(len(label)):
+            if cells[seed] or label[seed] >= 0:
+                continue
+            new = len(self._parent)
+            self._parent.append(new)
+            label[seed] = new
+            stack = [seed]
+            while stack:
+                u = stack.pop()
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = neighbors[k]
+                    if label[v] < 0:
+                        label[v] = new
+                        stack.append(v)
+
+    def copy(self, grid):
+        """Independent copy of this index for a copy of its grid"""
+        return Components(grid, array("i", self.label), list(self._parent), set(self._suspect))
+
+    def _find(self, lab):
+        parent = self._parent
+        while parent[lab] != lab:
+            parent[lab] = parent[parent[lab]]
+            lab = parent[lab]
+        return lab
+
+    def root(self, idx):
+        """Component id of a cell (-1 for walls)"""
+        lab = self.label[idx]
+        return -1 if lab < 0 else self._find(lab)
+
+    def connected(self, a, b):
+        """Whether cells a and b (flat indices) are joined by walkable moves"""
+        ra, rb = self.root(a), self.root(b)
+        if ra < 0 or ra != rb:
+            return False
+        if ra in self._suspect:
+            self._reflood(a)
+            return self.root(a) == self.root(b)
+        return True
+
+    def _reflood(self, seed):
+        """Give the true component of seed a fresh, exact label"""
+        grid, label = self.grid, self.label
+        new = len(self._parent)
+        self._parent.append(new)
+        label[seed] = new
+        stack = [seed]
+        while stack:
+            u = stack.pop()
+            for v in grid._neighbor_ids(u):
+                if label[v] != new:
+                    label[v] = new
+                    stack.append(v)
+
+    def _opened(self, idx):
+        """A wall at idx was removed: join everything it now touches"""
+        new = len(self._parent)
+        self._parent.append(new)
+        self.label[idx] = new
+        roots = {self.root(v) for v in self.grid._neighbor_ids(idx)}
+        for r in roots:
+            self._parent[r] = new
+        if roots & self._suspect:
+            self._suspect -= roots
+            self._suspect.add(new)
+
+    def _closed(self, idx):
+        """A wall was placed at idx: check whether its component split"""
+        old = self.root(idx)
+        self.label[idx] = -1
+        if old < 0:
+            return
+        grid, cells, cols = self.grid, self.grid._cells, self.grid.cols
+        row, col = divmod(idx, cols)
+        steps = ((-1, 0), (1, 0), (0, -1), (0, 1)) + (DIAGONALS if grid.diagonal else ())
+        around = []
+        for dr, dc in steps:
+            nr, nc = row + dr, col + dc
+            if 0 <= nr < grid.rows and 0 <= nc < cols and not cells[nr * cols + nc]:
+                around.append(nr * cols + nc)
+        if len(around) < 2:
+            return
+
+        # The cells around the wall are the only ones whose moves changed, so
+        # if they still reach each other nothing was cut off
+        targets = set(around[1:])
+        seen = {around[0]}
+        queue = deque([around[0]])
+        while queue and targets and len(seen) < SPLIT_CHECK_BUDGET:
+            u = queue.popleft()
+            for v in grid._neighbor_ids(u):
+                if v not in seen:
+                    seen.add(v)
+                    targets.discard(v)
+                    queue.append(v)
+        if targets:
+            self._suspect.add(old)
+
+
 class Grid:
-    """2D grid for pathfinding with walls, empty cells, start, and goal"""
+    """2D grid for pathfinding with walls, empty cells, start, and goal
+
+    Walls live in a flat bytearray (one byte per cell, 1 = wall) indexed by
+    ``row * cols + col``. ``walls`` is a lazily created set-like view over it.
+
+    ``costs`` is an optional terrain layer: None while every cell costs 1,
+    otherwise an ``array('H')`` with one cost per cell (2 bytes each).
+
+    Movement is 4-connected by default. With ``diagonal=True`` the four
+    diagonal moves are added, each costing sqrt(2). Without corner cutting
+    a diagonal move needs both cells it passes to be free. With
+    ``corner_cutting=True`` one of them may be a wall, but the move may
+    never squeeze between two walls.
+
+    ``version`` changes on every edit (walls, costs, movement, start, goal),
+    which makes it a cheap cache key for anything derived from the grid.
+    """
     
-    def __init__(self, rows, cols):
+    def __init__(self, rows, cols, diagonal=False, corner_cutting=False):
         self.rows = rows
         self.cols = cols
-        self.walls = set()
+        self.diagonal = diagonal
+        self.corner_cutting = corner_cutting
+        self._cells = bytearray(rows * cols)
+        self._wall_count = 0
+        self._wall_view = None
+        self._adjacency = None
+        self._components = None
+        self.costs = None
         self.start = None
         self.goal = None
+        self.version = next(_versions)
+
+    @property
+    def walls(self):
+        """Set-like view of wall cells as (row, col) tuples"""
+        if self._wall_view is None:
+            self._wall_view = WallSet(self)
+        return self._wall_view
+
+    @walls.setter
+    def walls(self, cells):
+        cells = list(cells)
+        self._cells = bytearray(self.rows * self.cols)
+        self._wall_count = 0
+        self._components = None
+        self._changed()
+        for row, col in cells:
+            self.set_wall(row, col)
+
+    def index(self, row, col):
+        """Flat buffer index of a cell"""
+        return row * self.cols + col
+
+    def in_bounds(self, row, col):
+        """Check if a cell is inside the grid"""
+        return 0 <= row < self.rows and 0 <= col < self.cols
     
     def set_wall(self, row, col):
         """Mark a cell as a wall (obstacle)"""
-        self.walls.add((row, col))
+        if not self.in_bounds(row, col):
+            return
+        idx = row * self.cols + col
+        if not self._cells[idx]:
+            self._cells[idx] = 1
+            self._wall_count += 1
+            self._changed()
+            if self._components is not None:
+                self._components._closed(idx)
+
+    def clear_wall(self, row, col):
+        """Remove a wall, making the cell walkable again"""
+        if not self.in_bounds(row, col):
+            return
+        idx = row * self.cols + col
+        if self._cells[idx]:
+            self._cells[idx] = 0
+            self._wall_count -= 1
+            self._changed()
+            if self._components is not None:
+                self._components._opened(idx)
+
+    def is_wall(self, row, col):
+        """Check if an in-bounds cell is a wall"""
+        return self._cells[row * self.cols + col] != 0
     
+    def set_cost(self, row, col, cost):
+        """Set the terrain cost of a cell (1 = normal floor)"""
+        if not self.in_bounds(row, col):
+            return
+        cost = int(cost)
+        if cost < 1 or cost > MAX_CELL_COST:
+            raise ValueError(f"cell cost must be between 1 and {MAX_CELL_COST}, got {cost}")
+        idx = row * self.cols + col
+        if self.costs is None:
+            if cost == 1:
+                return
+            self.costs = array("H", [1]) * (self.rows * self.cols)
+        elif self.costs[idx] == cost:
+            return  # unchanged: keep the frozen map and everything cached on it
+        self.costs[idx] = cost
+        self._changed()
+
+    def get_cost(self, row, col):
+        """Terrain cost of a cell"""
+        if self.costs is None:
+            return 1
+        return self.costs[row * self.cols + col]
+
+    def set_movement(self, diagonal, corner_cutting=False):
+        """Switch between 4-connected and 8-connected movement"""
+        self.diagonal = bool(diagonal)
+        self.corner_cutting = bool(corner_cutting)
+        self._components = None
+        self._changed()
+
     def set_start(self, row, col):
         """Set the start position"""
         self.start = (row, col)
+        self.version = next(_versions)
     
     def set_goal(self, row, col):
         """Set the goal position"""
         self.goal = (row, col)
+        self.version = next(_versions)
+
+    def _changed(self):
+        """Drop derived state after the map itself changed"""
+        self._adjacency = None
+        self.version = next(_versions)
     
     def is_valid(self, row, col):
         """Check if a cell is within bounds and not a wall"""
         if row < 0 or row >= self.rows or col < 0 or col >= self.cols:
             return False
-        if (row, col) in self.walls:
-            return False
-        return True
+        return not self._cells[row * self.cols + col]
     
+    def _diagonal_ok(self, row, col, dr, dc):
+        """Check a diagonal move against bounds, walls and the corner rule"""
+        nr, nc = row + dr, col + dc
+        if nr < 0 or nr >= self.rows or nc < 0 or nc >= self.cols:
+            return False
+        cells, cols = self._cells, self.cols
+        if cells[nr * cols + nc]:
+            return False
+        side_a = cells[nr * cols + col]
+        side_b = cells[row * cols + nc]
+        if self.corner_cutting:
+            return not (side_a and side_b)
+        return not side_a and not side_b
+
     def get_neighbors(self, row, col):
-        """Get valid neighbors (up, down, left, right)"""
+        """Get valid neighbors (up, down, left, right, then diagonals if enabled)"""
         neighbors = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # up, down, left, right
-        
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if self.is_valid(new_row, new_col):
-                neighbors.append((new_row, new_col))
+        rows, cols, cells = self.rows, self.cols, self._cells
+        idx = row * cols + col
+
+        if row > 0 and not cells[idx - cols]:
+            neighbors.append((row - 1, col))
+        if row < rows - 1 and not cells[idx + cols]:
+            neighbors.append((row + 1, col))
+        if col > 0 and not cells[idx - 1]:
+            neighbors.append((row, col - 1))
+        if col < cols - 1 and not cells[idx + 1]:
+            neighbors.append((row, col + 1))
+        if self.diagonal:
+            for dr, dc in DIAGONALS:
+                if self._diagonal_ok(row, col, dr, dc):
+                    neighbors.append((row + dr, col + dc))
         
         return neighbors
+
+    def freeze(self):
+        """Return the CSR adjacency for the current walls, building it once.
+
+        The result is cached until the next wall edit, so repeated searches
+        on an unchanged map share the same neighbor arrays.
+        """
+        if self._adjacency is None:
+            self._adjacency = Adjacency.build(self)
+        return self._adjacency
+
+    def _neighbor_ids(self, idx):
+        row, col = divmod(idx, self.cols)
+        return [r * self.cols + c for r, c in self.get_neighbors(row, col)]
+
+    def components(self):
+        """Connected-component index of the walkable cells, built on first use"""
+        if self._components is None:
+            self._components = Components(self)
+        return self._components
+
+    def snapshot(self):
+        """Copy of the wall and cost buffers, to diff against with changed_cells()"""
+        return bytes(self._cells), None if self.costs is None else bytes(self.costs)
+
+    def changed_cells(self, snapshot):
+        """Flat indices of cells whose wall or cost differs from a snapshot.
+
+        Buffers are compared in chunks first, so an unchanged region costs
+        one memcmp instead of a Python-level loop.
+        """
+        old_cells, old_costs = snapshot
+        changed = set(_diff_buffer(old_cells, self._cells))
+        if old_costs is None and self.costs is None:
+            return changed
+        if old_costs is None:
+            old_costs = bytes(array("H", [1]) * (self.rows * self.cols))
+        new_costs = self.costs
+        if new_costs is None:
+            new_costs = array("H", [1]) * (self.rows * self.cols)
+        changed.update(_diff_buffer(old_costs, memoryview(new_costs).cast("B"), 2))
+        return changed
+
+    def copy(self):
+        """Return an independent copy of this grid"""
+        g = Grid(self.rows, self.cols, self.diagonal, self.corner_cutting)
+        g._cells = bytearray(self._cells)
+        g._wall_count = self._wall_count
+        g._adjacency = self._adjacency
+        g.costs = None if self.costs is None else array("H", self.costs)
+        g.start = self.start
+        g.goal = self.goal
+        g.version = self.version
+        if self._components is not None:
+            g._components = self._components.copy(g)
+        return g
     
+    def adopt(self, other):
+        """Take over the adjacency and component index a copy of this grid built.
+
+        Lets a worker thread freeze a copy while this grid stays untouched.
+        Does nothing unless other has the same version, i.e. the same map.
+        """
+        if other.version != self.version:
+            return
+        if self._adjacency is None:
+            self._adjacency = other._adjacency
+        if self._components is None and other._components is not None:
+            self._components = other._components.copy(self)
+
+    def to_dict(self):
+        """Editor JSON representation (see load_map_json)"""
+        data = {
+            "rows": self.rows,
+            "cols": self.cols,
+            "start": list(self.start) if self.start is not None else None,
+            "goal": list(self.goal) if self.goal is not None else None,
+            "walls": [list(x) for x in self.walls],
+        }
+        if self.diagonal:
+            data["diagonal"] = True
+            data["corner_cutting"] = self.corner_cutting
+        if self.costs is not None:
+            cols = self.cols
+            data["costs"] = [
+                [i // cols, i % cols, cost] for i, cost in enumerate(self.costs) if cost != 1
+            ]
+        return data
+
+    @classmethod
+    def from_cells(cls, rows, cols, cells, diagonal=False, corner_cutting=False, costs=None):
+        """Build a Grid from a row-major occupancy buffer (nonzero = wall).
+
+        Much faster than set_wall per cell for large generated maps. costs
+        is an optional row-major buffer of unsigned 16-bit cell costs (the
+        second half of snapshot()).
+        """
+        if len(cells) != rows * cols:
+            raise ValueError(f"expected {rows * cols} cells, got {len(cells)}")
+        grid = cls(rows, cols, diagonal, corner_cutting)
+        grid._cells = bytearray(cells).translate(_OCCUPANCY)
+        grid._wall_count = grid._cells.count(1)
+        if costs is not None:
+            layer = array("H")
+            layer.frombytes(costs)
+            if len(layer) != rows * cols:
+                raise ValueError(f"expected {rows * cols} costs, got {len(layer)}")
+            if 0 in layer:
+                raise ValueError(f"cell cost must be between 1 and {MAX_CELL_COST}, got 0")
+            grid.costs = layer
+        return grid
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Grid from the editor JSON representation"""
+        grid = cls(
+            int(data["rows"]),
+            int(data["cols"]),
+            diagonal=bool(data.get("diagonal", False)),
+            corner_cutting=bool(data.get("corner_cutting", False)),
+        )
+        if data.get("start") is not None:
+            grid.set_start(*data["start"])
+        if data.get("goal") is not None:
+            grid.set_goal(*data["goal"])
+        for r, c in data.get("walls", []):
+            grid.set_wall(r, c)
+        for r, c, cost in data.get("costs", []):
+            grid.set_cost(r, c, cost)
+        return grid
+
     def display(self):
         """Print the grid (for debugging)"""
+        cells, cols, costs = self._cells, self.cols, self.costs
         for r in range(self.rows):
-            row_str = ""
-            for c in range(self.cols):
-                if (r, c) == self.start:
-                    row_str += "S "
-                elif (r, c) == self.goal:
-                    row_str += "G "
-                elif (r, c) in self.walls:
-                    row_str += "# "
-                else:
-                    row_str += ". "
-            print(row_str)
+            row_chars = ["# " if cells[r * cols + c] else ". " for c in range(cols)]
+            if costs is not None:
+                for c in range(cols):
+                    if costs[r * cols + c] > 1 and not cells[r * cols + c]:
+                        row_chars[c] = "~ "
+            if self.goal is not None and self.goal[0] == r and self.in_bounds(*self.goal):
+                row_chars[self.goal[1]] = "G "
+            if self.start is not None and self.start[0] == r and self.in_bounds(*self.start):
+                row_chars[self.start[1]] = "S "
+            print("".join(row_chars))
         print()
 
 
+def save_map_json(grid, path):
+    """Save a grid in the map editor's JSON format"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(grid.to_dict(), f, indent=2)
+
+
+def load_map_json(path):
+    """Load a grid saved by the map editor.
+
+    Format: {"rows", "cols", "start": [r, c], "goal": [r, c],
+    "walls": [[r, c], ...], "costs": [[r, c, cost], ...],
+    "diagonal": bool, "corner_cutting": bool}. "costs" is optional and only
+    lists cells whose cost is not 1. The movement keys are optional
+    (default: 4-connected).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return Grid.from_dict(json.load(f))
+
+
 # =========================
 # TEST MAPS (for Phase 2)
 # =========================
@@ -224,6 +820,22 @@ def create_comparison_map():
     return grid
 
 
+def create_random_map(rows=32, cols=32, wall_prob=0.25, seed=0):
+    """Seeded random obstacles, start top-left and goal bottom-right.
+
+    The same arguments always give the same map, so generated maps can be
+    rebuilt in another process (see report.py). A path is not guaranteed.
+    """
+    rng = random.Random(seed)
+    cells = bytearray(rng.random() < wall_prob for _ in range(rows * cols))
+    grid = Grid.from_cells(rows, cols, cells)
+    grid.clear_wall(0, 0)
+    grid.clear_wall(rows - 1, cols - 1)
+    grid.set_start(0, 0)
+    grid.set_goal(rows - 1, cols - 1)
+    return grid
+
+
 # Test the grid
 if __name__ == "__main__":
     print("Simple Map:")
@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
+import math
 import random
 import time
-import json
 import csv
 import os
 import ctypes
 import copy
+import queue
+import threading
 
 try:
     if os.name == "nt":
@@ -15,8 +17,27 @@ try:
 except Exception:
     pass
 
-from algorithms.algorithms import run_astar, run_bfs, run_dfs, run_dijkstra, run_greedy
-from grid.grid import Grid
+from algorithms.algorithms import (
+    STREAMS,
+    CancelToken,
+    IncrementalPlanner,
+    ResultCache,
+    SearchResult,
+    SearchStats,
+    run_astar,
+    run_bfs,
+    run_bidirectional,
+    run_bidirectional_astar,
+    run_dfs,
+    run_dijkstra,
+    run_greedy,
+    run_jps,
+    search_events,
+)
+from grid.grid import MAX_CELL_COST, Grid
+from mapfile import load_map, save_map
+from render import AutoRenderer, bind_viewport
+from compare import ParallelCompare
 from grid.grid import (
     create_andrew_map_5x5,
     create_comparison_map,
@@ -29,7 +50,168 @@ from grid.grid import (
     create_yassin_maze_5x5,
     create_yassin_simple_3x3,
 )
-from heuristics import euclidean, manhattan
+from heuristics import chebyshev, euclidean, manhattan, octile
+from fields import run_flow_field
+from hpa import run_hpa
+from landmarks import landmark_heuristic, resolve_kwargs
+
+
+def _format_cost(cost):
+    # Integer step counts print as-is; weighted/diagonal costs get 2 decimals
+    return f"{cost:.2f}" if isinstance(cost, float) else str(cost)
+
+
+JOB_POLL_MS = 30  # how often the Tk thread looks for finished background searches
+TARGET_FPS = 30
+FRAME_BUDGET = 0.5  # share of each frame spent applying animation events; the rest draws
+SPEED_MULTIPLIERS = {"1x": 1, "2x": 2, "5x": 5, "10x": 10, "100x": 100, "Max": None}
+COMPARE_DEFAULT_PANES = 5  # algorithms selected when the compare window opens
+
+
+class FrameScheduler:
+    """Plays an animation on a Tk widget at a fixed frame rate.
+
+    step() applies one event (an expansion, a path cell) and returns False
+    when there are none left. Every frame applies the events that are due
+    at rate() events per second, or as many as fit when rate() is None,
+    stopping early once the frame's time budget is spent. Then draw() runs
+    once for all of them. on_done() runs after the last event.
+    """
+
+    def __init__(self, widget, step, draw, rate, on_done=None, fps=TARGET_FPS):
+        self.widget = widget
+        self.step = step
+        self.draw = draw
+        self.rate = rate
+        self.on_done = on_done
+        self.fps = fps
+        self.finished = False
+        self._after_id = None
+        self._credit = 0.0  # events due but not applied yet
+        self._last = 0.0
+
+    @property
+    def playing(self):
+        return self._after_id is not None
+
+    def play(self):
+        if self.playing or self.finished:
+            return
+        self._last = time.perf_counter()
+        self._credit = 1.0  # show the first event right away
+        self._frame()
+
+    def pause(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def step_once(self):
+        """Apply exactly one event and draw it (the Step button)"""
+        if self.finished:
+            return
+        if self.step():
+            self.draw()
+        else:
+            self._finish()
+
+    def _finish(self):
+        self.finished = True
+        self.pause()
+        self.draw()
+        if self.on_done is not None:
+            self.on_done()
+
+    def _frame(self):
+        self._after_id = None
+        now = time.perf_counter()
+        rate = self.rate()
+        if rate is None:
+            due = None
+        else:
+            self._credit += rate * (now - self._last)
+            due = int(self._credit)
+        self._last = now
+
+        deadline = now + FRAME_BUDGET / self.fps
+        applied = 0
+        while due is None or applied < due:
+            if not self.step():
+                self._finish()
+                return
+            applied += 1
+            if time.perf_counter() > deadline:
+                break
+        if rate is not None:
+            # What did not fit this frame is not carried over as a burst
+            self._credit = min(self._credit - applied, rate / self.fps)
+        if applied:
+            self.draw()
+        self._after_id = self.widget.after(max(1, int(1000 / self.fps)), self._frame)
+
+
+class SearchWorker:
+    """Runs one search job at a time on a worker thread for a Tk window.
+
+    start(work, on_done) calls work(token) on a daemon thread with a fresh
+    CancelToken. The result comes back through a queue that the Tk thread
+    polls with after(), and on_done(result) runs there. Starting another
+    job, or cancel(), cancels the running one. The result of a cancelled
+    job is dropped even if the thread still finishes it.
+    """
+
+    def __init__(self, widget, on_error):
+        self.widget = widget
+        self.on_error = on_error
+        self._results = queue.Queue()
+        self._token = None
+        self._serial = 0
+        self._poll_id = None
+
+    @property
+    def running(self):
+        return self._token is not None
+
+    def start(self, work, on_done):
+        self.cancel()
+        token = self._token = CancelToken()
+        serial = self._serial
+
+        def run():
+            try:
+                self._results.put((serial, on_done, work(token), None))
+            except Exception as e:  # SearchCancelled included; dropped in _poll
+                self._results.put((serial, on_done, None, e))
+
+        threading.Thread(target=run, daemon=True).start()
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(JOB_POLL_MS, self._poll)
+
+    def cancel(self):
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
+        self._serial += 1
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                serial, on_done, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if serial != self._serial:
+                continue  # cancelled or replaced
+            self._token = None
+            if error is not None:
+                self.on_error(error)
+            else:
+                on_done(result)
+        if self._token is not None:
+            self._poll_id = self.widget.after(JOB_POLL_MS, self._poll)
 
 
 class PathfindingGUI(tk.Tk):
@@ -56,15 +238,20 @@ class PathfindingGUI(tk.Tk):
         self.animate_var = tk.BooleanVar(value=True)
         self.animate_search_var = tk.BooleanVar(value=True)
         self.speed_ms_var = tk.IntVar(value=35)
+        self.speed_multiplier_var = tk.StringVar(value="1x")
+        self.diagonal_var = tk.BooleanVar(value=False)
+        self.corner_cutting_var = tk.BooleanVar(value=False)
+        self.search_stats_var = tk.BooleanVar(value=False)
 
-        self._animation_after_id = None
+        self._player = None  # FrameScheduler of the running search or path animation
         self._full_path = None
         self._anim_index = 0
 
-        self._search_after_id = None
-        self._search_order = None
-        self._search_index = 0
+        self._search_stream = None  # generator from search_events, pulled by the player
+        self._search_context = None
+        self._search_result = None
         self._expanded_set = set()
+        self._expanded_added = []  # cells put into _expanded_set since the last draw
         self._is_paused = False
 
         self.maps = {
@@ -87,12 +274,24 @@ class PathfindingGUI(tk.Tk):
             "Greedy Best-First": run_greedy,
             "BFS": run_bfs,
             "DFS": run_dfs,
+            "Bidirectional BFS": run_bidirectional,
+            "Bidirectional A*": run_bidirectional_astar,
+            "Jump Point Search": run_jps,
+            "Flow Field": run_flow_field,
+            "HPA* (hierarchical)": run_hpa,
         }
 
         self.heuristics = {
-            "Manhattan (default)": manhattan,
+            "Default (Manhattan / Octile)": None,
+            "Manhattan": manhattan,
             "Euclidean": euclidean,
+            "Octile": octile,
+            "Chebyshev": chebyshev,
+            # Built per map from landmark distance tables (see landmarks.py)
+            "ALT (landmarks)": landmark_heuristic,
         }
+        # Algorithms that accept a heuristic= argument
+        self._heuristic_algos = ("A*", "Greedy Best-First", "Bidirectional A*")
 
         self.selected_map_name = tk.StringVar(value=list(self.maps.keys())[0])
         self.selected_algo_name = tk.StringVar(value=list(self.algorithms.keys())[0])
@@ -105,17 +304,60 @@ class PathfindingGUI(tk.Tk):
         self.status_var = tk.StringVar(value="Ready")
 
         self._last_results = []  # list of dicts for leaderboard/export
+        # Re-running a search on an unchanged map returns the stored result
+        self.result_cache = ResultCache()
+        # Searches run on a worker thread; the cache is shared, so one at a time
+        self._cache_lock = threading.Lock()
+        self.worker = SearchWorker(self, self._on_search_error)
 
         self._build_ui()
         self._load_map()
         self._on_algo_change()
 
     def _copy_grid(self, grid):
-        g = Grid(grid.rows, grid.cols)
-        g.walls = set(grid.walls)
-        g.start = grid.start
-        g.goal = grid.goal
-        return g
+        return grid.copy()
+
+    def _algo_kwargs(self, algo_name, grid=None, resolve=True):
+        """Extra keyword arguments for an algorithm (the selected heuristic)
+
+        With resolve=False the ALT choice stays the landmark_heuristic
+        factory, for a worker thread to build with resolve_kwargs().
+        """
+        if algo_name in self._heuristic_algos:
+            heuristic = self.heuristics[self.selected_heuristic_name.get()]
+            if heuristic is landmark_heuristic and resolve:
+                heuristic = landmark_heuristic(grid if grid is not None else self.grid_obj)
+            return {"heuristic": heuristic}
+        return {}
+
+    def _cached_run(self, func, grid, token, kwargs):
+        """Worker-thread search through the shared result cache.
+
+        Returns (SearchResult, cache hit?).
+        """
+        kwargs = resolve_kwargs(kwargs, grid)
+        with self._cache_lock:
+            result = SearchResult(*self.result_cache.run(func, grid, cancel=token, **kwargs))
+            return result, self.result_cache.last_hit
+
+    def _on_search_error(self, error):
+        self._set_metrics(f"Search failed: {error}\n")
+        self.status_var.set("Search failed")
+
+    def _apply_movement(self, grid):
+        grid.set_movement(self.diagonal_var.get(), self.corner_cutting_var.get())
+
+    def _on_movement_change(self):
+        if self.grid_obj is None:
+            return
+        self._cancel_animation()
+        self._expanded_set = set()
+        self._apply_movement(self.grid_obj)
+        self.last_path = None
+        moves = "8-connected" if self.diagonal_var.get() else "4-connected"
+        self._set_metrics(f"Movement: {moves}. Click Run to solve again.\n")
+        self.status_var.set(f"Movement: {moves}")
+        self._draw()
 
     def _is_random_map_selected(self):
         return self.selected_map_name.get() == self._random_map_key
@@ -128,6 +370,7 @@ class PathfindingGUI(tk.Tk):
         self._random_run_counter += 1
         self._last_random_seed = time.time_ns()
         self.grid_obj = self._create_random_map(seed=self._last_random_seed)
+        self._apply_movement(self.grid_obj)
         self.last_path = None
         self._set_metrics("Random map regenerated. Choose an algorithm and click Run.\n")
         self.status_var.set("Random map regenerated")
@@ -236,6 +479,8 @@ class PathfindingGUI(tk.Tk):
 
         self.canvas = tk.Canvas(canvas_frame, background="#0f172a")
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.renderer = AutoRenderer(self.canvas, labels=True)
+        bind_viewport(self.canvas, self.renderer)
 
         # Right panel
         right = ttk.Frame(mid, width=320)
@@ -256,6 +501,23 @@ class PathfindingGUI(tk.Tk):
             text="Animate Search (expanded nodes)",
             variable=self.animate_search_var,
         ).pack(anchor="w", pady=(4, 0))
+        ttk.Checkbutton(
+            controls,
+            text="Diagonal moves (8-connected)",
+            variable=self.diagonal_var,
+            command=self._on_movement_change,
+        ).pack(anchor="w", pady=(4, 0))
+        ttk.Checkbutton(
+            controls,
+            text="Allow corner cutting",
+            variable=self.corner_cutting_var,
+            command=self._on_movement_change,
+        ).pack(anchor="w", pady=(4, 0))
+        ttk.Checkbutton(
+            controls,
+            text="Search stats (heap, frontier, phase timers)",
+            variable=self.search_stats_var,
+        ).pack(anchor="w", pady=(4, 0))
 
         btn_row = ttk.Frame(controls)
         btn_row.pack(fill=tk.X, pady=(8, 0))
@@ -271,6 +533,16 @@ class PathfindingGUI(tk.Tk):
             variable=self.speed_ms_var,
             orient="horizontal",
         ).pack(fill=tk.X)
+        speed_row = ttk.Frame(controls)
+        speed_row.pack(fill=tk.X, pady=(4, 0))
+        ttk.Label(speed_row, text="Speed multiplier:").pack(side=tk.LEFT)
+        ttk.Combobox(
+            speed_row,
+            textvariable=self.speed_multiplier_var,
+            values=list(SPEED_MULTIPLIERS),
+            state="readonly",
+            width=6,
+        ).pack(side=tk.LEFT, padx=(8, 0))
 
         self.metrics_text = tk.Text(
             right,
@@ -291,6 +563,7 @@ class PathfindingGUI(tk.Tk):
         self._legend_row(legend, "Goal", "#ef4444")
         self._legend_row(legend, "Wall", "#334155")
         self._legend_row(legend, "Empty", "#e2e8f0")
+        self._legend_row(legend, "Slow terrain", "#d6c7a1")
         self._legend_row(legend, "Path", "#38bdf8")
         self._legend_row(legend, "Expanded", "#f59e0b")
 
@@ -315,23 +588,19 @@ class PathfindingGUI(tk.Tk):
         self.metrics_text.configure(state="disabled")
 
     def _cancel_animation(self):
-        if self._animation_after_id is not None:
-            try:
-                self.after_cancel(self._animation_after_id)
-            except Exception:
-                pass
-            self._animation_after_id = None
+        # A search still running in the background is for the old state too
+        self.worker.cancel()
+        if self._player is not None:
+            self._player.pause()
+            self._player = None
         self._full_path = None
         self._anim_index = 0
 
-        if self._search_after_id is not None:
-            try:
-                self.after_cancel(self._search_after_id)
-            except Exception:
-                pass
-            self._search_after_id = None
-        self._search_order = None
-        self._search_index = 0
+        if self._search_stream is not None:
+            self._search_stream.close()
+        self._search_stream = None
+        self._search_context = None
+        self._search_result = None
 
     def _load_map(self):
         self._cancel_animation()
@@ -344,6 +613,7 @@ class PathfindingGUI(tk.Tk):
             self.grid_obj = self._create_random_map(seed=self._last_random_seed)
         else:
             self.grid_obj = creator()
+        self._apply_movement(self.grid_obj)
         self.last_path = None
         if self._is_random_map_selected():
             self._set_metrics("Random map loaded. Click Run to solve, or Regenerate to create a new map.\n")
@@ -367,6 +637,8 @@ class PathfindingGUI(tk.Tk):
 
     def _pause(self):
         self._is_paused = True
+        if self._player is not None:
+            self._player.pause()
         self.status_var.set("Paused")
 
     def _resume(self):
@@ -374,12 +646,12 @@ class PathfindingGUI(tk.Tk):
             return
         self._is_paused = False
         self.status_var.set("Running")
-        if self._search_order is not None:
-            self._animate_search_step()
-        elif self._full_path is not None:
-            self._animate_step()
+        if self._player is not None:
+            self._player.play()
 
     def _stop(self):
+        if self.worker.running:
+            self._set_metrics("Search stopped.\n")
         self._cancel_animation()
         self.last_path = None
         self._expanded_set = set()
@@ -389,60 +661,64 @@ class PathfindingGUI(tk.Tk):
 
     def _step_once(self):
         # Step through search first, then through path
-        if self._search_order is not None:
-            self._animate_search_step(step_only=True)
-            return
-        if self._full_path is not None:
-            self._animate_step(step_only=True)
+        if self._player is not None:
+            self._player.step_once()
 
-    def _animate_step(self, step_only=False):
-        if not self._full_path:
-            self._animation_after_id = None
-            return
-
-        if self._anim_index >= len(self._full_path):
-            self._animation_after_id = None
-            return
-
-        self.last_path = self._full_path[: self._anim_index + 1]
-        self._anim_index += 1
-        self._draw()
-
-        if step_only or self._is_paused:
-            self._animation_after_id = None
-            return
+    def _animation_rate(self):
+        """Animation events per second (None = as fast as frames allow)"""
+        multiplier = SPEED_MULTIPLIERS[self.speed_multiplier_var.get()]
+        if multiplier is None:
+            return None
+        return 1000.0 / max(1, int(self.speed_ms_var.get())) * multiplier
 
-        delay = int(self.speed_ms_var.get())
-        self._animation_after_id = self.after(delay, self._animate_step)
+    def _play(self, step, draw, on_done=None):
+        """Start a new animation; while paused it only shows its first event"""
+        self._player = FrameScheduler(self, step, draw, self._animation_rate, on_done)
+        if self._is_paused:
+            self._player.step_once()
+        else:
+            self._player.play()
 
-    def _animate_search_step(self, step_only=False):
-        if not self._search_order:
-            self._search_after_id = None
-            return
+    def _animate_path(self):
+        if self._full_path is not None and self.animate_var.get():
+            self._play(self._path_event, self._draw_path)
 
-        if self._search_index >= len(self._search_order):
-            self._search_after_id = None
-            # After search animation ends, animate final path if requested
-            if self._full_path is not None and self.animate_var.get() and not self._is_paused:
-                self._animate_step()
-            return
+    def _path_event(self):
+        if self._anim_index >= len(self._full_path):
+            return False
+        self._anim_index += 1
+        return True
 
-        node = self._search_order[self._search_index]
-        self._expanded_set.add(node)
-        self._search_index += 1
+    def _draw_path(self):
+        self.last_path = self._full_path[: self._anim_index]
         self._draw()
 
-        if step_only or self._is_paused:
-            self._search_after_id = None
-            return
-
-        delay = int(self.speed_ms_var.get())
-        self._search_after_id = self.after(delay, self._animate_search_step)
+    def _animate_search(self):
+        self._play(self._search_event, self._draw, self._search_done)
+
+    def _search_event(self):
+        event = next(self._search_stream)
+        if isinstance(event, SearchResult):
+            self._search_result = event
+            return False
+        self._expanded_set.add(event[0])
+        self._expanded_added.append(event[0])
+        return True
+
+    def _search_done(self):
+        # The search has finished: show its result, then the path
+        self._search_stream = None
+        self._finish_run(self._search_result, *self._search_context)
+        self._search_context = self._search_result = None
+        self._draw()
+        if self._full_path is not None and self.animate_var.get():
+            self._player = FrameScheduler(self, self._path_event, self._draw_path, self._animation_rate)
+            if not self._is_paused:
+                self._player.play()
 
     def _on_algo_change(self):
         algo_name = self.selected_algo_name.get()
-        is_greedy = "Greedy" in algo_name
-        if is_greedy:
+        if algo_name in self._heuristic_algos:
             self.heuristic_label.pack(side=tk.LEFT, before=self.run_button)
             self.heuristic_combo.pack(side=tk.LEFT, padx=(8, 16), before=self.run_button)
         else:
@@ -459,34 +735,67 @@ class PathfindingGUI(tk.Tk):
         # Reset any previous expanded visualization for this new run
         self._expanded_set = set()
 
-        trace = bool(self.animate_search_var.get())
-        if "Greedy" in algo_name:
-            heuristic = self.heuristics[self.selected_heuristic_name.get()]
-            if trace:
-                path, cost, expanded, time_taken, expanded_order = algo(
-                    self.grid_obj, heuristic=heuristic, trace=True
-                )
-            else:
-                path, cost, expanded, time_taken = algo(self.grid_obj, heuristic=heuristic)
-                expanded_order = None
-        else:
-            if trace:
-                path, cost, expanded, time_taken, expanded_order = algo(self.grid_obj, trace=True)
-            else:
-                path, cost, expanded, time_taken = algo(self.grid_obj)
-                expanded_order = None
+        kwargs = self._algo_kwargs(algo_name, resolve=False)
+        # Instrumented runs always search (the result cache is bypassed)
+        stats = SearchStats() if self.search_stats_var.get() else None
+        if stats is not None:
+            kwargs["stats"] = stats
+        # The worker thread gets its own copy, so the map can change under it
+        grid = self._copy_grid(self.grid_obj)
+        self._set_metrics(f"Searching with {algo_name}... (Stop cancels)\n")
+        self._draw()
+
+        if self.animate_search_var.get():
+            # Animated runs search lazily: every frame pulls one expansion
+            # from the stream, and the result arrives as its last event. The
+            # worker only does the slow preparation (freezing the map, ALT
+            # tables), or the whole search for algorithms without a stream,
+            # whose expanded order is then replayed.
+            def prepare(token):
+                resolved = resolve_kwargs(kwargs, grid)
+                grid.freeze()
+                grid.components()
+                if algo in STREAMS:
+                    return resolved, None
+                return resolved, list(search_events(algo, grid, cancel=token, **resolved))
+
+            def start_animation(prepared):
+                resolved, events = prepared
+                self.grid_obj.adopt(grid)
+                if events is None:
+                    self._search_stream = search_events(algo, grid, **resolved)
+                else:
+                    self._search_stream = (event for event in events)
+                self._search_context = (algo_name, stats, "  Result cache: not used (streamed search)")
+                self._animate_search()
+
+            self.worker.start(prepare, start_animation)
+            return
+
+        def show(outcome):
+            result, hit = outcome
+            self.grid_obj.adopt(grid)
+            cache_stats = self.result_cache.stats()
+            cache_line = (
+                f"  Result cache: {'hit' if hit else 'miss'}"
+                f" ({cache_stats['hits']} hits / {cache_stats['misses']} misses)"
+            )
+            self._finish_run(result, algo_name, stats, cache_line)
+            self._draw()
+            self._animate_path()
+
+        self.worker.start(lambda token: self._cached_run(algo, grid, token, kwargs), show)
+
+    def _finish_run(self, result, algo_name, stats, cache_line):
+        """Show a finished search in the metrics panel and set up its path"""
+        path, cost, expanded, time_taken = result
+        if stats is not None:
+            cache_line = "  Search stats:\n" + stats.summary()
 
         self._full_path = path if path is not None else None
         self.last_path = [] if (path is not None and self.animate_var.get()) else path
         self._anim_index = 0
 
-        if expanded_order is not None:
-            self._search_order = expanded_order
-            self._search_index = 0
-            # If search animation is disabled, still show the explored nodes immediately.
-            if not self.animate_search_var.get():
-                self._expanded_set = set(expanded_order)
-
         if path is None:
             result = "NO PATH FOUND"
             path_str = "(none)"
@@ -494,8 +803,8 @@ class PathfindingGUI(tk.Tk):
             result = "PATH FOUND"
             path_str = " -> ".join([str(p) for p in path])
 
-        algo_display = self.selected_algo_name.get()
-        if "Greedy" in algo_name:
+        algo_display = algo_name
+        if algo_name in self._heuristic_algos:
             heuristic_name = self.selected_heuristic_name.get()
             algo_display = f"{algo_display}\n  Heuristic: {heuristic_name}"
 
@@ -516,9 +825,10 @@ class PathfindingGUI(tk.Tk):
                     "",
                     "━" * 30,
                     f"  Result: {result}",
-                    f"  Path length: {cost} steps",
+                    f"  Path cost: {_format_cost(cost)}",
                     f"  Expanded nodes: {expanded}",
                     f"  Time: {time_taken:.6f} sec",
+                    cache_line,
                     "━" * 30,
                     "",
                     "Path:",
@@ -527,46 +837,48 @@ class PathfindingGUI(tk.Tk):
             )
             + "\n"
         )
-
-        self._draw()
-        if self._search_order is not None and self.animate_search_var.get():
-            self._animate_search_step()
-        elif self._full_path is not None and self.animate_var.get():
-            self._animate_step()
-
         self.status_var.set("Done")
 
     def _run_all(self):
-        # Runs all algorithms on the current map and stores results for export
+        # Runs all algorithms on the current map (on the worker thread) and stores results for export
         if self.grid_obj is None:
             return
+        self._cancel_animation()
+        grid = self._copy_grid(self.grid_obj)
+        runs = [(name, func, self._algo_kwargs(name, resolve=False)) for name, func in self.algorithms.items()]
+
+        def work(token):
+            grid.freeze()  # copies made after this share the frozen map
+            results = []
+            for algo_name, algo_func, kwargs in runs:
+                g = self._copy_grid(grid)
+                (path, cost, expanded, time_taken), _ = self._cached_run(algo_func, g, token, kwargs)
+                results.append(
+                    {
+                        "Algorithm": algo_name,
+                        "Found": "Yes" if path is not None else "No",
+                        "Cost": cost,
+                        "Expanded": expanded,
+                        "Time": time_taken,
+                    }
+                )
+            return results
+
+        def show(results):
+            self.grid_obj.adopt(grid)
+            self._last_results = results
+            # Show in metrics as a small table
+            lines = ["Run All Results:", "| Algorithm | Found | Cost | Expanded | Time (s) |", "|---|---|---:|---:|---:|"]
+            for r in self._last_results:
+                lines.append(
+                    f"| {r['Algorithm']} | {r['Found']} | {_format_cost(r['Cost'])} | {r['Expanded']} | {r['Time']:.6f} |"
+                )
+            self._set_metrics("\n".join(lines) + "\n")
+            self.status_var.set("Run All complete")
 
-        self._last_results = []
-        for algo_name, algo_func in self.algorithms.items():
-            g = self._copy_grid(self.grid_obj)
-            if "Greedy" in algo_name:
-                heuristic = self.heuristics[self.selected_heuristic_name.get()]
-                path, cost, expanded, time_taken = algo_func(g, heuristic=heuristic)
-            else:
-                path, cost, expanded, time_taken = algo_func(g)
-            self._last_results.append(
-                {
-                    "Algorithm": algo_name,
-                    "Found": "Yes" if path is not None else "No",
-                    "Cost": cost,
-                    "Expanded": expanded,
-                    "Time": time_taken,
-                }
-            )
-
-        # Show in metrics as a small table
-        lines = ["Run All Results:", "| Algorithm | Found | Cost | Expanded | Time (s) |", "|---|---|---:|---:|---:|"]
-        for r in self._last_results:
-            lines.append(
-                f"| {r['Algorithm']} | {r['Found']} | {r['Cost']} | {r['Expanded']} | {r['Time']:.6f} |"
-            )
-        self._set_metrics("\n".join(lines) + "\n")
-        self.status_var.set("Run All complete")
+        self._set_metrics("Running all algorithms... (Stop cancels)\n")
+        self.status_var.set("Running all...")
+        self.worker.start(work, show)
 
     def _export_last_results_csv(self):
         if not self._last_results:
@@ -672,239 +984,248 @@ class PathfindingGUI(tk.Tk):
         except Exception as e:
             messagebox.showerror("Export Screenshot", str(e))
 
+    def _compare_choices(self):
+        """(function, kwargs) per entry of the compare window's list.
+
+        Every algorithm with the heuristic picked in the main window, then
+        each heuristic algorithm once per heuristic, so heuristics can be
+        compared against each other too.
+        """
+        choices = {
+            name: (func, self._algo_kwargs(name, resolve=False)) for name, func in self.algorithms.items()
+        }
+        for algo_name in self._heuristic_algos:
+            for heuristic_name, heuristic in self.heuristics.items():
+                if heuristic is not None:
+                    choices[f"{algo_name} + {heuristic_name}"] = (
+                        self.algorithms[algo_name], {"heuristic": heuristic}
+                    )
+        return choices
+
     def _open_compare_window(self):
         if self.grid_obj is None:
             return
 
         win = tk.Toplevel(self)
         win.title("Compare Algorithms")
-        win.geometry("1100x600")
+        win.geometry("1200x760")
 
-        left_algo = tk.StringVar(value=list(self.algorithms.keys())[0])
-        right_algo = tk.StringVar(value=list(self.algorithms.keys())[1])
+        choices = self._compare_choices()
 
         top = ttk.Frame(win, padding=10)
         top.pack(side=tk.TOP, fill=tk.X)
-        ttk.Label(top, text="Left:").pack(side=tk.LEFT)
-        left_combo = ttk.Combobox(
-            top,
-            textvariable=left_algo,
-            values=list(self.algorithms.keys()),
-            state="readonly",
-            width=18,
-        )
-        left_combo.pack(side=tk.LEFT, padx=6)
-        ttk.Label(top, text="Right:").pack(side=tk.LEFT, padx=(16, 0))
-        right_combo = ttk.Combobox(
-            top,
-            textvariable=right_algo,
-            values=list(self.algorithms.keys()),
-            state="readonly",
-            width=18,
-        )
-        right_combo.pack(side=tk.LEFT, padx=6)
-
-        mid = ttk.Frame(win, padding=10)
-        mid.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-
-        canvas_l = tk.Canvas(mid, background="#0f172a")
-        canvas_r = tk.Canvas(mid, background="#0f172a")
-        canvas_l.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 6))
-        canvas_r.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(6, 0))
-
-        metrics = tk.Text(win, height=8, wrap="word")
+        ttk.Label(top, text="Algorithms:").pack(side=tk.LEFT, anchor="n")
+        chooser = tk.Listbox(top, selectmode=tk.MULTIPLE, exportselection=False, height=6, width=40)
+        chooser_scroll = ttk.Scrollbar(top, orient="vertical", command=chooser.yview)
+        chooser.configure(yscrollcommand=chooser_scroll.set)
+        chooser.pack(side=tk.LEFT, padx=(6, 0))
+        chooser_scroll.pack(side=tk.LEFT, fill=tk.Y)
+        for label in choices:
+            chooser.insert(tk.END, label)
+        chooser.selection_set(0, min(len(self.algorithms), COMPARE_DEFAULT_PANES) - 1)
+
+        panes_frame = ttk.Frame(win, padding=10)
+        panes_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        metrics = tk.Text(win, height=10, wrap="none")
         metrics.pack(side=tk.BOTTOM, fill=tk.X)
 
         state = {
-            "g1": None,
-            "g2": None,
-            "p1_full": None,
-            "p2_full": None,
-            "p1": None,
-            "p2": None,
-            "order1": None,
-            "order2": None,
-            "exp1": set(),
-            "exp2": set(),
-            "i1": 0,
-            "i2": 0,
-            "pi1": 0,
-            "pi2": 0,
-            "phase": "idle",  # idle | search | path
-            "after_id": None,
-            "c1": 0,
-            "c2": 0,
-            "e1": 0,
-            "e2": 0,
-            "t1": 0.0,
-            "t2": 0.0,
+            "grid": None,  # read-only copy of the map, drawn in every pane
+            "panes": [],
+            "job": None,  # ParallelCompare while the searches run
+            "poll_id": None,
+            "player": None,  # FrameScheduler of a replay
         }
 
-        def cancel_anim():
-            if state["after_id"] is not None:
+        def set_metrics(text):
+            metrics.delete("1.0", tk.END)
+            metrics.insert(tk.END, text)
+
+        def stop():
+            if state["job"] is not None:
+                state["job"].cancel()
+                state["job"] = None
+                for pane in state["panes"]:
+                    if pane["result"] is None and pane["error"] is None:
+                        pane["error"] = "cancelled"
+                        draw_pane(pane)
+                show_metrics()
+            if state["poll_id"] is not None:
                 try:
-                    win.after_cancel(state["after_id"])
+                    win.after_cancel(state["poll_id"])
                 except Exception:
                     pass
-                state["after_id"] = None
-            state["phase"] = "idle"
-
-        def draw_on(canvas, grid, path, expanded_set):
-            canvas.delete("all")
-            rows, cols = grid.rows, grid.cols
-            w = max(1, canvas.winfo_width())
-            h = max(1, canvas.winfo_height())
-            padding = 18
-            cell = max(8, min((w - 2 * padding) // cols, (h - 2 * padding) // rows))
-            x0 = (w - cell * cols) // 2
-            y0 = (h - cell * rows) // 2
-            path_set = set(path) if path else set()
-            for rr in range(rows):
-                for cc in range(cols):
-                    x1 = x0 + cc * cell
-                    y1 = y0 + rr * cell
-                    x2 = x1 + cell
-                    y2 = y1 + cell
-                    fill = "#e2e8f0"
-                    if (rr, cc) in grid.walls:
-                        fill = "#334155"
-                    if (rr, cc) in expanded_set and (rr, cc) not in grid.walls and (rr, cc) not in (grid.start, grid.goal):
-                        fill = "#fbbf24"
-                    if (rr, cc) in path_set and (rr, cc) not in (grid.start, grid.goal):
-                        fill = "#38bdf8"
-                    if (rr, cc) == grid.start:
-                        fill = "#22c55e"
-                    if (rr, cc) == grid.goal:
-                        fill = "#ef4444"
-                    canvas.create_rectangle(x1, y1, x2, y2, fill=fill, outline="#0f172a", width=2)
-
-        def compute():
-            try:
-                cancel_anim()
-                g1 = self._copy_grid(self.grid_obj)
-                g2 = self._copy_grid(self.grid_obj)
-                a1 = self.algorithms[left_algo.get()]
-                a2 = self.algorithms[right_algo.get()]
-
-                def run_algo(a, g, name):
-                    if "Greedy" in name:
-                        heuristic = self.heuristics[self.selected_heuristic_name.get()]
-                        return a(g, heuristic=heuristic, trace=True)
-                    return a(g, trace=True)
-
-                p1, c1, e1, t1, order1 = run_algo(a1, g1, left_algo.get())
-                p2, c2, e2, t2, order2 = run_algo(a2, g2, right_algo.get())
-
-                state.update(
-                    {
-                        "g1": g1,
-                        "g2": g2,
-                        "p1_full": p1,
-                        "p2_full": p2,
-                        "p1": [],
-                        "p2": [],
-                        "order1": order1 or [],
-                        "order2": order2 or [],
-                        "exp1": set(),
-                        "exp2": set(),
-                        "i1": 0,
-                        "i2": 0,
-                        "pi1": 0,
-                        "pi2": 0,
-                        "c1": c1,
-                        "c2": c2,
-                        "e1": e1,
-                        "e2": e2,
-                        "t1": t1,
-                        "t2": t2,
-                        "phase": "search",
-                    }
+                state["poll_id"] = None
+            if state["player"] is not None:
+                state["player"].pause()
+                state["player"] = None
+
+        def build_panes(labels):
+            for child in panes_frame.winfo_children():
+                child.destroy()
+            layout = ttk.Frame(panes_frame)
+            layout.pack(fill=tk.BOTH, expand=True)
+            per_row = math.ceil(math.sqrt(len(labels)))
+            panes = []
+            for i, label in enumerate(labels):
+                row, column = divmod(i, per_row)
+                frame = ttk.Frame(layout)
+                frame.grid(row=row, column=column, sticky="nsew", padx=4, pady=4)
+                title = tk.StringVar(value=f"{label}: starting...")
+                ttk.Label(frame, textvariable=title).pack(side=tk.TOP, anchor="w")
+                canvas = tk.Canvas(frame, background="#0f172a", highlightthickness=0)
+                canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+                pane = {
+                    "label": label,
+                    "title": title,
+                    "renderer": AutoRenderer(canvas, min_cell=4),
+                    "order": [],  # expanded cells in expansion order, for replays
+                    "expanded": set(),
+                    "added": [],  # cells put into "expanded" since the pane was drawn
+                    "frontier": None,
+                    "result": None,  # SearchResult once done
+                    "error": None,
+                    "path": [],
+                    "shown": None,  # replay position (expansions, path cells), None = show all
+                }
+                bind_viewport(canvas, pane["renderer"])
+                canvas.bind("<Configure>", lambda _e, p=pane: draw_pane(p))
+                panes.append(pane)
+            for row in range(math.ceil(len(labels) / per_row)):
+                layout.grid_rowconfigure(row, weight=1, uniform="pane")
+            for column in range(per_row):
+                layout.grid_columnconfigure(column, weight=1, uniform="pane")
+            state["panes"] = panes
+
+        def pane_title(pane):
+            result = pane["result"]
+            if pane["error"] is not None:
+                return f"{pane['label']}: {pane['error']}"
+            if result is None:
+                frontier = "" if pane["frontier"] is None else f", frontier {pane['frontier']}"
+                return f"{pane['label']}: searching... {len(pane['expanded'])} expanded{frontier}"
+            found = f"cost {_format_cost(result.cost)}" if result.path is not None else "no path"
+            return f"{pane['label']}: {found}, {result.expanded_nodes} expanded, {result.time_taken:.4f}s"
+
+        def draw_pane(pane):
+            if state["grid"] is None:
+                return
+            pane["title"].set(pane_title(pane))
+            path = pane["path"]
+            if pane["shown"] is not None:
+                path = path[: pane["shown"][1]]
+            added, pane["added"] = pane["added"], []
+            pane["renderer"].draw(state["grid"], path, pane["expanded"], added)
+
+        def show_metrics(job=None):
+            lines = [
+                "| Algorithm | Status | Found | Cost | Expanded | Time (s) |",
+                "|---|---|---|---:|---:|---:|",
+            ]
+            total = 0.0
+            for pane in state["panes"]:
+                result = pane["result"]
+                if result is None:
+                    status = pane["error"] or "searching"
+                    lines.append(f"| {pane['label']} | {status} | - | - | {len(pane['expanded'])} | - |")
+                    continue
+                total += result.time_taken
+                lines.append(
+                    f"| {pane['label']} | done | {'Yes' if result.path is not None else 'No'} "
+                    f"| {_format_cost(result.cost)} | {result.expanded_nodes} | {result.time_taken:.6f} |"
                 )
-                metrics.delete("1.0", tk.END)
-                metrics.insert(
-                    tk.END,
-                    f"Left: {left_algo.get()} | Found={p1 is not None} Cost={c1} Expanded={e1} Time={t1:.6f}\n"
-                    f"Right: {right_algo.get()} | Found={p2 is not None} Cost={c2} Expanded={e2} Time={t2:.6f}\n",
+            if job is not None and job.elapsed is not None:
+                lines.append(
+                    f"\n{len(state['panes'])} searches in {job.workers} worker processes: "
+                    f"{job.elapsed:.3f}s wall clock (start-up included), {total:.3f}s of search time."
                 )
-            except Exception as e:
-                metrics.delete("1.0", tk.END)
-                metrics.insert(tk.END, f"Compare error: {e}\n")
+            set_metrics("\n".join(lines) + "\n")
 
-        def redraw():
-            if state["g1"] is None or state["g2"] is None:
+        def poll():
+            # Runs on the Tk thread: apply the progress the workers sent
+            state["poll_id"] = None
+            job = state["job"]
+            if job is None:
                 return
-            draw_on(canvas_l, state["g1"], state["p1"], state["exp1"])
-            draw_on(canvas_r, state["g2"], state["p2"], state["exp2"])
+            changed = set()
+            for message in job.poll():
+                kind, index = message[:2]
+                pane = state["panes"][index]
+                if kind == "progress":
+                    pane["order"].extend(message[2])
+                    pane["expanded"].update(message[2])
+                    pane["added"].extend(message[2])
+                    if message[3] is not None:
+                        pane["frontier"] = message[3]
+                elif kind == "done":
+                    pane["result"] = message[2]
+                    pane["path"] = message[2].path or []
+                else:
+                    pane["error"] = message[2] or kind
+                changed.add(index)
+            for index in changed:
+                draw_pane(state["panes"][index])
+            show_metrics(job)
+            if job.finished:
+                state["job"] = None
+            else:
+                state["poll_id"] = win.after(JOB_POLL_MS, poll)
 
-        def tick():
-            if state["phase"] == "idle":
-                state["after_id"] = None
+        def run_compare():
+            stop()
+            labels = [chooser.get(i) for i in chooser.curselection()]
+            if not labels:
+                set_metrics("Select at least one algorithm.\n")
                 return
-
-            if state["phase"] == "search":
-                if state["i1"] < len(state["order1"]):
-                    state["exp1"].add(state["order1"][state["i1"]])
-                    state["i1"] += 1
-                if state["i2"] < len(state["order2"]):
-                    state["exp2"].add(state["order2"][state["i2"]])
-                    state["i2"] += 1
-
-                if state["i1"] >= len(state["order1"]) and state["i2"] >= len(state["order2"]):
-                    state["phase"] = "path"
-
-            elif state["phase"] == "path":
-                if state["p1_full"]:
-                    if state["pi1"] < len(state["p1_full"]):
-                        state["p1"] = state["p1_full"][: state["pi1"] + 1]
-                        state["pi1"] += 1
-                if state["p2_full"]:
-                    if state["pi2"] < len(state["p2_full"]):
-                        state["p2"] = state["p2_full"][: state["pi2"] + 1]
-                        state["pi2"] += 1
-
-                done1 = (not state["p1_full"]) or state["pi1"] >= len(state["p1_full"])
-                done2 = (not state["p2_full"]) or state["pi2"] >= len(state["p2_full"])
-                if done1 and done2:
-                    state["phase"] = "idle"
-                    state["after_id"] = None
-
-            redraw()
-            if state["phase"] != "idle":
-                delay = int(self.speed_ms_var.get())
-                state["after_id"] = win.after(delay, tick)
-
-        def play():
-            # Start or restart animation
-            if state["g1"] is None or state["g2"] is None:
+            state["grid"] = self._copy_grid(self.grid_obj)
+            build_panes(labels)
+            job = ParallelCompare(state["grid"], [(label, *choices[label]) for label in labels])
+            try:
+                job.start()
+            except Exception as e:
+                set_metrics(f"Compare error: {e}\n")
                 return
-            cancel_anim()
-            state["exp1"] = set()
-            state["exp2"] = set()
-            state["p1"] = []
-            state["p2"] = []
-            state["i1"] = 0
-            state["i2"] = 0
-            state["pi1"] = 0
-            state["pi2"] = 0
-            state["phase"] = "search"
-            tick()
-
-        def run_compare():
-            compute()
-            redraw()
-            play()
-
-        ttk.Button(top, text="Stop", command=cancel_anim).pack(side=tk.RIGHT)
-        ttk.Button(top, text="Replay", command=play).pack(side=tk.RIGHT, padx=(0, 6))
-        ttk.Button(top, text="Run Compare", command=run_compare).pack(side=tk.RIGHT, padx=(0, 6))
-        canvas_l.bind("<Configure>", lambda _e: redraw())
-        canvas_r.bind("<Configure>", lambda _e: redraw())
-        left_combo.bind("<<ComboboxSelected>>", lambda _e: run_compare())
-        right_combo.bind("<<ComboboxSelected>>", lambda _e: run_compare())
+            state["job"] = job
+            show_metrics()
+            poll()
+
+        def replay_step():
+            # One expansion per pane, then one path cell per pane
+            advanced = False
+            for pane in state["panes"]:
+                expanded, walked = pane["shown"]
+                if expanded < len(pane["order"]):
+                    pane["expanded"].add(pane["order"][expanded])
+                    pane["added"].append(pane["order"][expanded])
+                    pane["shown"] = (expanded + 1, walked)
+                    advanced = True
+                elif walked < len(pane["path"]):
+                    pane["shown"] = (expanded, walked + 1)
+                    advanced = True
+            return advanced
+
+        def replay_draw():
+            for pane in state["panes"]:
+                draw_pane(pane)
+
+        def replay():
+            if state["job"] is not None or not state["panes"]:
+                return  # nothing to replay until the searches are done
+            stop()
+            for pane in state["panes"]:
+                pane["expanded"] = set()
+                pane["shown"] = (0, 0)
+            state["player"] = FrameScheduler(win, replay_step, replay_draw, self._animation_rate)
+            state["player"].play()
+
+        ttk.Button(top, text="Stop", command=stop).pack(side=tk.RIGHT, anchor="n")
+        ttk.Button(top, text="Replay", command=replay).pack(side=tk.RIGHT, anchor="n", padx=(0, 6))
+        ttk.Button(top, text="Run Compare", command=run_compare).pack(side=tk.RIGHT, anchor="n", padx=(0, 6))
 
         run_compare()
 
-        win.protocol("WM_DELETE_WINDOW", lambda: (cancel_anim(), win.destroy()))
+        win.protocol("WM_DELETE_WINDOW", lambda: (stop(), win.destroy()))
 
     def _open_editor_window(self):
         win = tk.Toplevel(self)
@@ -912,6 +1233,10 @@ class PathfindingGUI(tk.Tk):
         win.geometry("1000x650")
 
         mode = tk.StringVar(value="Wall")
+        terrain_cost = tk.IntVar(value=3)
+        live_path = tk.BooleanVar(value=False)
+        live_status = tk.StringVar(value="")
+        live = {"planner": None}
 
         if self.grid_obj is None:
             self.grid_obj = self._create_random_map(seed=time.time_ns())
@@ -921,53 +1246,47 @@ class PathfindingGUI(tk.Tk):
         top = ttk.Frame(win, padding=10)
         top.pack(side=tk.TOP, fill=tk.X)
         ttk.Label(top, text="Mode:").pack(side=tk.LEFT)
-        for m in ("Wall", "Erase", "Start", "Goal"):
+        for m in ("Wall", "Erase", "Terrain", "Start", "Goal"):
             ttk.Radiobutton(top, text=m, variable=mode, value=m).pack(side=tk.LEFT, padx=6)
+        ttk.Label(top, text="Cost:").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Spinbox(top, from_=1, to=99, textvariable=terrain_cost, width=4).pack(side=tk.LEFT, padx=6)
+        ttk.Checkbutton(top, text="Live path", variable=live_path, command=lambda: draw()).pack(side=tk.LEFT, padx=(10, 0))
 
-        ttk.Button(top, text="Load JSON", command=lambda: load_json()).pack(side=tk.RIGHT)
-        ttk.Button(top, text="Save JSON", command=lambda: save_json()).pack(side=tk.RIGHT, padx=(0, 6))
+        ttk.Button(top, text="Load Map", command=lambda: load_file()).pack(side=tk.RIGHT)
+        ttk.Button(top, text="Save Map", command=lambda: save_file()).pack(side=tk.RIGHT, padx=(0, 6))
         ttk.Button(top, text="Use In Simulator", command=lambda: apply_to_sim()).pack(side=tk.RIGHT, padx=(0, 6))
 
         canvas = tk.Canvas(win, background="#0f172a")
         canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=10)
+        renderer = AutoRenderer(canvas)
+        bind_viewport(canvas, renderer)
+        ttk.Label(win, textvariable=live_status).pack(side=tk.BOTTOM, anchor=tk.W, padx=10, pady=(0, 8))
+
+        def plan_live_path():
+            # The planner keeps its search between edits and only repairs
+            # what each click or drag stroke changed
+            if not live_path.get() or editor_grid.start is None or editor_grid.goal is None:
+                live_status.set("")
+                return set()
+            planner = live["planner"]
+            if planner is None or planner.grid is not editor_grid:
+                planner = live["planner"] = IncrementalPlanner(editor_grid)
+            planner.set_goal(editor_grid.goal)
+            planner.move_start(editor_grid.start)
+            path, cost, expanded, time_taken = planner.plan()
+            if path is None:
+                live_status.set(f"Live path: none  |  replanned {expanded} nodes in {time_taken * 1000:.2f} ms")
+                return set()
+            live_status.set(
+                f"Live path: cost {_format_cost(cost)}  |  replanned {expanded} nodes in {time_taken * 1000:.2f} ms"
+            )
+            return set(path)
 
         def draw():
-            canvas.delete("all")
-            rows, cols = editor_grid.rows, editor_grid.cols
-            w = max(1, canvas.winfo_width())
-            h = max(1, canvas.winfo_height())
-            padding = 18
-            cell = max(10, min((w - 2 * padding) // cols, (h - 2 * padding) // rows))
-            x0 = (w - cell * cols) // 2
-            y0 = (h - cell * rows) // 2
-            for rr in range(rows):
-                for cc in range(cols):
-                    x1 = x0 + cc * cell
-                    y1 = y0 + rr * cell
-                    x2 = x1 + cell
-                    y2 = y1 + cell
-                    fill = "#e2e8f0"
-                    if (rr, cc) in editor_grid.walls:
-                        fill = "#334155"
-                    if (rr, cc) == editor_grid.start:
-                        fill = "#22c55e"
-                    if (rr, cc) == editor_grid.goal:
-                        fill = "#ef4444"
-                    canvas.create_rectangle(x1, y1, x2, y2, fill=fill, outline="#0f172a", width=2)
+            renderer.draw(editor_grid, plan_live_path())
 
         def cell_from_event(event):
-            rows, cols = editor_grid.rows, editor_grid.cols
-            w = max(1, canvas.winfo_width())
-            h = max(1, canvas.winfo_height())
-            padding = 18
-            cell = max(10, min((w - 2 * padding) // cols, (h - 2 * padding) // rows))
-            x0 = (w - cell * cols) // 2
-            y0 = (h - cell * rows) // 2
-            c = (event.x - x0) // cell
-            r = (event.y - y0) // cell
-            if 0 <= r < rows and 0 <= c < cols:
-                return int(r), int(c)
-            return None
+            return renderer.cell_at(event.x, event.y)
 
         def on_click(event):
             rc = cell_from_event(event)
@@ -977,43 +1296,46 @@ class PathfindingGUI(tk.Tk):
             m = mode.get()
             if m == "Wall":
                 if (r, c) not in (editor_grid.start, editor_grid.goal):
-                    editor_grid.walls.add((r, c))
+                    editor_grid.set_wall(r, c)
             elif m == "Erase":
-                editor_grid.walls.discard((r, c))
+                editor_grid.clear_wall(r, c)
+                editor_grid.set_cost(r, c, 1)
+            elif m == "Terrain":
+                try:
+                    cost = int(terrain_cost.get())
+                except (tk.TclError, ValueError):
+                    return
+                if editor_grid.is_valid(r, c):
+                    # The Spinbox accepts any typed number; keep it in range
+                    editor_grid.set_cost(r, c, min(max(cost, 1), MAX_CELL_COST))
             elif m == "Start":
-                if (r, c) not in editor_grid.walls and (r, c) != editor_grid.goal:
-                    editor_grid.start = (r, c)
+                if editor_grid.is_valid(r, c) and (r, c) != editor_grid.goal:
+                    editor_grid.set_start(r, c)
             elif m == "Goal":
-                if (r, c) not in editor_grid.walls and (r, c) != editor_grid.start:
-                    editor_grid.goal = (r, c)
+                if editor_grid.is_valid(r, c) and (r, c) != editor_grid.start:
+                    editor_grid.set_goal(r, c)
             draw()
 
-        def save_json():
-            path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        # Binary .pfm files are far smaller and faster to load for big floor plans
+        map_filetypes = [("Map files", "*.json *.pfm"), ("JSON", "*.json"), ("Binary map", "*.pfm")]
+
+        def save_file():
+            path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=map_filetypes)
             if not path:
                 return
-            data = {
-                "rows": editor_grid.rows,
-                "cols": editor_grid.cols,
-                "start": list(editor_grid.start),
-                "goal": list(editor_grid.goal),
-                "walls": [list(x) for x in sorted(editor_grid.walls)],
-            }
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            save_map(editor_grid, path)
             messagebox.showinfo("Save", f"Saved: {path}")
 
-        def load_json():
-            path = filedialog.askopenfilename(filetypes=[("JSON", "*.json")])
+        def load_file():
+            nonlocal editor_grid
+            path = filedialog.askopenfilename(filetypes=map_filetypes)
             if not path:
                 return
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            editor_grid.rows = int(data["rows"])
-            editor_grid.cols = int(data["cols"])
-            editor_grid.start = tuple(data["start"])
-            editor_grid.goal = tuple(data["goal"])
-            editor_grid.walls = set(tuple(w) for w in data.get("walls", []))
+            try:
+                editor_grid = load_map(path)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Load", str(e))
+                return
             draw()
 
         def apply_to_sim():
@@ -1021,6 +1343,8 @@ class PathfindingGUI(tk.Tk):
             self._expanded_set = set()
             self.selected_map_name.set("(Custom)")
             self.maps["(Custom)"] = lambda: self._copy_grid(editor_grid)
+            self.diagonal_var.set(editor_grid.diagonal)
+            self.corner_cutting_var.set(editor_grid.corner_cutting)
             self.grid_obj = self._copy_grid(editor_grid)
             self.last_path = None
             self._set_metrics("Custom map loaded from editor.\n")
@@ -1036,70 +1360,8 @@ class PathfindingGUI(tk.Tk):
     def _draw(self):
         if self.grid_obj is None:
             return
-
-        self.canvas.delete("all")
-
-        rows = self.grid_obj.rows
-        cols = self.grid_obj.cols
-
-        w = max(1, self.canvas.winfo_width())
-        h = max(1, self.canvas.winfo_height())
-
-        padding = 18
-        cell_size = max(10, min((w - 2 * padding) // cols, (h - 2 * padding) // rows))
-
-        total_w = cell_size * cols
-        total_h = cell_size * rows
-
-        x0 = (w - total_w) // 2
-        y0 = (h - total_h) // 2
-
-        path_set = set(self.last_path) if self.last_path else set()
-
-        for r in range(rows):
-            for c in range(cols):
-                x1 = x0 + c * cell_size
-                y1 = y0 + r * cell_size
-                x2 = x1 + cell_size
-                y2 = y1 + cell_size
-
-                if (r, c) in self.grid_obj.walls:
-                    fill = "#334155"
-                else:
-                    fill = "#e2e8f0"
-
-                if (
-                    (r, c) in self._expanded_set
-                    and (r, c) not in self.grid_obj.walls
-                    and (r, c) not in (self.grid_obj.start, self.grid_obj.goal)
-                ):
-                    fill = "#fbbf24"
-
-                if (r, c) in path_set and (r, c) != self.grid_obj.start and (r, c) != self.grid_obj.goal:
-                    fill = "#38bdf8"
-
-                if (r, c) == self.grid_obj.start:
-                    fill = "#22c55e"
-                elif (r, c) == self.grid_obj.goal:
-                    fill = "#ef4444"
-
-                self.canvas.create_rectangle(
-                    x1,
-                    y1,
-                    x2,
-                    y2,
-                    fill=fill,
-                    outline="#0f172a",
-                    width=2,
-                )
-
-                # Optional labels for small grids
-                if rows <= 10 and cols <= 10:
-                    if (r, c) == self.grid_obj.start:
-                        self.canvas.create_text((x1 + x2) // 2, (y1 + y2) // 2, text="S", fill="#0f172a")
-                    elif (r, c) == self.grid_obj.goal:
-                        self.canvas.create_text((x1 + x2) // 2, (y1 + y2) // 2, text="G", fill="#0f172a")
-
+        added, self._expanded_added = self._expanded_added, []
+        self.renderer.draw(self.grid_obj, self.last_path, self._expanded_set, added)
 
 if __name__ == "__main__":
     app = PathfindingGUI()
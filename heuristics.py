@@ -3,6 +3,8 @@ from typing import Tuple
 
 Coord = Tuple[int, int]
 
+SQRT2 = math.sqrt(2)
+
 
 def manhattan(a: Coord, b: Coord) -> float:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
@@ -10,3 +12,13 @@ def manhattan(a: Coord, b: Coord) -> float:
 
 def euclidean(a: Coord, b: Coord) -> float:
     return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def octile(a: Coord, b: Coord) -> float:
+    dr = abs(a[0] - b[0])
+    dc = abs(a[1] - b[1])
+    return max(dr, dc) + (SQRT2 - 1) * min(dr, dc)
+
+
+def chebyshev(a: Coord, b: Coord) -> float:
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
@@ -0,0 +1,445 @@
+"""
+hpa.py - Hierarchical pathfinding (HPA*) for large maps
+
+The grid is cut into square clusters. Where two neighboring clusters
+share an open stretch of border, one or two entrance cells are picked on
+each side. A query first searches the small abstract graph of entrances
+(distances inside a cluster are computed once and reused), then refines
+each abstract hop into cells with a search bounded to one cluster.
+
+Bigger clusters mean fewer abstract nodes and faster queries but paths
+that can be a little longer than optimal; compare_with_astar() measures
+how much.
+"""
+
+import heapq
+import math
+import time
+
+from algorithms.algorithms import CANCEL_INTERVAL, _no_path, run_astar
+from grid.grid import DIAGONALS, SQRT2
+from heuristics import manhattan, octile
+
+
+INF = float("inf")
+DEFAULT_CLUSTER_SIZE = 16
+WIDE_ENTRANCE = 6  # border openings at least this wide get an entrance at each end
+START, GOAL = -1, -2  # ids of the query endpoints in the abstract graph
+
+
+def _local_neighbors(grid, u, box):
+    """(neighbor, edge cost) pairs of u that stay inside box = (r0, r1, c0, c1)"""
+    r0, r1, c0, c1 = box
+    cells, cols, costs = grid._cells, grid.cols, grid.costs
+    row, col = divmod(u, cols)
+    out = []
+    for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        nr, nc = row + dr, col + dc
+        if r0 <= nr < r1 and c0 <= nc < c1:
+            v = nr * cols + nc
+            if not cells[v]:
+                out.append((v, 1 if costs is None else (costs[u] + costs[v]) / 2))
+    if grid.diagonal:
+        for dr, dc in DIAGONALS:
+            nr, nc = row + dr, col + dc
+            if r0 <= nr < r1 and c0 <= nc < c1 and grid._diagonal_ok(row, col, dr, dc):
+                v = nr * cols + nc
+                out.append((v, SQRT2 if costs is None else SQRT2 * (costs[u] + costs[v]) / 2))
+    return out
+
+
+def _local_dijkstra(grid, source, box, targets, order=None):
+    """Dijkstra from source inside box, stopping once every target is settled.
+
+    Returns (dist, parent, expanded). Distances of settled cells, and so of
+    every reached target, are final.
+    """
+    dist = {source: 0}
+    parent = {source: -1}
+    heap = [(0, source)]
+    remaining = set(targets)
+    expanded = 0
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        expanded += 1
+        if order is not None:
+            order.append(divmod(u, grid.cols))
+        remaining.discard(u)
+        if not remaining:
+            break
+        for v, w in _local_neighbors(grid, u, box):
+            nd = d + w
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd, v))
+    return dist, parent, expanded
+
+
+def _chain(parent, node):
+    """Follow parent links from node to the search's source (inclusive)"""
+    cells = []
+    while node != -1:
+        cells.append(node)
+        node = parent[node]
+    return cells
+
+
+class HierarchicalMap:
+    """Cluster/entrance abstraction of a grid, kept in step with its edits.
+
+    Entrances are found for the whole map up front, which is cheap (one
+    pass along every cluster border). The distances between a cluster's
+    entrances are only computed when a query first reaches that cluster.
+    Wall and cost edits are picked up on the next query. Only the borders
+    and clusters around the changed cells are rebuilt.
+    """
+
+    def __init__(self, grid, cluster_size=DEFAULT_CLUSTER_SIZE, cancel=None):
+        if cluster_size < 2:
+            raise ValueError(f"cluster_size must be at least 2, got {cluster_size}")
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.rebuilt_clusters = 0
+        self._build(cancel)
+
+    def _build(self, cancel=None):
+        grid = self.grid
+        cs = self.cluster_size
+        # Shape and version are only recorded once the build is complete,
+        # so a cancelled build is started over by the next query
+        self._shape = None
+        self._version = None
+        self._h_scale = 1 if grid.costs is None else max(1, min(grid.costs))
+        self._h = octile if grid.diagonal else manhattan
+        self.cluster_rows = math.ceil(grid.rows / cs)
+        self.cluster_cols = math.ceil(grid.cols / cs)
+
+        self._borders = {}  # border key -> [(a, b, cost), ...]
+        self._inter = {}  # entrance cell -> {cell across the border: step cost}
+        self._intra = {}  # cluster -> ({entrance: [(entrance, distance), ...]}, {entrance: parent tree})
+        for cr in range(self.cluster_rows):
+            if cancel is not None:
+                cancel.check()
+            for cc in range(self.cluster_cols):
+                if cr + 1 < self.cluster_rows:
+                    self._build_border(("h", cr, cc))
+                if cc + 1 < self.cluster_cols:
+                    self._build_border(("v", cr, cc))
+        self._snapshot = grid.snapshot()
+        self._shape = (grid.rows, grid.cols, grid.diagonal, grid.corner_cutting)
+        self._version = grid.version
+
+    @property
+    def node_count(self):
+        """Number of entrance cells in the abstract graph"""
+        return len(self._inter)
+
+    def cluster_of(self, cell_id):
+        row, col = divmod(cell_id, self.grid.cols)
+        return row // self.cluster_size, col // self.cluster_size
+
+    def _box(self, cluster):
+        cs = self.cluster_size
+        r0, c0 = cluster[0] * cs, cluster[1] * cs
+        return r0, min(r0 + cs, self.grid.rows), c0, min(c0 + cs, self.grid.cols)
+
+    def _build_border(self, key):
+        """(Re)pick the entrances on one border between two clusters.
+
+        Border keys are ("h", cr, cc) for the border below cluster (cr, cc)
+        and ("v", cr, cc) for the border to its right.
+        """
+        for a, b, _ in self._borders.pop(key, ()):
+            for x, y in ((a, b), (b, a)):
+                links = self._inter.get(x)
+                if links is not None:
+                    links.pop(y, None)
+                    if not links:
+                        del self._inter[x]
+
+        grid = self.grid
+        cells, cols, costs = grid._cells, grid.cols, grid.costs
+        kind, cr, cc = key
+        r0, r1, c0, c1 = self._box((cr, cc))
+        if kind == "h":
+            row = r1 - 1
+            line = [(row * cols + c, (row + 1) * cols + c) for c in range(c0, c1)]
+        else:
+            col = c1 - 1
+            line = [(r * cols + col, r * cols + col + 1) for r in range(r0, r1)]
+
+        pairs = []
+        run = []
+        for a, b in line + [(None, None)]:
+            if a is not None and not cells[a] and not cells[b]:
+                run.append((a, b))
+                continue
+            if run:
+                picks = [run[len(run) // 2]] if len(run) < WIDE_ENTRANCE else [run[0], run[-1]]
+                for pa, pb in picks:
+                    w = 1 if costs is None else (costs[pa] + costs[pb]) / 2
+                    pairs.append((pa, pb, w))
+                    self._inter.setdefault(pa, {})[pb] = w
+                    self._inter.setdefault(pb, {})[pa] = w
+                run = []
+        self._borders[key] = pairs
+
+    def _entrances(self, cluster):
+        """Entrance cells lying inside a cluster"""
+        cr, cc = cluster
+        nodes = set()
+        for key, side in (
+            (("h", cr - 1, cc), 1),
+            (("h", cr, cc), 0),
+            (("v", cr, cc - 1), 1),
+            (("v", cr, cc), 0),
+        ):
+            for pair in self._borders.get(key, ()):
+                nodes.add(pair[side])
+        return nodes
+
+    def _intra_edges(self, cluster, cancel=None):
+        """Distances between the entrances of a cluster, computed on first use.
+
+        The search tree from each entrance is kept as well, so refining a
+        hop inside the cluster is a walk up parent links, not a new search.
+        """
+        intra = self._intra.get(cluster)
+        if intra is None:
+            box = self._box(cluster)
+            nodes = self._entrances(cluster)
+            edges, trees = {}, {}
+            for s in nodes:
+                if cancel is not None:
+                    cancel.check()
+                others = nodes - {s}
+                dist, parent, _ = _local_dijkstra(self.grid, s, box, others)
+                edges[s] = [(t, dist[t]) for t in others if t in dist]
+                trees[s] = parent
+            intra = self._intra[cluster] = (edges, trees)
+        return intra
+
+    def _sync(self, cancel=None):
+        """Rebuild what the grid edits since the last query invalidated"""
+        grid = self.grid
+        if grid.version == self._version:
+            return
+        if (
+            (grid.rows, grid.cols, grid.diagonal, grid.corner_cutting) != self._shape
+            or (grid.costs is not None and min(grid.costs) < self._h_scale)
+        ):
+            self._build(cancel)
+            return
+
+        cs, cols = self.cluster_size, grid.cols
+        changed = grid.changed_cells(self._snapshot)
+
+        # A cell matters to its own cluster and, when it sits on a cluster
+        # edge, to the border it shares with the neighbor on that side
+        dirty, borders = set(), set()
+        for x in changed:
+            row, col = divmod(x, cols)
+            cr, cc = row // cs, col // cs
+            dirty.add((cr, cc))
+            if row % cs == cs - 1 and cr + 1 < self.cluster_rows:
+                borders.add(("h", cr, cc))
+            if row % cs == 0 and cr > 0:
+                borders.add(("h", cr - 1, cc))
+            if col % cs == cs - 1 and cc + 1 < self.cluster_cols:
+                borders.add(("v", cr, cc))
+            if col % cs == 0 and cc > 0:
+                borders.add(("v", cr, cc - 1))
+        # Rebuilding a border again is harmless, so a cancelled sync keeps
+        # the old snapshot and the next one redoes every changed border
+        for key in borders:
+            if cancel is not None:
+                cancel.check()
+            kind, cr, cc = key
+            self._build_border(key)
+            dirty.add((cr, cc))
+            dirty.add((cr + 1, cc) if kind == "h" else (cr, cc + 1))
+        for cluster in dirty:
+            self._intra.pop(cluster, None)
+        self.rebuilt_clusters += len(dirty)
+        self._snapshot = grid.snapshot()
+        self._version = grid.version
+
+    def find_path(self, start=None, goal=None, trace=False, stats=None, cancel=None):
+        """Answer a query on the abstract graph, then refine it to cells.
+
+        Returns the usual (path, cost, expanded_nodes, time_taken) tuple;
+        expanded_nodes counts abstract and in-cluster expansions together.
+        A SearchStats passed as stats gets the rebuild time as "setup" and
+        the abstract search plus refinement as "search". A CancelToken
+        passed as cancel is checked during the rebuild, while cluster
+        distances are computed and during the abstract search.
+        """
+        start_time = time.time()
+        if stats is not None:
+            stats.start()
+        self._sync(cancel)
+        if stats is not None:
+            stats.lap("setup")
+        grid = self.grid
+        if start is None:
+            start = grid.start
+        if goal is None:
+            goal = grid.goal
+        cols = grid.cols
+        start_id = start[0] * cols + start[1]
+        goal_id = goal[0] * cols + goal[1]
+        order = [] if trace else None
+        expanded_nodes = 0
+
+        path, cost = None, 0
+        if not _no_path(grid, start, goal):
+            path, cost, expanded_nodes = self._search(start_id, goal_id, order, cancel)
+        if stats is not None:
+            stats.finish(expanded_nodes, 0)
+
+        time_taken = time.time() - start_time
+        if trace:
+            return path, cost, expanded_nodes, time_taken, order
+        return path, cost, expanded_nodes, time_taken
+
+    def _search(self, start_id, goal_id, order, cancel=None):
+        grid = self.grid
+        cols = grid.cols
+        if start_id == goal_id:
+            if order is not None:
+                order.append(divmod(start_id, cols))
+            return [divmod(start_id, cols)], 0, 1
+
+        # Hook the endpoints into the abstract graph with one bounded search
+        # each. The goal side is searched from the goal, which is fine
+        # because edge costs are symmetric.
+        start_cluster = self.cluster_of(start_id)
+        goal_cluster = self.cluster_of(goal_id)
+        start_nodes = self._entrances(start_cluster)
+        targets = start_nodes | {goal_id} if start_cluster == goal_cluster else start_nodes
+        dist_s, parent_s, expanded = _local_dijkstra(
+            grid, start_id, self._box(start_cluster), targets, order
+        )
+        goal_nodes = self._entrances(goal_cluster)
+        dist_g, parent_g, e = _local_dijkstra(grid, goal_id, self._box(goal_cluster), goal_nodes, order)
+        expanded += e
+        start_links = [(n, dist_s[n]) for n in start_nodes if n in dist_s]
+        if start_cluster == goal_cluster and goal_id in dist_s:
+            start_links.append((GOAL, dist_s[goal_id]))
+        goal_links = {n: dist_g[n] for n in goal_nodes if n in dist_g}
+
+        # A* over entrances
+        goal = divmod(goal_id, cols)
+        h, h_scale = self._h, self._h_scale
+        counter = 0
+        heap = [(h(divmod(start_id, cols), goal) * h_scale, counter, 0, START)]
+        best = {START: 0}
+        parent = {START: None}
+        found = False
+        while heap:
+            _, _, g, u = heapq.heappop(heap)
+            if g > best[u]:
+                continue
+            if u == GOAL:
+                found = True
+                break
+            if u == START:
+                edges = start_links
+            else:
+                expanded += 1
+                if cancel is not None and expanded % CANCEL_INTERVAL == 0:
+                    cancel.check()
+                if order is not None:
+                    order.append(divmod(u, cols))
+                edges = list(self._intra_edges(self.cluster_of(u), cancel)[0].get(u, ()))
+                edges.extend(self._inter.get(u, {}).items())
+                if u in goal_links:
+                    edges.append((GOAL, goal_links[u]))
+            for v, w in edges:
+                ng = g + w
+                if ng < best.get(v, INF):
+                    best[v] = ng
+                    parent[v] = u
+                    counter += 1
+                    f = ng if v == GOAL else ng + h(divmod(v, cols), goal) * h_scale
+                    heapq.heappush(heap, (f, counter, ng, v))
+        if not found:
+            return None, 0, expanded
+
+        hops = []
+        node = GOAL
+        while node is not None:
+            hops.append(node)
+            node = parent[node]
+        hops.reverse()
+
+        # Refine every abstract hop into cells
+        ids = [start_id]
+        for a, b in zip(hops, hops[1:]):
+            if a == START and b == GOAL:
+                ids.extend(reversed(_chain(parent_s, goal_id)[:-1]))
+            elif a == START:
+                ids.extend(reversed(_chain(parent_s, b)[:-1]))
+            elif b == GOAL:
+                ids.extend(_chain(parent_g, a)[1:])
+            elif self.cluster_of(a) != self.cluster_of(b):
+                ids.append(b)
+            else:
+                tree = self._intra_edges(self.cluster_of(a), cancel)[1][a]
+                ids.extend(reversed(_chain(tree, b)[:-1]))
+
+        cost = best[GOAL]
+        if grid.costs is None and not grid.diagonal:
+            cost = int(cost)
+        return [divmod(i, cols) for i in ids], cost, expanded
+
+    def compare_with_astar(self, pairs):
+        """Run each (start, goal) pair through HPA* and run_astar and summarize.
+
+        Suboptimality is hpa_cost / optimal_cost - 1 over the queries both
+        solved (0.0 means HPA* matched A* exactly).
+        """
+        ratios = []
+        summary = {
+            "queries": 0, "hpa_time": 0.0, "astar_time": 0.0,
+            "hpa_expanded": 0, "astar_expanded": 0, "missed": 0,
+        }
+        for start, goal in pairs:
+            path, cost, expanded, time_taken = self.find_path(start, goal)
+            ref_path, ref_cost, ref_expanded, ref_time = run_astar(self.grid, start, goal)
+            summary["queries"] += 1
+            summary["hpa_time"] += time_taken
+            summary["astar_time"] += ref_time
+            summary["hpa_expanded"] += expanded
+            summary["astar_expanded"] += ref_expanded
+            if ref_path is None:
+                continue
+            if path is None:
+                summary["missed"] += 1
+            elif ref_cost > 0:
+                ratios.append(cost / ref_cost - 1)
+        summary["mean_suboptimality"] = sum(ratios) / len(ratios) if ratios else 0.0
+        summary["max_suboptimality"] = max(ratios) if ratios else 0.0
+        return summary
+
+
+def run_hpa(grid, start=None, goal=None, trace=False, cluster_size=DEFAULT_CLUSTER_SIZE, stats=None, cancel=None):
+    """HPA* with the standard result tuple.
+
+    The abstraction is built over a private copy of the grid and cached
+    with the map's frozen adjacency, so it is reused until the map changes.
+    Keep a HierarchicalMap yourself to get incremental rebuilds instead.
+    """
+    adj = grid.freeze()
+    key = ("hpa", cluster_size)
+    hierarchy = adj.derived.get(key)
+    if hierarchy is None:
+        hierarchy = adj.derived[key] = HierarchicalMap(grid.copy(), cluster_size, cancel)
+    if start is None:
+        start = grid.start
+    if goal is None:
+        goal = grid.goal
+    return hierarchy.find_path(start, goal, trace=trace, stats=stats, cancel=cancel)
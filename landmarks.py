@@ -0,0 +1,346 @@
+"""
+landmarks.py - ALT heuristics (A*, Landmarks, Triangle inequality)
+
+A few landmark cells each get a table of distances to every cell. For a
+cell v, a target t and any landmark L, the triangle inequality gives
+|d(L, t) - d(L, v)| <= d(v, t). The largest of these differences is an
+admissible, consistent heuristic that knows about walls, so in maze-like
+buildings it is far closer to the truth than Manhattan or octile distance.
+
+Tables are built once per map and can be saved to and loaded from JSON.
+Loaded tables are checked against the map's fingerprint before
+install() puts them where landmark_heuristic() looks, so a saved file
+replaces the build:
+
+    landmark_heuristic(grid, path="campus.alt.json")
+"""
+
+import base64
+import hashlib
+import json
+import random
+import sys
+from array import array
+
+from algorithms.algorithms import STREAMS, iter_astar, run_astar
+from fields import distance_field, flow_field, np
+from heuristics import manhattan, octile
+
+
+INF = float("inf")
+DEFAULT_LANDMARKS = 8
+STRATEGIES = ("farthest", "avoid")
+FORMAT_VERSION = 1
+FLOAT_SLACK = 2.0 ** -23  # float32 tables: relative error bound of a difference
+
+
+def map_fingerprint(grid):
+    """Hash of everything distances depend on (size, walls, costs, movement)"""
+    cells, costs = grid.snapshot()
+    digest = hashlib.sha1()
+    digest.update(f"{grid.rows}x{grid.cols}:{int(grid.diagonal)}{int(grid.corner_cutting)}:".encode())
+    digest.update(cells)
+    if costs is not None:
+        digest.update(costs)
+    return digest.hexdigest()
+
+
+def _table_format(grid):
+    """(typecode, missing value) for this map's distance tables.
+
+    Uniform 4-connected maps have integer distances below the cell count,
+    so 2 bytes per cell are enough on maps of up to 65535 cells. Weighted
+    or diagonal maps are stored as float32.
+    """
+    if grid.costs is None and not grid.diagonal:
+        if grid.rows * grid.cols <= 0xFFFF:
+            return "H", 0xFFFF
+        return "I", 0xFFFFFFFF
+    return "f", INF
+
+
+def _pack(dist, typecode, missing):
+    """Compact copy of a distance field; unreachable cells hold missing"""
+    table = array(typecode)
+    if np is not None and isinstance(dist, np.ndarray):
+        dtype = {"H": np.uint16, "I": np.uint32, "f": np.float32}[typecode]
+        packed = np.where(np.isfinite(dist), dist, missing).astype(dtype)
+        table.frombytes(packed.tobytes())
+        return table
+    if typecode == "f":
+        table.fromlist(list(dist))  # array('d') cannot extend array('f') directly
+    else:
+        table.extend(int(d) if d != INF else missing for d in dist)
+    return table
+
+
+def _main_component_cells(grid):
+    """Free cells of the largest connected component"""
+    components = grid.components()
+    sizes = {}
+    free = [i for i, wall in enumerate(grid.snapshot()[0]) if not wall]
+    for i in free:
+        root = components.root(i)
+        sizes[root] = sizes.get(root, 0) + 1
+    if not sizes:
+        return []
+    main = max(sizes, key=sizes.get)
+    return [i for i in free if components.root(i) == main]
+
+
+def _select_farthest(grid, count, rng):
+    """Farthest-point selection: each landmark is the cell farthest from all earlier ones"""
+    cells = _main_component_cells(grid)
+    if not cells:
+        return [], []
+    cols = grid.cols
+    seed = rng.choice(cells)
+    nearest = list(distance_field(grid, divmod(seed, cols), cache=False).dist)
+    landmarks, fields = [], []
+    for _ in range(min(count, len(cells))):
+        best = max(cells, key=lambda i: nearest[i] if nearest[i] != INF else -1)
+        field = distance_field(grid, divmod(best, cols), cache=False)
+        landmarks.append(best)
+        fields.append(field.dist)
+        nearest = [min(a, b) for a, b in zip(nearest, field.dist)]
+    return landmarks, fields
+
+
+def _select_avoid(grid, count, rng):
+    """"Avoid" selection (Goldberg & Werneck).
+
+    Grow a shortest-path tree from a random root and weight every cell by
+    how much the current landmarks underestimate its distance to the root.
+    Then walk down the heaviest subtree that holds no landmark yet. The leaf
+    at the end becomes the next landmark, placed "behind" the regions the
+    current set covers worst.
+    """
+    cells = _main_component_cells(grid)
+    if not cells:
+        return [], []
+    cols, size = grid.cols, grid.rows * grid.cols
+    landmarks, fields = [], []
+    for _ in range(min(count, len(cells))):
+        root = rng.choice(cells)
+        flow = flow_field(grid, divmod(root, cols))
+        dist, parent = flow.field.dist, flow.next_cell
+
+        weight = [0.0] * size
+        for v in cells:
+            bound = 0.0
+            for f in fields:
+                diff = abs(f[root] - f[v])
+                if diff > bound:
+                    bound = diff
+            weight[v] = dist[v] - bound
+        covered = bytearray(size)
+        for lm in landmarks:
+            covered[lm] = 1
+
+        # Children are farther from the root than their parent, so
+        # accumulating in order of decreasing distance sees children first
+        children = {}
+        for v in sorted(cells, key=lambda i: dist[i], reverse=True):
+            p = int(parent[v])
+            if p >= 0:
+                weight[p] += weight[v]
+                covered[p] |= covered[v]
+                children.setdefault(p, []).append(v)
+
+        node = root
+        while True:
+            options = [c for c in children.get(node, ()) if not covered[c]]
+            if not options:
+                break
+            node = max(options, key=weight.__getitem__)
+        if node in landmarks:
+            break
+        landmarks.append(node)
+        fields.append(distance_field(grid, divmod(node, cols), cache=False).dist)
+    return landmarks, fields
+
+
+class LandmarkHeuristic:
+    """ALT heuristic over precomputed landmark distance tables.
+
+    Call it like the functions in heuristics.py: ``h(cell, target)``. It
+    plugs into run_astar, run_greedy and run_bidirectional_astar as
+    ``heuristic=``. The value is also never below the map's geometric
+    heuristic (Manhattan, or octile with diagonal moves).
+
+    Engines multiply heuristics by the map's cheapest cell cost, so the
+    landmark bound is returned divided by it.
+    """
+
+    def __init__(self, rows, cols, landmarks, tables, min_cost=1, diagonal=False, fingerprint=None,
+                 count=None, strategy="farthest"):
+        self.rows = rows
+        self.cols = cols
+        self.landmarks = [tuple(lm) for lm in landmarks]
+        self.tables = tables
+        self.min_cost = min_cost
+        self.diagonal = diagonal
+        self.fingerprint = fingerprint
+        self.count = len(self.landmarks) if count is None else count  # landmarks asked for
+        self.strategy = strategy
+        self._geometric = octile if diagonal else manhattan
+        self._float = bool(tables) and tables[0].typecode == "f"
+        self._missing = INF if self._float or not tables else (1 << (8 * tables[0].itemsize)) - 1
+        # (target, [(table, distance to target), ...]), replaced as one
+        # tuple so threads sharing the heuristic never see a mixed pair
+        self._target = (None, [])
+
+    @classmethod
+    def build(cls, grid, count=DEFAULT_LANDMARKS, strategy="farthest", seed=0):
+        """Pick landmarks on grid and compute their distance tables"""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown landmark strategy {strategy!r}; expected one of {STRATEGIES}")
+        rng = random.Random(seed)
+        select = _select_farthest if strategy == "farthest" else _select_avoid
+        ids, fields = select(grid, count, rng)
+        typecode, missing = _table_format(grid)
+        tables = [_pack(f, typecode, missing) for f in fields]
+        landmarks = [divmod(i, grid.cols) for i in ids]
+        return cls(
+            grid.rows, grid.cols, landmarks, tables,
+            grid.freeze().min_cost, grid.diagonal, map_fingerprint(grid), count, strategy,
+        )
+
+    @property
+    def nbytes(self):
+        """Memory used by the distance tables"""
+        return sum(t.itemsize * len(t) for t in self.tables)
+
+    def __call__(self, a, b):
+        cols = self.cols
+        target = self._target
+        if b != target[0]:
+            # Engines ask about one target many times; cache its column
+            index = b[0] * cols + b[1]
+            target = (b, [(t, t[index]) for t in self.tables if t[index] != self._missing])
+            self._target = target
+        v = a[0] * cols + a[1]
+        missing = self._missing
+        best = 0.0
+        for table, dt in target[1]:
+            dv = table[v]
+            if dv != missing:
+                diff = dv - dt if dv > dt else dt - dv
+                if self._float:
+                    diff -= (dv + dt) * FLOAT_SLACK
+                if diff > best:
+                    best = diff
+        geometric = self._geometric(a, b)
+        alt = best / self.min_cost
+        return alt if alt > geometric else geometric
+
+    def to_dict(self):
+        return {
+            "format": "alt-landmarks",
+            "version": FORMAT_VERSION,
+            "rows": self.rows,
+            "cols": self.cols,
+            "fingerprint": self.fingerprint,
+            "min_cost": self.min_cost,
+            "diagonal": self.diagonal,
+            "count": self.count,
+            "strategy": self.strategy,
+            "byteorder": sys.byteorder,
+            "typecode": self.tables[0].typecode if self.tables else "H",
+            "landmarks": [list(lm) for lm in self.landmarks],
+            "tables": [base64.b64encode(t.tobytes()).decode("ascii") for t in self.tables],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("format") != "alt-landmarks" or data.get("version") != FORMAT_VERSION:
+            raise ValueError("not an ALT landmark table (or an unsupported version)")
+        tables = []
+        for encoded in data["tables"]:
+            table = array(data["typecode"])
+            table.frombytes(base64.b64decode(encoded))
+            if data["byteorder"] != sys.byteorder:
+                table.byteswap()
+            tables.append(table)
+        return cls(
+            data["rows"], data["cols"], data["landmarks"], tables,
+            data["min_cost"], data["diagonal"], data["fingerprint"],
+            data.get("count"), data.get("strategy", "farthest"),
+        )
+
+    def save(self, path):
+        """Write the tables as JSON (arrays base64-encoded)"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path, grid=None):
+        """Read tables saved by save(). With grid, check they belong to it"""
+        with open(path, "r", encoding="utf-8") as f:
+            heuristic = cls.from_dict(json.load(f))
+        if grid is not None and heuristic.fingerprint != map_fingerprint(grid):
+            raise ValueError(f"landmark tables in {path} were built for a different map")
+        return heuristic
+
+    def install(self, grid):
+        """Make these tables grid's cached ALT heuristic for (count, strategy).
+
+        landmark_heuristic(grid, count, strategy) then returns them instead
+        of building new ones, until the map changes. Raises ValueError if
+        they were built for a different map.
+        """
+        if self.fingerprint != map_fingerprint(grid):
+            raise ValueError("landmark tables were built for a different map")
+        grid.freeze().derived[("alt", self.count, self.strategy)] = self
+        return self
+
+
+def landmark_heuristic(grid, count=DEFAULT_LANDMARKS, strategy="farthest", path=None):
+    """ALT heuristic for grid, built on first use and cached until the map changes.
+
+    With path, tables saved by LandmarkHeuristic.save() are loaded from it
+    instead of built; they must match grid, count and strategy.
+    """
+    adj = grid.freeze()
+    key = ("alt", count, strategy)
+    heuristic = adj.derived.get(key)
+    if heuristic is None:
+        if path is None:
+            heuristic = adj.derived[key] = LandmarkHeuristic.build(grid, count, strategy)
+        else:
+            heuristic = LandmarkHeuristic.load(path, grid)
+            if (heuristic.count, heuristic.strategy) != (count, strategy):
+                raise ValueError(
+                    f"landmark tables in {path} hold {heuristic.count} {heuristic.strategy!r} landmarks, "
+                    f"not {count} {strategy!r}"
+                )
+            heuristic.install(grid)
+    return heuristic
+
+
+def run_astar_alt(grid, start=None, goal=None, trace=False, stats=None, cancel=None):
+    """run_astar with the map's (cached) ALT landmark heuristic"""
+    return run_astar(
+        grid, start, goal, trace=trace, heuristic=landmark_heuristic(grid), stats=stats, cancel=cancel
+    )
+
+
+def iter_astar_alt(grid, start=None, goal=None, stats=None, events=True, cancel=None):
+    """iter_astar with the map's (cached) ALT landmark heuristic"""
+    return iter_astar(
+        grid, start, goal, heuristic=landmark_heuristic(grid), stats=stats, events=events, cancel=cancel
+    )
+
+
+STREAMS[run_astar_alt] = iter_astar_alt
+
+
+def resolve_kwargs(kwargs, grid):
+    """Build the ALT tables for grid if kwargs chose landmark_heuristic.
+
+    Lets a caller pick ALT on one thread (or process) and build the tables
+    where the search runs.
+    """
+    if kwargs.get("heuristic") is landmark_heuristic:
+        return dict(kwargs, heuristic=landmark_heuristic(grid))
+    return kwargs
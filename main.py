@@ -1,10 +1,21 @@
+import argparse
+import sys
+from functools import partial
+
 from algorithms.algorithms import (
     run_astar,
     run_bfs,
+    run_bidirectional,
+    run_bidirectional_astar,
     run_dfs,
     run_dijkstra,
     run_greedy,
+    run_jps,
 )
+from fields import run_flow_field
+from hpa import run_hpa
+from landmarks import run_astar_alt
+from report import default_workers, print_report, run_report
 from grid.grid import (
     create_simple_map,
     create_maze_map,
@@ -16,6 +27,7 @@ from grid.grid import (
     create_yassin_simple_3x3,
     create_yassin_maze_5x5,
     create_andrew_map_5x5,
+    create_random_map,
 )
 
 
@@ -36,40 +48,36 @@ def print_result(algorithm_name, path, cost, expanded, time_taken):
     print("=" * 60 + "\n")
 
 
-def print_results_table_for_map(map_name, grid, algorithms):
-    print("\n" + "-" * 60)
-    print(f"Map: {map_name}")
-    print("-" * 60)
-    print("| Algorithm | Path Found | Path Length | Expanded Nodes | Time (s) |")
-    print("|---|---:|---:|---:|---:|")
-
-    for _, (algo_name, algo_func) in algorithms.items():
-        path, cost, expanded, time_taken = algo_func(grid)
-        path_found = "Yes" if path is not None else "No"
-        print(f"| {algo_name} | {path_found} | {cost} | {expanded} | {time_taken:.6f} |")
+MAPS = {
+    "1": ("Simple 5x5 (no obstacles)", create_simple_map),
+    "2": ("Maze 10x10", create_maze_map),
+    "3": ("No Path 5x5 (goal blocked)", create_no_path_map),
+    "4": ("Comparison 8x8 (BFS vs DFS test)", create_comparison_map),
+    "5": ("Yassin Simple 3x3", create_yassin_simple_3x3),
+    "6": ("Yassin Maze 5x5", create_yassin_maze_5x5),
+    "7": ("Andrew Comparison 5x5 (A* vs Greedy)", create_andrew_map_5x5),
+    "8": ("Greedy Trap (A* vs Greedy)", create_greedy_trap_map),
+    "9": ("DFS Deep Trap (BFS vs DFS)", create_dfs_deep_trap_map),
+    "10": ("Bridge Map 7x7 (Optimal Path)", create_bridge_map_7x7),
+}
+
+ALGORITHMS = {
+    "1": ("A* (Adham)", run_astar),
+    "2": ("Dijkstra (Yassin)", run_dijkstra),
+    "3": ("Greedy Best-First (Andrew)", run_greedy),
+    "4": ("BFS (Belal)", run_bfs),
+    "5": ("DFS (Belal)", run_dfs),
+    "6": ("Bidirectional BFS (Yassin)", run_bidirectional),
+    "7": ("Bidirectional A* (Yassin)", run_bidirectional_astar),
+    "8": ("Jump Point Search", run_jps),
+    "9": ("Flow Field (goal-wide)", run_flow_field),
+    "10": ("HPA* (hierarchical)", run_hpa),
+    "11": ("A* + ALT landmarks", run_astar_alt),
+}
 
 
 def main():
-    maps = {
-        "1": ("Simple 5x5 (no obstacles)", create_simple_map),
-        "2": ("Maze 10x10", create_maze_map),
-        "3": ("No Path 5x5 (goal blocked)", create_no_path_map),
-        "4": ("Comparison 8x8 (BFS vs DFS test)", create_comparison_map),
-        "5": ("Yassin Simple 3x3", create_yassin_simple_3x3),
-        "6": ("Yassin Maze 5x5", create_yassin_maze_5x5),
-        "7": ("Andrew Comparison 5x5 (A* vs Greedy)", create_andrew_map_5x5),
-        "8": ("Greedy Trap (A* vs Greedy)", create_greedy_trap_map),
-        "9": ("DFS Deep Trap (BFS vs DFS)", create_dfs_deep_trap_map),
-        "10": ("Bridge Map 7x7 (Optimal Path)", create_bridge_map_7x7),
-    }
-
-    algorithms = {
-        "1": ("A* (Adham)", run_astar),
-        "2": ("Dijkstra (Yassin)", run_dijkstra),
-        "3": ("Greedy Best-First (Andrew)", run_greedy),
-        "4": ("BFS (Belal)", run_bfs),
-        "5": ("DFS (Belal)", run_dfs),
-    }
+    maps, algorithms = MAPS, ALGORITHMS
 
     print("\n" + "=" * 60)
     print("AI PATHFINDING SIMULATOR - PHASE 2")
@@ -82,9 +90,7 @@ def main():
 
     map_choice = input("\nSelect map (1-10): ").strip()
     if map_choice.lower() == "report":
-        for _, (map_name, map_creator) in maps.items():
-            grid = map_creator()
-            print_results_table_for_map(map_name, grid, algorithms)
+        print_report(run_report(list(maps.values()), list(algorithms.values())))
         return
     if map_choice not in maps:
         print("Invalid choice. Using Simple map.")
@@ -101,7 +107,7 @@ def main():
     for key, (name, _) in algorithms.items():
         print(f"  {key}. {name}")
 
-    algo_choice = input("\nSelect algorithm (1-5, or 'all' to run all): ").strip().lower()
+    algo_choice = input("\nSelect algorithm (1-11, or 'all' to run all): ").strip().lower()
 
     if algo_choice == "all":
         for _, (algo_name, algo_func) in algorithms.items():
@@ -118,5 +124,38 @@ def main():
     print_result(algo_name, path, cost, expanded, time_taken)
 
 
+def report_main(argv=None):
+    """Non-interactive report mode: python main.py report [options]"""
+    parser = argparse.ArgumentParser(
+        prog="main.py report",
+        description="Print results tables for all maps, run in parallel worker processes.",
+    )
+    parser.add_argument("--repetitions", type=int, default=1,
+                        help="timed runs per map and algorithm (min/median/p95 when > 1)")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="worker processes (default: one per core, 1 = no pool)")
+    parser.add_argument("--generated", type=int, default=0,
+                        help="also run this many seeded random maps")
+    parser.add_argument("--size", type=int, default=64, help="rows and cols of generated maps")
+    parser.add_argument("--wall-prob", type=float, default=0.25, help="wall density of generated maps")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first generated map")
+    parser.add_argument("--stats", action="store_true",
+                        help="add heap, frontier and phase-timer columns (SearchStats)")
+    args = parser.parse_args(argv)
+
+    maps = list(MAPS.values())
+    for seed in range(args.seed, args.seed + args.generated):
+        maps.append((
+            f"Random {args.size}x{args.size} (seed {seed})",
+            partial(create_random_map, args.size, args.size, args.wall_prob, seed),
+        ))
+    print(f"Workers: {args.workers}, repetitions: {args.repetitions}")
+    report = run_report(maps, list(ALGORITHMS.values()), args.repetitions, args.workers, args.stats)
+    print_report(report, args.repetitions)
+
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "report":
+        report_main(sys.argv[2:])
+    else:
+        main()
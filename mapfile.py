@@ -0,0 +1,183 @@
+"""
+mapfile.py - Compact binary map files (.pfm), and a converter from/to JSON
+
+    python mapfile.py campus.json campus.pfm
+    python mapfile.py campus.pfm campus.json
+
+The editor's JSON format lists every wall as an [r, c] pair, which gets
+huge for big floor plans. A .pfm file stores one bit per cell instead,
+so a 4096x4096 map takes 2 MiB (plus 32 MiB if it has terrain costs).
+
+Layout (little-endian):
+
+    offset  size  field
+    0       4     magic b"PFMP"
+    4       2     format version (1)
+    6       2     flags: 1 = diagonal, 2 = corner cutting, 4 = cost layer
+    8       4     rows
+    12      4     cols
+    16      16    start row, start col, goal row, goal col (int32, -1 = unset)
+    32      ...   occupancy: rows * cols bits, row-major, first cell in the
+                  high bit, 1 = wall; padded to a multiple of 8 bytes
+    ...     ...   cost layer (if flag 4): rows * cols uint16 cell costs
+
+load_map_binary() maps the file with mmap and reads both sections
+straight out of the mapping into the grid's own buffers, without reading
+the file into memory first.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from fields import np
+from grid.grid import Grid, load_map_json, save_map_json
+
+
+MAGIC = b"PFMP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHII4i")
+FLAG_DIAGONAL = 1
+FLAG_CORNER_CUTTING = 2
+FLAG_COSTS = 4
+KNOWN_FLAGS = FLAG_DIAGONAL | FLAG_CORNER_CUTTING | FLAG_COSTS
+SECTION_ALIGN = 8  # sections start on 8-byte boundaries
+BINARY_SUFFIX = ".pfm"
+
+# Pure-Python bit packing goes through a binary string: one "0"/"1" per cell
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _occupancy_size(cells):
+    """Bytes of the padded occupancy section for a map of cells cells"""
+    packed = (cells + 7) // 8
+    return (packed + SECTION_ALIGN - 1) // SECTION_ALIGN * SECTION_ALIGN
+
+
+def _pack_bits(cells):
+    """One bit per cell of a 0/1 byte buffer, first cell in the high bit"""
+    if np is not None:
+        return np.packbits(np.frombuffer(cells, dtype=np.uint8)).tobytes()
+    if not cells:
+        return b""
+    padding = -len(cells) % 8
+    digits = bytes(cells).translate(_TO_DIGITS) + b"0" * padding
+    return int(digits, 2).to_bytes((len(cells) + padding) // 8, "big")
+
+
+def _unpack_bits(packed, count):
+    """Inverse of _pack_bits: count 0/1 bytes"""
+    if np is not None:
+        return np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=count)
+    if count == 0:
+        return b""
+    digits = format(int.from_bytes(packed, "big"), "b").zfill(len(packed) * 8)
+    return digits[:count].encode("ascii").translate(_FROM_DIGITS)
+
+
+def save_map_binary(grid, path):
+    """Write grid as a .pfm file"""
+    cells, costs = grid.snapshot()
+    count = grid.rows * grid.cols
+    flags = (
+        (FLAG_DIAGONAL if grid.diagonal else 0)
+        | (FLAG_CORNER_CUTTING if grid.corner_cutting else 0)
+        | (FLAG_COSTS if costs is not None else 0)
+    )
+    start = grid.start if grid.start is not None else (-1, -1)
+    goal = grid.goal if grid.goal is not None else (-1, -1)
+    packed = _pack_bits(cells)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, grid.rows, grid.cols, *start, *goal))
+        f.write(packed)
+        f.write(bytes(_occupancy_size(count) - len(packed)))
+        if costs is not None:
+            if sys.byteorder != "little":
+                layer = array("H", grid.costs)
+                layer.byteswap()
+                costs = layer.tobytes()
+            f.write(costs)
+
+
+def load_map_binary(path):
+    """Read a .pfm file written by save_map_binary()"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise ValueError(f"{path} is not a binary map file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, version, flags, rows, cols, *ends = HEADER.unpack_from(mapped)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a binary map file")
+            if not 1 <= version <= FORMAT_VERSION:
+                raise ValueError(f"{path} has unsupported binary map version {version} (expected 1 to {FORMAT_VERSION})")
+            if flags & ~KNOWN_FLAGS:
+                raise ValueError(f"{path} has unknown flags {flags & ~KNOWN_FLAGS:#x}")
+            for name, (r, c) in (("start", ends[:2]), ("goal", ends[2:])):
+                if (r, c) != (-1, -1) and not (0 <= r < rows and 0 <= c < cols):
+                    raise ValueError(f"{path}: {name} {(r, c)} is outside the {rows}x{cols} map")
+            count = rows * cols
+            occupancy_end = HEADER.size + _occupancy_size(count)
+            end = occupancy_end + (2 * count if flags & FLAG_COSTS else 0)
+            if len(mapped) < end:
+                raise ValueError(f"{path} is truncated ({len(mapped)} of {end} bytes)")
+
+            costs = None
+            with memoryview(mapped) as view:
+                try:
+                    cells = _unpack_bits(view[HEADER.size:HEADER.size + (count + 7) // 8], count)
+                    if flags & FLAG_COSTS:
+                        costs = view[occupancy_end:end]
+                        if sys.byteorder != "little":
+                            costs = array("H", costs.tobytes())
+                            costs.byteswap()
+                    grid = Grid.from_cells(
+                        rows, cols, cells,
+                        diagonal=bool(flags & FLAG_DIAGONAL),
+                        corner_cutting=bool(flags & FLAG_CORNER_CUTTING),
+                        costs=costs,
+                    )
+                finally:
+                    costs = None  # the mapping cannot close while a view of it is alive
+
+    start_r, start_c, goal_r, goal_c = ends
+    if start_r >= 0:
+        grid.set_start(start_r, start_c)
+    if goal_r >= 0:
+        grid.set_goal(goal_r, goal_c)
+    return grid
+
+
+def load_map(path):
+    """Load a map saved by the editor, binary or JSON (by file extension)"""
+    if path.lower().endswith(BINARY_SUFFIX):
+        return load_map_binary(path)
+    return load_map_json(path)
+
+
+def save_map(grid, path):
+    """Save a map as binary or JSON, by file extension"""
+    if path.lower().endswith(BINARY_SUFFIX):
+        save_map_binary(grid, path)
+    else:
+        save_map_json(grid, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert maps between the editor JSON and the .pfm binary format.")
+    parser.add_argument("source", help="map to read (.json or .pfm)")
+    parser.add_argument("target", help="file to write; the extension picks the format")
+    args = parser.parse_args(argv)
+
+    grid = load_map(args.source)
+    save_map(grid, args.target)
+    before, after = os.path.getsize(args.source), os.path.getsize(args.target)
+    print(f"{args.source} ({before:,} bytes) -> {args.target} ({after:,} bytes), {grid.rows}x{grid.cols}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
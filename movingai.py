@@ -0,0 +1,273 @@
+"""
+movingai.py - MovingAI benchmark maps (.map) and scenarios (.scen)
+
+    python movingai.py arena.map.scen --algorithms 1,2,8
+    python movingai.py dao/*.scen --maps dao-maps --output dao.json
+
+The MovingAI grid benchmarks (https://movingai.com/benchmarks/grids.html)
+are the standard workload for grid pathfinding: game and city maps with
+thousands of start/goal queries whose optimal length is known. A .scen
+file groups its queries into buckets by length (bucket b holds queries of
+optimal length about 4b to 4b + 4), so results show how each algorithm
+scales with distance.
+
+Maps are octile: 8-connected, diagonal steps cost sqrt(2) and may not cut
+corners, which is Grid(diagonal=True, corner_cutting=False). '.', 'G'
+and 'S' are passable; '@', 'O', 'T' and 'W' are not.
+
+Every algorithm from main.py runs every query. A cost equal to the
+optimal length counts as optimal, a longer one as suboptimal (expected
+for Greedy, DFS and HPA*). A missing path or a cost below the optimum is
+a failure, and any failure makes the run exit with status 1. Per-map
+tables (JPS+, HPA*, flow fields, landmarks) are dropped before each
+algorithm, so its first query pays for building them.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from grid.grid import Grid
+from main import ALGORITHMS
+
+
+FORMAT_VERSION = 1
+# bytes.translate table: passable terrain becomes 0, everything else a wall
+_TERRAIN = bytes(0 if chr(b) in ".GS" else 1 for b in range(256))
+OPTIMAL_TOLERANCE = 1e-4  # relative; .scen lengths are printed to 8 decimals
+
+
+# =========================
+# LOADERS
+# =========================
+
+def load_movingai_map(path):
+    """Read a MovingAI .map file into a Grid (no start or goal set)"""
+    header = {}
+    with open(path, "r", encoding="latin-1") as f:
+        for line in f:
+            line = line.strip()
+            if line == "map":
+                break
+            key, _, value = line.partition(" ")
+            header[key.lower()] = value.strip()
+        else:
+            raise ValueError(f"{path}: no 'map' line")
+        lines = f.read().split()
+    try:
+        rows, cols = int(header["height"]), int(header["width"])
+    except (KeyError, ValueError):
+        raise ValueError(f"{path}: missing or bad height/width") from None
+    if len(lines) < rows or any(len(line) != cols for line in lines[:rows]):
+        raise ValueError(f"{path}: expected {rows} rows of {cols} cells")
+    cells = "".join(lines[:rows]).encode("latin-1").translate(_TERRAIN)
+    diagonal = header.get("type", "octile") == "octile"
+    return Grid.from_cells(rows, cols, cells, diagonal=diagonal)
+
+
+class Scenario:
+    """One query of a .scen file; start and goal are (row, col)"""
+
+    __slots__ = ("bucket", "map_name", "width", "height", "start", "goal", "optimal")
+
+    def __init__(self, bucket, map_name, width, height, start, goal, optimal):
+        self.bucket = bucket
+        self.map_name = map_name
+        self.width = width
+        self.height = height
+        self.start = start
+        self.goal = goal
+        self.optimal = optimal
+
+
+def load_scenarios(path):
+    """Read a MovingAI .scen file (version 1) into a list of Scenario"""
+    scenarios = []
+    with open(path, "r", encoding="latin-1") as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or fields[0] == "version":
+                continue
+            if len(fields) != 9:
+                raise ValueError(f"{path}:{number}: expected 9 fields, got {len(fields)}")
+            bucket, map_name, width, height, sx, sy, gx, gy = fields[:8]
+            # .scen coordinates are (x, y) = (col, row)
+            scenarios.append(Scenario(
+                int(bucket), map_name, int(width), int(height),
+                (int(sy), int(sx)), (int(gy), int(gx)), float(fields[8]),
+            ))
+    return scenarios
+
+
+def find_map(map_name, scen_path, maps_dir=None):
+    """Locate a scenario's map: in maps_dir if given, else next to the .scen file.
+
+    The map column may carry a directory (e.g. "dao/arena.map"); the bare
+    file name is tried as well.
+    """
+    base = maps_dir if maps_dir is not None else os.path.dirname(os.path.abspath(scen_path))
+    for candidate in (os.path.join(base, map_name), os.path.join(base, os.path.basename(map_name))):
+        if os.path.isfile(candidate):
+            return candidate
+    raise FileNotFoundError(f"map {map_name!r} of {scen_path} not found in {base}")
+
+
+# =========================
+# RUNNING
+# =========================
+
+def _grade(cost, path, optimal):
+    """'optimal', 'suboptimal' or 'failed' for one returned cost"""
+    if path is None:
+        return "failed"
+    slack = OPTIMAL_TOLERANCE * max(1.0, optimal)
+    if cost < optimal - slack:
+        return "failed"  # shorter than optimal: the path must be invalid
+    return "optimal" if cost <= optimal + slack else "suboptimal"
+
+
+def run_scenarios(grid, scenarios, algorithms, map_name="", log=print):
+    """Run every scenario on grid with every algorithm; one result per bucket.
+
+    algorithms is a list of (name, function) pairs. Results are dicts with
+    "map", "algorithm", "bucket", "queries", "time_s" (all queries),
+    "qps", "expanded" (total and "expanded_mean"), the "optimal",
+    "suboptimal" and "failed" counts, and "worst_ratio" (largest
+    cost / optimal length).
+    """
+    for scenario in scenarios:
+        if (scenario.height, scenario.width) != (grid.rows, grid.cols):
+            raise ValueError(
+                f"scenario for a {scenario.width}x{scenario.height} map, "
+                f"but {map_name or 'the map'} is {grid.cols}x{grid.rows}"
+            )
+    buckets = {}
+    for scenario in scenarios:
+        buckets.setdefault(scenario.bucket, []).append(scenario)
+
+    results = []
+    for algo_name, algo_func in algorithms:
+        grid.freeze().derived.clear()
+        for bucket in sorted(buckets):
+            counts = {"optimal": 0, "suboptimal": 0, "failed": 0}
+            elapsed = 0.0
+            expanded_total = 0
+            worst_ratio = 1.0
+            for scenario in buckets[bucket]:
+                begin = time.perf_counter()
+                path, cost, expanded, _ = algo_func(grid, scenario.start, scenario.goal)
+                elapsed += time.perf_counter() - begin
+                expanded_total += expanded
+                grade = _grade(cost, path, scenario.optimal)
+                counts[grade] += 1
+                if grade == "suboptimal" and scenario.optimal > 0:
+                    worst_ratio = max(worst_ratio, cost / scenario.optimal)
+            queries = len(buckets[bucket])
+            results.append({
+                "map": map_name,
+                "algorithm": algo_name,
+                "bucket": bucket,
+                "queries": queries,
+                "time_s": elapsed,
+                "qps": queries / elapsed if elapsed > 0 else None,
+                "expanded": expanded_total,
+                "expanded_mean": expanded_total / queries,
+                **counts,
+                "worst_ratio": worst_ratio,
+            })
+        totals = [r for r in results if r["algorithm"] == algo_name]
+        queries = sum(r["queries"] for r in totals)
+        seconds = sum(r["time_s"] for r in totals)
+        failed = sum(r["failed"] for r in totals)
+        rate = f"{queries / seconds:,.0f} queries/s" if seconds > 0 else "-"
+        log(f"  {algo_name}: {queries} queries, {rate}, {failed} failed")
+    return results
+
+
+def print_tables(results):
+    """Markdown table per (map, algorithm), one row per bucket"""
+    groups = {}
+    for result in results:
+        groups.setdefault((result["map"], result["algorithm"]), []).append(result)
+    for (map_name, algo_name), rows in groups.items():
+        print("\n" + "-" * 60)
+        print(f"Map: {map_name} | Algorithm: {algo_name}")
+        print("-" * 60)
+        print("| Bucket | Queries | Queries/s | Mean Expanded | Optimal | Suboptimal | Failed | Worst Ratio |")
+        print("|---:|---:|---:|---:|---:|---:|---:|---:|")
+        for row in rows:
+            qps = "-" if row["qps"] is None else f"{row['qps']:,.0f}"
+            print(
+                f"| {row['bucket']} | {row['queries']} | {qps} | {row['expanded_mean']:,.1f} "
+                f"| {row['optimal']} | {row['suboptimal']} | {row['failed']} | {row['worst_ratio']:.4f} |"
+            )
+
+
+def _parse_list(text, convert=str):
+    return [convert(part.strip()) for part in text.split(",") if part.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run MovingAI .scen benchmarks against every algorithm.")
+    parser.add_argument("scenarios", nargs="+", help=".scen files")
+    parser.add_argument("--maps", help="directory holding the .map files (default: next to each .scen)")
+    parser.add_argument("--algorithms", default="all",
+                        help="comma-separated algorithm numbers from main.py, or 'all'")
+    parser.add_argument("--max-bucket", type=int, help="skip buckets above this one (long queries)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--no-tables", action="store_true", help="only print the per-algorithm summary")
+    args = parser.parse_args(argv)
+
+    if args.algorithms == "all":
+        keys = list(ALGORITHMS)
+    else:
+        keys = _parse_list(args.algorithms)
+        for key in keys:
+            if key not in ALGORITHMS:
+                parser.error(f"unknown algorithm number {key!r}")
+    algorithms = [ALGORITHMS[key] for key in keys]
+
+    results = []
+    for scen_path in args.scenarios:
+        scenarios = load_scenarios(scen_path)
+        if args.max_bucket is not None:
+            scenarios = [s for s in scenarios if s.bucket <= args.max_bucket]
+        by_map = {}
+        for scenario in scenarios:
+            by_map.setdefault(scenario.map_name, []).append(scenario)
+        for map_name, group in by_map.items():
+            begin = time.perf_counter()
+            grid = load_movingai_map(find_map(map_name, scen_path, args.maps))
+            grid.freeze()
+            grid.components()
+            log_name = os.path.basename(map_name)
+            print(f"{log_name}: {grid.rows}x{grid.cols}, {len(group)} queries, "
+                  f"loaded in {time.perf_counter() - begin:.2f}s")
+            results.extend(run_scenarios(grid, group, algorithms, log_name))
+
+    if not args.no_tables:
+        print_tables(results)
+    if args.output:
+        report = {
+            "format": "pathfinding-movingai",
+            "version": FORMAT_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    failed = sum(r["failed"] for r in results)
+    if failed:
+        print(f"{failed} queries failed (no path, or cheaper than the optimal length)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
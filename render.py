@@ -0,0 +1,575 @@
+"""
+render.py - Retained-mode grid rendering for the GUI windows
+
+A GridRenderer keeps one canvas rectangle per cell and remembers the
+color each one has. A frame only reconfigures the cells whose color
+changed (newly expanded, on or off the path, edited, start or goal moved),
+so animating a search on a 100x100 map touches a handful of items per
+tick instead of recreating 10,000. The items themselves are rebuilt only
+when the canvas is resized or a different map (or map size) is drawn.
+
+An animated search grows one expanded set in place. Its caller passes
+the same set object every frame along with the cells added since the
+previous draw(), and only those are looked at; the whole set is copied
+and diffed against the last frame only when a different set is passed.
+
+Tk canvas items do not scale to maps of 500x500 and more, however few of
+them change per frame. Above BITMAP_THRESHOLD cells a BitmapRenderer
+takes over: the visible part of the map is rasterized into a single
+tk.PhotoImage and later frames only repaint changed pixels. It can zoom
+(mouse wheel) and pan (right-button drag) over a viewport, and only the
+cells inside the viewport are ever drawn.
+
+The main window, the compare window and the map editor all draw through
+an AutoRenderer, which picks the backend from the map size, so they share
+one set of colors.
+"""
+
+import tkinter as tk
+
+from fields import np
+
+
+EMPTY = "#e2e8f0"
+TERRAIN = "#d6c7a1"  # cells costing more than 1
+WALL = "#334155"
+EXPANDED = "#fbbf24"
+PATH = "#38bdf8"
+START = "#22c55e"
+GOAL = "#ef4444"
+OUTLINE = "#0f172a"
+LABEL_MAX = 10  # "S"/"G" labels are drawn on maps up to this many rows and columns
+BITMAP_THRESHOLD = 40_000  # cells; larger maps are drawn as a bitmap (200x200 and up)
+ZOOM_LEVELS = (-16, -8, -4, -2, 1, 2, 4, 8, 16, 32)  # >0: pixels per cell, <0: cells per pixel
+REPAINT_FRACTION = 0.125  # repaint the whole view when more of it than this changes
+
+
+class GridRenderer:
+    """Draws a Grid on a tk.Canvas and keeps the items between frames.
+
+    Call draw() as often as needed; it works out what changed since the
+    previous call. min_cell is the smallest cell size in pixels and
+    padding the margin kept around the map. With labels=True small maps
+    get "S" and "G" written on the start and goal.
+    """
+
+    def __init__(self, canvas, min_cell=10, padding=18, labels=False):
+        self.canvas = canvas
+        self.min_cell = min_cell
+        self.padding = padding
+        self.labels = labels
+        self.cell = min_cell
+        self.x0 = self.y0 = 0
+        self._grid = None
+        self._layout = None  # (width, height, rows, cols) the items were built for
+        self._items = []  # canvas item per cell, indexed row * cols + col
+        self._fills = []  # color each item has right now
+        self._base = []  # wall / terrain / empty color per cell
+        self._snapshot = None  # grid.snapshot() the base colors were taken from
+        self._version = None
+        self._label_items = {}
+        self._start = self._goal = None
+        self._expanded = set()  # own copy of the expanded cells on screen
+        self._expanded_source = None  # the caller's set it was copied from
+        self._path = set()
+
+    def cell_at(self, x, y):
+        """(row, col) under canvas point (x, y) in the last drawn layout, or None"""
+        if self._grid is None:
+            return None
+        c = (x - self.x0) // self.cell
+        r = (y - self.y0) // self.cell
+        if 0 <= r < self._grid.rows and 0 <= c < self._grid.cols:
+            return int(r), int(c)
+        return None
+
+    def invalidate(self):
+        """Force a full rebuild on the next draw()"""
+        self._layout = None
+        self._expanded_source = None
+
+    def draw(self, grid, path=None, expanded=(), added=None):
+        """Show grid with path and expanded cells (any iterables of (row, col)).
+
+        If expanded is the set passed last time, grown in place, added
+        lists the cells put into it since then and nothing else is
+        compared; see the module docstring.
+        """
+        w = max(1, self.canvas.winfo_width())
+        h = max(1, self.canvas.winfo_height())
+        layout = (w, h, grid.rows, grid.cols)
+        path = set(path) if path else set()
+
+        if grid is not self._grid or layout != self._layout:
+            self._expanded_source = expanded
+            self._rebuild(grid, layout, path, set(expanded))
+            return
+
+        cols = grid.cols
+        changed = self._sync_base(grid)
+        if added is not None and expanded is self._expanded_source:
+            self._expanded.update(added)
+            for r, c in added:
+                changed.add(r * cols + c)
+        else:
+            self._expanded_source = expanded
+            expanded = set(expanded)
+            for r, c in expanded.symmetric_difference(self._expanded):
+                changed.add(r * cols + c)
+            self._expanded = expanded
+        for r, c in path.symmetric_difference(self._path):
+            changed.add(r * cols + c)
+        if (grid.start, grid.goal) != (self._start, self._goal):
+            for cell in (self._start, self._goal, grid.start, grid.goal):
+                if cell is not None:
+                    changed.add(cell[0] * cols + cell[1])
+            self._place_labels(grid)
+        self._path = path
+        self._start, self._goal = grid.start, grid.goal
+
+        itemconfig = self.canvas.itemconfigure
+        for idx in changed:
+            fill = self._fill(idx, divmod(idx, cols))
+            if fill != self._fills[idx]:
+                self._fills[idx] = fill
+                itemconfig(self._items[idx], fill=fill)
+
+    def _geometry(self, w, h, rows, cols):
+        padding = self.padding
+        self.cell = max(self.min_cell, min((w - 2 * padding) // cols, (h - 2 * padding) // rows))
+        self.x0 = (w - self.cell * cols) // 2
+        self.y0 = (h - self.cell * rows) // 2
+
+    @staticmethod
+    def _base_fill(cells, costs, idx):
+        if cells[idx]:
+            return WALL
+        if costs is not None and costs[idx] > 1:
+            return TERRAIN
+        return EMPTY
+
+    def _sync_base(self, grid):
+        """Flat indices whose wall or cost changed since the last frame"""
+        if grid.version == self._version:
+            return set()
+        changed = grid.changed_cells(self._snapshot)
+        self._snapshot = grid.snapshot()
+        cells = self._snapshot[0]
+        for idx in changed:
+            self._base[idx] = self._base_fill(cells, grid.costs, idx)
+        self._version = grid.version
+        return changed
+
+    def _fill(self, idx, cell):
+        if cell == self._start:
+            return START
+        if cell == self._goal:
+            return GOAL
+        if cell in self._path:
+            return PATH
+        base = self._base[idx]
+        if base != WALL and cell in self._expanded:
+            return EXPANDED
+        return base
+
+    def _rebuild(self, grid, layout, path, expanded):
+        canvas = self.canvas
+        canvas.delete("all")
+        w, h, rows, cols = layout
+        self._geometry(w, h, rows, cols)
+        self._grid, self._layout = grid, layout
+        self._snapshot = grid.snapshot()
+        self._version = grid.version
+        cells = self._snapshot[0]
+        self._base = [self._base_fill(cells, grid.costs, idx) for idx in range(rows * cols)]
+        self._expanded, self._path = expanded, path
+        self._start, self._goal = grid.start, grid.goal
+
+        cell, x0, y0 = self.cell, self.x0, self.y0
+        create = canvas.create_rectangle
+        self._items = []
+        self._fills = []
+        for r in range(rows):
+            y1 = y0 + r * cell
+            for c in range(cols):
+                x1 = x0 + c * cell
+                fill = self._fill(r * cols + c, (r, c))
+                self._fills.append(fill)
+                self._items.append(create(x1, y1, x1 + cell, y1 + cell, fill=fill, outline=OUTLINE, width=2))
+
+        self._label_items = {}
+        if self.labels and rows <= LABEL_MAX and cols <= LABEL_MAX:
+            for text in ("S", "G"):
+                self._label_items[text] = canvas.create_text(0, 0, text=text, fill=OUTLINE)
+            self._place_labels(grid)
+
+    def _place_labels(self, grid):
+        for text, cell in (("S", grid.start), ("G", grid.goal)):
+            item = self._label_items.get(text)
+            if item is None:
+                continue
+            if cell is None:
+                self.canvas.itemconfigure(item, state="hidden")
+                continue
+            x = self.x0 + cell[1] * self.cell + self.cell // 2
+            y = self.y0 + cell[0] * self.cell + self.cell // 2
+            self.canvas.coords(item, x, y)
+            self.canvas.itemconfigure(item, state="normal")
+
+
+# =========================
+# BITMAP BACKEND
+# =========================
+
+# Cell states in the bitmap renderer, and their colors (same order)
+_EMPTY, _WALL, _TERRAIN, _EXPANDED, _PATH, _START, _GOAL = range(7)
+PALETTE = (EMPTY, WALL, TERRAIN, EXPANDED, PATH, START, GOAL)
+
+
+def _channel(offset):
+    """Translate table from cell state to one byte of its RGB color"""
+    table = bytearray(256)
+    for code, color in enumerate(PALETTE):
+        table[code] = int(color[offset:offset + 2], 16)
+    return bytes(table)
+
+
+_RED, _GREEN, _BLUE = _channel(1), _channel(3), _channel(5)
+_WALL_CODES = bytes([_EMPTY] + [_WALL] * 255)  # grid wall buffer -> cell states
+
+
+def _pixels_per_cell(level):
+    return level if level > 0 else 1 / -level
+
+
+class BitmapRenderer:
+    """Draws a Grid as one tk.PhotoImage, for maps too big for canvas items.
+
+    Same draw() / cell_at() / invalidate() interface as GridRenderer.
+    Every cell has a state byte (empty, wall, ..., goal); the visible
+    rows are sliced out of that buffer and turned into a PPM image in one
+    go, so a full repaint never loops over cells in Python. Zoomed out
+    below one pixel per cell, every n-th row and column is shown.
+
+    The map is fitted to the canvas until the user zooms or pans;
+    fit() goes back to that.
+    """
+
+    def __init__(self, canvas, padding=18):
+        self.canvas = canvas
+        self.padding = padding
+        self.x0 = self.y0 = 0
+        self.view_row = self.view_col = 0  # top-left cell of the viewport
+        self._level = 1  # one of ZOOM_LEVELS, or any pixel count when fitted
+        self._fit = True
+        self._grid = None
+        self._shape = None  # (rows, cols) the cell states were built for
+        self._size = None  # canvas (width, height)
+        self._base = None  # empty / wall / terrain state per cell
+        self._codes = None  # state per cell, including search overlays
+        self._snapshot = None
+        self._version = None
+        self._start = self._goal = None
+        self._expanded = set()  # as in GridRenderer
+        self._expanded_source = None
+        self._path = set()
+        self._image = None  # keeps the PhotoImage alive while it is shown
+        self._view = None  # (r0, r1, c0, c1) cells in the current image
+        self._pan = None
+
+    def invalidate(self):
+        """Force a full rebuild on the next draw()"""
+        self._grid = None
+        self._expanded_source = None
+
+    def cell_at(self, x, y):
+        """(row, col) under canvas point (x, y), or None"""
+        if self._grid is None:
+            return None
+        zoom, step = self._scale()
+        c = self.view_col + (x - self.x0) * step // zoom
+        r = self.view_row + (y - self.y0) * step // zoom
+        if 0 <= r < self._grid.rows and 0 <= c < self._grid.cols:
+            return int(r), int(c)
+        return None
+
+    def draw(self, grid, path=None, expanded=(), added=None):
+        """Show grid with path and expanded cells; same arguments as GridRenderer.draw()"""
+        size = (max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height()))
+        path = set(path) if path else set()
+
+        if grid is not self._grid or (grid.rows, grid.cols) != self._shape:
+            self._grid, self._shape, self._size = grid, (grid.rows, grid.cols), size
+            self._load_base(grid)
+            self._codes = bytearray(self._base)
+            self._expanded_source = expanded
+            expanded = set(expanded)
+            self._expanded, self._path = expanded, set()
+            self._start = self._goal = None
+            cols = grid.cols
+            self._apply_overlays(grid, path, {r * cols + c for r, c in expanded | path})
+            self.fit()
+            return
+
+        cols = grid.cols
+        changed = self._sync_base(grid)
+        if added is not None and expanded is self._expanded_source:
+            self._expanded.update(added)
+            for r, c in added:
+                changed.add(r * cols + c)
+        else:
+            self._expanded_source = expanded
+            expanded = set(expanded)
+            for r, c in expanded.symmetric_difference(self._expanded):
+                changed.add(r * cols + c)
+            self._expanded = expanded
+        for r, c in path.symmetric_difference(self._path):
+            changed.add(r * cols + c)
+        changed = self._apply_overlays(grid, path, changed)
+
+        if size != self._size:
+            self._size = size
+            if self._fit:
+                self.fit()
+            else:
+                self._render_view()
+            return
+        self._repaint(changed)
+
+    # -- viewport --
+
+    def fit(self):
+        """Zoom so the whole map fits the canvas"""
+        if self._grid is None:
+            return
+        w, h = self._size
+        rows, cols = self._grid.rows, self._grid.cols
+        room_w = max(1, w - 2 * self.padding)
+        room_h = max(1, h - 2 * self.padding)
+        if cols <= room_w and rows <= room_h:
+            self._level = max(1, min(room_w // cols, room_h // rows))
+        else:
+            self._level = -max(-(-cols // room_w), -(-rows // room_h))
+        self.view_row = self.view_col = 0
+        self._fit = True
+        self._render_view()
+
+    def zoom_at(self, x, y, steps):
+        """Zoom in (steps > 0) or out one level, keeping the cell under (x, y) in place"""
+        if self._grid is None:
+            return
+        ppc = _pixels_per_cell(self._level)
+        if steps > 0:
+            levels = [lv for lv in ZOOM_LEVELS if _pixels_per_cell(lv) > ppc]
+            level = levels[0] if levels else self._level
+        else:
+            levels = [lv for lv in ZOOM_LEVELS if _pixels_per_cell(lv) < ppc]
+            level = levels[-1] if levels else self._level
+        if level == self._level:
+            return
+        col = self.view_col + (x - self.x0) / ppc
+        row = self.view_row + (y - self.y0) / ppc
+        self._level = level
+        ppc = _pixels_per_cell(level)
+        self.view_col = round(col - x / ppc)
+        self.view_row = round(row - y / ppc)
+        self._fit = False
+        self._render_view()
+
+    def pan_start(self, x, y):
+        self._pan = (x, y, self.view_row, self.view_col)
+
+    def pan_to(self, x, y):
+        """Drag the map so the point given to pan_start() follows (x, y)"""
+        if self._grid is None or self._pan is None:
+            return
+        x_start, y_start, row, col = self._pan
+        ppc = _pixels_per_cell(self._level)
+        self.view_col = col - round((x - x_start) / ppc)
+        self.view_row = row - round((y - y_start) / ppc)
+        self._fit = False
+        self._render_view()
+
+    def _scale(self):
+        """(pixels per cell, cells per pixel); one of them is 1"""
+        level = self._level
+        return (level, 1) if level > 0 else (1, -level)
+
+    # -- cell states --
+
+    def _load_base(self, grid):
+        self._snapshot = grid.snapshot()
+        self._version = grid.version
+        self._base = bytearray(self._snapshot[0].translate(_WALL_CODES))
+        costs = grid.costs
+        if costs is None:
+            return
+        if np is not None:
+            slow = np.flatnonzero(np.frombuffer(costs, dtype=np.uint16) > 1).tolist()
+        else:
+            slow = [idx for idx, cost in enumerate(costs) if cost > 1]
+        base = self._base
+        for idx in slow:
+            if base[idx] == _EMPTY:
+                base[idx] = _TERRAIN
+
+    def _sync_base(self, grid):
+        """Flat indices whose wall or cost changed since the last frame"""
+        if grid.version == self._version:
+            return set()
+        changed = grid.changed_cells(self._snapshot)
+        self._snapshot = grid.snapshot()
+        self._version = grid.version
+        cells, costs, base = self._snapshot[0], grid.costs, self._base
+        for idx in changed:
+            if cells[idx]:
+                base[idx] = _WALL
+            elif costs is not None and costs[idx] > 1:
+                base[idx] = _TERRAIN
+            else:
+                base[idx] = _EMPTY
+        return changed
+
+    def _apply_overlays(self, grid, path, changed):
+        """Recompute the state of the changed cells; returns the ones that differ"""
+        cols = grid.cols
+        changed = set(changed)
+        if (grid.start, grid.goal) != (self._start, self._goal):
+            for cell in (self._start, self._goal, grid.start, grid.goal):
+                if cell is not None:
+                    changed.add(cell[0] * cols + cell[1])
+        self._path = path
+        self._start, self._goal = grid.start, grid.goal
+        codes, base, expanded = self._codes, self._base, self._expanded
+        differ = set()
+        for idx in changed:
+            cell = divmod(idx, cols)
+            if cell == self._start:
+                code = _START
+            elif cell == self._goal:
+                code = _GOAL
+            elif cell in path:
+                code = _PATH
+            elif base[idx] != _WALL and cell in expanded:
+                code = _EXPANDED
+            else:
+                code = base[idx]
+            if codes[idx] != code:
+                codes[idx] = code
+                differ.add(idx)
+        return differ
+
+    # -- painting --
+
+    def _render_view(self):
+        """Rasterize the visible cells into a new PhotoImage"""
+        canvas = self.canvas
+        canvas.delete("all")
+        self._image = self._view = None
+        w, h = self._size
+        rows, cols = self._grid.rows, self._grid.cols
+        zoom, step = self._scale()
+
+        # Center the map on an axis where it fits, otherwise clamp the view
+        map_w, map_h = -(-cols // step) * zoom, -(-rows // step) * zoom
+        if map_w <= w:
+            self.view_col, self.x0 = 0, (w - map_w) // 2
+        else:
+            self.view_col, self.x0 = max(0, min(self.view_col, cols - w * step // zoom)), 0
+        if map_h <= h:
+            self.view_row, self.y0 = 0, (h - map_h) // 2
+        else:
+            self.view_row, self.y0 = max(0, min(self.view_row, rows - h * step // zoom)), 0
+
+        r0, c0 = self.view_row, self.view_col
+        r1 = min(rows, r0 + -(-h * step // zoom))
+        c1 = min(cols, c0 + -(-w * step // zoom))
+        width, height = len(range(c0, c1, step)), len(range(r0, r1, step))
+        if not width or not height:
+            return
+        codes = self._codes
+        region = b"".join(codes[r * cols + c0:r * cols + c1:step] for r in range(r0, r1, step))
+        rgb = bytearray(3 * len(region))
+        rgb[0::3] = region.translate(_RED)
+        rgb[1::3] = region.translate(_GREEN)
+        rgb[2::3] = region.translate(_BLUE)
+        image = tk.PhotoImage(master=canvas, data=b"P6 %d %d 255\n" % (width, height) + bytes(rgb), format="PPM")
+        if zoom > 1:
+            image = image.zoom(zoom)
+        canvas.create_image(self.x0, self.y0, anchor=tk.NW, image=image)
+        self._image, self._view = image, (r0, r1, c0, c1)
+
+    def _repaint(self, changed):
+        """Recolor changed cells in the current image, or repaint it all if many changed"""
+        if self._view is None or not changed:
+            return
+        r0, r1, c0, c1 = self._view
+        zoom, step = self._scale()
+        cols = self._grid.cols
+        visible = []
+        for idx in changed:
+            r, c = divmod(idx, cols)
+            if r0 <= r < r1 and c0 <= c < c1 and (r - r0) % step == 0 and (c - c0) % step == 0:
+                visible.append((r, c, idx))
+        if len(visible) > REPAINT_FRACTION * len(range(r0, r1, step)) * len(range(c0, c1, step)):
+            self._render_view()
+            return
+        put, codes = self._image.put, self._codes
+        for r, c, idx in visible:
+            x = (c - c0) // step * zoom
+            y = (r - r0) // step * zoom
+            put(PALETTE[codes[idx]], to=(x, y, x + zoom, y + zoom))
+
+
+class AutoRenderer:
+    """GridRenderer for small maps, BitmapRenderer above threshold cells.
+
+    Options (min_cell, labels, ...) go to the GridRenderer. Zoom and pan
+    only apply while the bitmap backend is active.
+    """
+
+    def __init__(self, canvas, threshold=BITMAP_THRESHOLD, **options):
+        self.threshold = threshold
+        self.items = GridRenderer(canvas, **options)
+        self.bitmap = BitmapRenderer(canvas, padding=self.items.padding)
+        self.active = self.items
+
+    def draw(self, grid, path=None, expanded=(), added=None):
+        backend = self.bitmap if grid.rows * grid.cols > self.threshold else self.items
+        if backend is not self.active:
+            # Both draw on the same canvas; the new one starts from scratch
+            backend.invalidate()
+            self.active = backend
+        backend.draw(grid, path, expanded, added)
+
+    def cell_at(self, x, y):
+        return self.active.cell_at(x, y)
+
+    def invalidate(self):
+        self.active.invalidate()
+
+    def zoom_at(self, x, y, steps):
+        if self.active is self.bitmap:
+            self.bitmap.zoom_at(x, y, steps)
+
+    def pan_start(self, x, y):
+        if self.active is self.bitmap:
+            self.bitmap.pan_start(x, y)
+
+    def pan_to(self, x, y):
+        if self.active is self.bitmap:
+            self.bitmap.pan_to(x, y)
+
+    def fit(self):
+        if self.active is self.bitmap:
+            self.bitmap.fit()
+
+
+def bind_viewport(canvas, renderer):
+    """Mouse wheel zooms, right-button drag pans, right double-click fits"""
+    canvas.bind("<MouseWheel>", lambda e: renderer.zoom_at(e.x, e.y, 1 if e.delta > 0 else -1))
+    canvas.bind("<Button-4>", lambda e: renderer.zoom_at(e.x, e.y, 1))  # X11 wheel
+    canvas.bind("<Button-5>", lambda e: renderer.zoom_at(e.x, e.y, -1))
+    canvas.bind("<ButtonPress-3>", lambda e: renderer.pan_start(e.x, e.y))
+    canvas.bind("<B3-Motion>", lambda e: renderer.pan_to(e.x, e.y))
+    canvas.bind("<Double-Button-3>", lambda e: renderer.fit())
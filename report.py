@@ -0,0 +1,157 @@
+"""
+report.py - Parallel results tables for main.py's report mode
+
+Every (map, algorithm, repetition) triple is one task. Tasks are spread
+over a fixed number of worker processes, each task rebuilds its map from
+the factory and times one cold run with time.perf_counter (no ResultCache,
+whose hits return the time of the run that filled them). The results are
+merged back in map, algorithm, repetition order, so the tables come out
+the same no matter which worker finished first.
+
+Maps and algorithms are passed as (name, callable) pairs. The callables
+must be picklable (module-level functions, or functools.partial around
+one), e.g. ``partial(create_random_map, 64, 64, 0.3, seed)`` for
+generated maps.
+
+With stats=True every run also gets a SearchStats, and the tables gain
+frontier and phase columns taken from the first repetition.
+"""
+
+import math
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from algorithms.algorithms import SearchStats
+
+
+TASKS_PER_WORKER = 4  # chunks handed to each worker; fewer chunks = less IPC
+
+
+def default_workers():
+    """One worker per CPU core"""
+    return os.cpu_count() or 1
+
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _run_task(task):
+    """Build one map and time one run of one algorithm on it (in a worker)"""
+    map_index, factory, algo_index, algo_func, repetition, collect_stats = task
+    grid = factory()
+    stats = SearchStats() if collect_stats else None
+    begin = time.perf_counter()
+    if stats is not None:
+        path, cost, expanded, _ = algo_func(grid, stats=stats)
+    else:
+        path, cost, expanded, _ = algo_func(grid)
+    elapsed = time.perf_counter() - begin
+    # Only the summary goes back to the parent, never the path itself
+    return (
+        map_index, algo_index, repetition, path is not None, cost, expanded, elapsed,
+        None if stats is None else stats.as_dict(),
+    )
+
+
+def run_report(maps, algorithms, repetitions=1, workers=None, stats=False):
+    """Run every algorithm on every map, repetitions times each.
+
+    workers=None uses one process per core, and workers=1 runs everything
+    in this process. Returns one entry per map, in input order:
+    ``{"map": name, "rows": [row, ...]}`` with one row per algorithm holding
+    "algorithm", "found", "cost", "expanded" (from the first repetition)
+    and the "min", "median" and "p95" of its timings in seconds, plus
+    "stats" (SearchStats.as_dict() of the first repetition, or None).
+    """
+    if repetitions < 1:
+        raise ValueError("repetitions must be at least 1")
+    if workers is None:
+        workers = default_workers()
+    tasks = [
+        (map_index, factory, algo_index, algo_func, repetition, stats)
+        for map_index, (_, factory) in enumerate(maps)
+        for algo_index, (_, algo_func) in enumerate(algorithms)
+        for repetition in range(repetitions)
+    ]
+
+    if workers <= 1 or len(tasks) <= 1:
+        results = [_run_task(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * TASKS_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_task, tasks, chunksize=chunksize))
+
+    # Deterministic merge: order by (map, algorithm, repetition)
+    results.sort(key=lambda result: result[:3])
+    merged = {}
+    for map_index, algo_index, _, found, cost, expanded, elapsed, counters in results:
+        entry = merged.get((map_index, algo_index))
+        if entry is None:
+            entry = merged[(map_index, algo_index)] = {
+                "algorithm": algorithms[algo_index][0],
+                "found": found,
+                "cost": cost,
+                "expanded": expanded,
+                "stats": counters,
+                "times": [],
+            }
+        entry["times"].append(elapsed)
+
+    report = []
+    for map_index, (map_name, _) in enumerate(maps):
+        rows = []
+        for algo_index in range(len(algorithms)):
+            row = merged[(map_index, algo_index)]
+            times = sorted(row.pop("times"))
+            row["min"] = times[0]
+            row["median"] = statistics.median(times)
+            row["p95"] = _percentile(times, 95)
+            rows.append(row)
+        report.append({"map": map_name, "rows": rows})
+    return report
+
+
+def print_report(report, repetitions=1):
+    """Print the report as the same markdown tables as the serial report mode.
+
+    With more than one repetition, Time (s) is the median. Min and p95
+    columns are added after it, then the search stats columns if the
+    report was run with stats=True.
+    """
+    for entry in report:
+        with_stats = any(row["stats"] is not None for row in entry["rows"])
+        header = "| Algorithm | Path Found | Path Length | Expanded Nodes | Time (s) |"
+        rule = "|---|---:|---:|---:|---:|"
+        if repetitions > 1:
+            header += " Min (s) | P95 (s) |"
+            rule += "---:|---:|"
+        if with_stats:
+            header += " Pushes | Pops | Stale Pops | Peak Frontier | Neighbor Calls | Reconstruct (ms) |"
+            rule += "---:|---:|---:|---:|---:|---:|"
+        print("\n" + "-" * 60)
+        print(f"Map: {entry['map']}")
+        print("-" * 60)
+        print(header)
+        print(rule)
+        for row in entry["rows"]:
+            line = (
+                f"| {row['algorithm']} | {'Yes' if row['found'] else 'No'} | {row['cost']} "
+                f"| {row['expanded']} | {row['median']:.6f} |"
+            )
+            if repetitions > 1:
+                line += f" {row['min']:.6f} | {row['p95']:.6f} |"
+            counters = row["stats"]
+            if with_stats and counters is not None:
+                line += (
+                    f" {counters['pushes']} | {counters['pops']} | {counters['stale_pops']}"
+                    f" | {counters['peak_frontier']} | {counters['neighbor_calls']}"
+                    f" | {counters['reconstruct_ms']:.3f} |"
+                )
+            elif with_stats:
+                line += " - | - | - | - | - | - |"
+            print(line)